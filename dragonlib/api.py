@@ -13,9 +13,14 @@
 import logging
 
 from dragonlib.CoCo.basic_tokens import COCO_BASIC_TOKENS
-from dragonlib.core.basic import BasicLine, BasicListing, BasicTokenUtil, RenumTool
-from dragonlib.core.basic_parser import BASICParser
+from dragonlib.core.basic import BasicLine, BasicListing, CrossReference, RenumTool, TokenRenumTool
+from dragonlib.core.basic_parser import BASICParser, BASICParserSession
 from dragonlib.core.binary_files import BinaryFile
+from dragonlib.core.crunch import CrunchTool
+from dragonlib.core.minify import VariableMinifier
+from dragonlib.core.number_optimizer import NumberOptimizer
+from dragonlib.core.relocate import SubroutineRelocator
+from dragonlib.core.stats import APIStats
 from dragonlib.dragon32.basic_tokens import DRAGON32_BASIC_TOKENS
 from dragonlib.utils.logging_utils import log_bytes
 
@@ -32,39 +37,90 @@ class BaseAPI:
         (?P<statement> GOTO|GOSUB|THEN|ELSE ) (?P<space>\s*) (?P<no>[\d*,\s*]+)
     """
 
-    def __init__(self):
+    def __init__(self, collect_stats=False, token_cache=None):
+        """
+        :param collect_stats: record stage times and counters in self.stats
+            e.g.: api.stats.last (last API call) or api.stats.total (all calls)
+        :param token_cache: optional TokenCache instance: Tokenize only changed
+            lines in ascii_listing2program_dump() and bas2bin()
+        """
+        self.token_cache = token_cache
         self.listing = BasicListing(self.BASIC_TOKENS)
         self.renum_tool = RenumTool(self.RENUM_REGEX)
-        self.token_util = BasicTokenUtil(self.BASIC_TOKENS)
+        self.token_util = self.listing.token_util
+        self.token_renum_tool = TokenRenumTool(self.token_util)
+        self.crunch_tool = CrunchTool(self.token_util)
+        self.variable_minifier = VariableMinifier(self.token_util)
+        self.number_optimizer = NumberOptimizer(self.token_util, hex_literals=self.HEX_LITERALS)
+        self.subroutine_relocator = SubroutineRelocator(self.token_util)
+        self.stats = APIStats(enabled=collect_stats)
 
     def program_dump2ascii_lines(self, dump, program_start=None):
         """
         convert a memory dump of a tokensized BASIC listing into
         ASCII listing list.
+        The dump can be any buffer (bytes, bytearray, mmap, memoryview...)
+        """
+        if program_start is None:
+            program_start = self.DEFAULT_PROGRAM_START
+        with self.stats.call() as stats:
+            with stats.stage("detokenize"):
+                ascii_lines = self.listing.program_dump2ascii_lines(dump, program_start)
+            stats.count("lines", len(ascii_lines))
+            stats.set("bytes_in", len(dump))
+        return ascii_lines
+
+    def program_dump2ascii(self, dump, program_start=None):
+        """
+        convert a memory dump of a tokensized BASIC listing into
+        one ASCII listing string.
         """
-        dump = bytearray(dump)
-        # assert isinstance(dump, bytearray)
-
         if program_start is None:
             program_start = self.DEFAULT_PROGRAM_START
-        return self.listing.program_dump2ascii_lines(dump, program_start)
+        with self.stats.call() as stats:
+            with stats.stage("detokenize"):
+                ascii_listing = self.listing.program_dump2ascii(dump, program_start)
+            if stats.enabled:
+                stats.count("lines", ascii_listing.count("\n") + 1 if ascii_listing else 0)
+                stats.set("bytes_in", len(dump))
+                stats.set("bytes_out", len(ascii_listing))
+        return ascii_listing
 
     def parse_ascii_listing(self, basic_program_ascii):
         parser = BASICParser()
-        parsed_lines = parser.parse(basic_program_ascii)
+        with self.stats.call() as stats:
+            with stats.stage("parse"):
+                parsed_lines = parser.parse(basic_program_ascii)
+            stats.count("lines", len(parsed_lines))
+            stats.count("regex_splits", parser.split_count)
         if not parsed_lines:
-            log.critical("No parsed lines {} from {} ?!?".format(repr(parsed_lines), repr(basic_program_ascii)))
-        log.debug("Parsed BASIC: %s", repr(parsed_lines))
+            log.critical("No parsed lines %r from %r ?!?", parsed_lines, basic_program_ascii)
+        log.debug("Parsed BASIC: %r", parsed_lines)
         return parsed_lines
 
+    def parser_session(self, basic_program_ascii=""):
+        """
+        Returns a BASICParserSession to parse a listing incremental
+        while it is edited, e.g.:
+            session = api.parser_session(listing)
+            result = session.edit((row, col), (row, col), text)
+            session.parsed_lines
+        """
+        return BASICParserSession(basic_program_ascii)
+
     def ascii_listing2basic_lines(self, basic_program_ascii, program_start):
-        parsed_lines = self.parse_ascii_listing(basic_program_ascii)
+        with self.stats.call() as stats:
+            parsed_lines = self.parse_ascii_listing(basic_program_ascii)
 
-        basic_lines = []
-        for line_no, code_objects in sorted(parsed_lines.items()):
-            basic_line = BasicLine(self.token_util)
-            basic_line.code_objects_load(line_no, code_objects)
-            basic_lines.append(basic_line)
+            with stats.stage("tokenize"):
+                basic_lines = []
+                for line_no, code_objects in sorted(parsed_lines.items()):
+                    basic_line = BasicLine(self.token_util)
+                    basic_line.code_objects_load(line_no, code_objects)
+                    basic_lines.append(basic_line)
+
+            if stats.enabled:
+                stats.count("tokens", sum(len(basic_line.line_code) for basic_line in basic_lines))
 
         return basic_lines
 
@@ -77,9 +133,29 @@ class BaseAPI:
         if program_start is None:
             program_start = self.DEFAULT_PROGRAM_START
 
-        basic_lines = self.ascii_listing2basic_lines(basic_program_ascii, program_start)
+        with self.stats.call() as stats:
+            # Parse and tokenize in one pass, without creating code objects:
+            parser = BASICParser()
+            token_cache = self.token_cache
+            if stats.enabled and token_cache is not None:
+                old_cache_info = token_cache.cache_info()
+            with stats.stage("tokenize"):
+                program = self.listing.ascii_listing2basic_program(
+                    basic_program_ascii, parser, token_cache=token_cache, dialect=self.CONFIG_NAME
+                )
+            if stats.enabled and token_cache is not None:
+                cache_info = token_cache.cache_info()
+                stats.count("cache_hits", cache_info.hits - old_cache_info.hits)
+                stats.count("cache_misses", cache_info.misses - old_cache_info.misses)
+            stats.count("lines", len(program))
+            stats.count("tokens", len(program.buffer))
+            stats.count("regex_splits", parser.split_count)
+
+            with stats.stage("link"):
+                program_dump = program.program_dump(program_start)
+            stats.set("bytes_in", len(basic_program_ascii))
+            stats.set("bytes_out", len(program_dump))
 
-        program_dump = self.listing.basic_lines2program_dump(basic_lines, program_start)
         assert isinstance(program_dump, bytearray), "is type: {} and not bytearray: {}".format(
             type(program_dump), repr(program_dump)
         )
@@ -92,19 +168,155 @@ class BaseAPI:
         """
         return self.listing.token_util.pformat_tokens(tokens)
 
+    def iter_pformat_program_dump(self, program_dump, program_start=None):
+        """
+        format a BASIC program dump. Useful for debugging.
+        yields the formated string lines, e.g.:
+            f.writelines(line + "\n" for line in api.iter_pformat_program_dump(dump))
+        """
+        if program_start is None:
+            program_start = self.DEFAULT_PROGRAM_START
+        return self.listing.iter_pformat_program_dump(program_dump, program_start)
+
     def pformat_program_dump(self, program_dump, program_start=None):
         """
         format a BASIC program dump. Useful for debugging.
         returns a list of formated string lines.
         """
         assert isinstance(program_dump, bytearray)
+        return list(self.iter_pformat_program_dump(program_dump, program_start))
 
+    def renum_ascii_listing(self, content, new_start=10, old_start=0, step=10, old_end=None):
+        """
+        Renumber a ASCII listing like: RENUM new_start,old_start,step
+        Only the lines from >old_start< to >old_end< are renumbered.
+        Raise ValueError on line number collisions or overflow.
+        """
+        return self.renum_tool.renum(content, new_start, old_start, step, old_end)
+
+    def renum_program_dump(self, program_dump, program_start=None, new_start=10, old_start=0, step=10, old_end=None):
+        """
+        Renumber a tokenized BASIC program dump directly, without
+        detokenize and tokenize the listing.
+        Arguments like renum_ascii_listing()
+        """
+        if program_start is None:
+            program_start = self.DEFAULT_PROGRAM_START
+        with self.stats.call() as stats:
+            with stats.stage("renum"):
+                new_program_dump = self.token_renum_tool.renum(
+                    program_dump, program_start, self.listing, new_start, old_start, step, old_end
+                )
+            if stats.enabled:
+                stats.count("lines", len(self.token_renum_tool.renum_dict))
+                stats.set("bytes_in", len(program_dump))
+                stats.set("bytes_out", len(new_program_dump))
+        return new_program_dump
+
+    def crunch_program_dump(self, program_dump, program_start=None):
+        """
+        Shrink a tokenized BASIC program dump: Remove comments and spaces
+        and merge lines that are no jump targets.
+        Returns the new program dump and a CrunchReport, e.g.:
+            program_dump, report = api.crunch_program_dump(program_dump)
+            print(report.bytes_saved)
+        """
         if program_start is None:
             program_start = self.DEFAULT_PROGRAM_START
-        return self.listing.pformat_program_dump(program_dump, program_start)
+        with self.stats.call() as stats:
+            with stats.stage("crunch"):
+                new_program_dump, report = self.crunch_tool.crunch(program_dump, program_start, self.listing)
+            stats.count("lines", report.old_lines)
+            stats.set("bytes_in", len(program_dump))
+            stats.set("bytes_out", len(new_program_dump))
+        log.info("crunch: %s", report)
+        return new_program_dump, report
+
+    def minify_variables(self, basic_program_ascii):
+        """
+        Rename all variables of the ASCII listing to the shortest names.
+        Returns the new listing and a MinifyResult, e.g.:
+            listing, result = api.minify_variables(listing)
+            result.renames, result.collisions
+        """
+        parser = BASICParser()
+        with self.stats.call() as stats:
+            with stats.stage("minify"):
+                new_listing, result = self.variable_minifier.minify(basic_program_ascii, parser)
+            stats.count("regex_splits", parser.split_count)
+            stats.set("bytes_in", len(basic_program_ascii))
+            stats.set("bytes_out", len(new_listing))
+        return new_listing, result
+
+    def optimize_numbers(self, basic_program_ascii, hot_lines=None):
+        """
+        Fold constant expressions, rewrite large integers into &H numbers and
+        hoist repeated numbers of the hot lines into variables.
+        Returns the new listing and a NumberOptimizerResult, e.g.:
+            listing, result = api.optimize_numbers(listing)
+            result.cycles_saved
+        """
+        parser = BASICParser()
+        with self.stats.call() as stats:
+            with stats.stage("optimize"):
+                new_listing, result = self.number_optimizer.optimize(basic_program_ascii, hot_lines, parser)
+            stats.count("regex_splits", parser.split_count)
+            stats.set("bytes_in", len(basic_program_ascii))
+            stats.set("bytes_out", len(new_listing))
+        return new_listing, result
+
+    def xref_ascii_listing(self, content):
+        """
+        Returns the CrossReference of all jumps (GOTO, GOSUB, THEN, ELSE, ON...)
+        in the ASCII listing, e.g.:
+            xref.get_targets(line_no), xref.get_callers(line_no), xref.missing_targets
+        """
+        index = self.renum_tool.create_index(content)
+        return CrossReference.from_line_targets(index.iter_line_targets())
+
+    def xref_program_dump(self, program_dump, program_start=None):
+        """
+        Returns the CrossReference of all jumps in a tokenized BASIC program dump.
+        """
+        if program_start is None:
+            program_start = self.DEFAULT_PROGRAM_START
+        return CrossReference.from_line_targets(
+            self.token_renum_tool.iter_line_targets(program_dump, program_start, self.listing)
+        )
+
+    def analyze_jump_hops(self, program_dump, program_start=None, weights=None):
+        """
+        Returns the HopAnalysis of a tokenized BASIC program dump: The estimated
+        link hops of the line search of every jump, e.g.:
+            analysis = api.analyze_jump_hops(program_dump, weights={line_no: runs})
+            analysis.total_hops, analysis.get_target_hops()
+        """
+        if program_start is None:
+            program_start = self.DEFAULT_PROGRAM_START
+        return self.subroutine_relocator.analyze(program_dump, program_start, self.listing, weights)
 
-    def renum_ascii_listing(self, content):
-        return self.renum_tool.renum(content)
+    def relocate_subroutines(
+        self, program_dump, program_start=None, weights=None, max_subroutines=None, new_start=10, step=10
+    ):
+        """
+        Move the most called subroutines of a tokenized BASIC program dump to
+        the front of the program and renumber it.
+        Returns the new program dump and a RelocationReport, e.g.:
+            program_dump, report = api.relocate_subroutines(program_dump)
+            print(report.hops_saved)
+        """
+        if program_start is None:
+            program_start = self.DEFAULT_PROGRAM_START
+        with self.stats.call() as stats:
+            with stats.stage("relocate"):
+                new_program_dump, report = self.subroutine_relocator.relocate(
+                    program_dump, program_start, self.listing, weights, max_subroutines, new_start, step
+                )
+            stats.count("subroutines", len(report.moved))
+            stats.set("bytes_in", len(program_dump))
+            stats.set("bytes_out", len(new_program_dump))
+        log.info("relocate: %s", report)
+        return new_program_dump, report
 
     def reformat_ascii_listing(self, basic_program_ascii):
 
@@ -112,15 +324,14 @@ class BaseAPI:
 
         ascii_lines = []
         for line_no, code_objects in sorted(parsed_lines.items()):
-            print()
-            print(line_no, code_objects)
+            log.debug("%s %r", line_no, code_objects)
             basic_line = BasicLine(self.token_util)
             basic_line.code_objects_load(line_no, code_objects)
 
-            print(basic_line)
+            log.debug("%r", basic_line)
             basic_line.reformat()
             new_line = basic_line.get_content()
-            print(new_line)
+            log.debug("%s", new_line)
             ascii_lines.append(new_line)
 
         return "\n".join(ascii_lines)
@@ -134,19 +345,20 @@ class BaseAPI:
         if exec_address is None:
             exec_address = self.DEFAULT_PROGRAM_START
 
-        tokenised_dump = self.ascii_listing2program_dump(basic_program_ascii, load_address)
-        log.debug(type(tokenised_dump))
-        log.debug(repr(tokenised_dump))
-        log_bytes(tokenised_dump, msg="tokenised: %s")
-
-        binary_file = BinaryFile()
-        binary_file.load_tokenised_dump(
-            tokenised_dump,
-            load_address=load_address,
-            exec_address=exec_address,
-        )
-        binary_file.debug2log(level=logging.CRITICAL)
-        data = binary_file.dump_DragonDosBinary()
+        with self.stats.call() as stats:
+            tokenised_dump = self.ascii_listing2program_dump(basic_program_ascii, load_address)
+            log_bytes(tokenised_dump, msg="tokenised: %s")
+
+            with stats.stage("pack"):
+                binary_file = BinaryFile()
+                binary_file.load_tokenised_dump(
+                    tokenised_dump,
+                    load_address=load_address,
+                    exec_address=exec_address,
+                )
+                binary_file.debug2log(level=logging.DEBUG)
+                data = binary_file.dump_DragonDosBinary()
+            stats.set("bytes_out", len(data))
         return data
 
     def bin2bas(self, data):
@@ -154,26 +366,30 @@ class BaseAPI:
         convert binary files to a ASCII basic string.
         Supported are:
             * Dragon DOS Binary Format
-            * TODO: CoCo DECB (Disk Extended Color BASIC) Format
+            * CoCo DECB (Disk Extended Color BASIC) Format: the program in the first segment
 
         see:
         http://archive.worldofdragon.org/phpBB3/viewtopic.php?f=8&t=348&p=10139#p10139
+
+        The data can be any buffer (bytes, bytearray, mmap, memoryview...):
+        The program is detokenized directly from it, without copying it.
         """
-        data = bytearray(data)
+        with self.stats.call() as stats:
+            with stats.stage("unpack"):
+                binary_file = BinaryFile()
+                binary_file.load_from_bin(data)
 
-        binary_file = BinaryFile()
-        binary_file.load_from_bin(data)
+            if binary_file.file_type not in (None, 0x01):
+                log.error("ERROR: file type $%02X is not $01 (tokenised BASIC)!", binary_file.file_type)
 
-        if binary_file.file_type != 0x01:
-            log.error("ERROR: file type $%02X is not $01 (tokenised BASIC)!", binary_file.file_type)
-
-        ascii_lines = self.program_dump2ascii_lines(
-            dump=binary_file.data,
-            # FIXME:
-            # program_start=bin.exec_address
-            program_start=binary_file.load_address,
-        )
-        return "\n".join(ascii_lines)
+            ascii_listing = self.program_dump2ascii(
+                dump=binary_file.data,
+                # FIXME:
+                # program_start=bin.exec_address
+                program_start=binary_file.load_address,
+            )
+            stats.set("bytes_in", len(data))
+        return ascii_listing
 
 
 class Dragon32API(BaseAPI):
@@ -189,6 +405,9 @@ class Dragon32API(BaseAPI):
     # Default memory location of BASIC listing start
     DEFAULT_PROGRAM_START = 0x1E01
 
+    # Supports &H numbers (Dragon BASIC and CoCo Extended Color BASIC)
+    HEX_LITERALS = True
+
 
 class CoCoAPI(Dragon32API):
     """
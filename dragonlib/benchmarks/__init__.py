@@ -0,0 +1,6 @@
+"""
+    Benchmarks for the BASIC conversion code paths.
+
+    Run e.g.:
+        python -m dragonlib.benchmarks.tokenizer
+"""
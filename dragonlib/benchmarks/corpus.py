@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+"""
+    Benchmark corpus
+    ================
+
+    Synthetic BASIC listings with a configurable size and mix of line
+    kinds, and the real world listing from tests/AUTOLOAD.DWL
+
+    All generated listings are deterministic: The same arguments create
+    always the same listing, so benchmark results are comparable.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import os
+import random
+
+
+AUTOLOAD_DWL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests", "AUTOLOAD.DWL")
+
+LINE_NUMBER_STEP = 10
+
+DEFAULT_MIX = {
+    "code": 4,
+    "string": 2,
+    "data": 1,
+    "rem": 1,
+    "function": 2,
+    "on_goto": 1,
+}
+
+
+def _code_line(rnd, line_numbers):
+    return rnd.choice(
+        (
+            "FOR I=0 TO 255:POKE 1024+I,I:NEXT I",
+            "A=B+C*D-(E/2):B=B+1:IF B>10 THEN {target}",
+            "GOSUB {target}:X=X+1:Y=Y-1",
+            "IF A=1 THEN {target} ELSE {target}",
+            "CLS:SOUND 100,1:GOTO {target}",
+        )
+    ).format(target=rnd.choice(line_numbers))
+
+
+def _string_line(rnd, line_numbers):
+    return rnd.choice(
+        (
+            'PRINT "HELLO WORLD, PRINT AND FOR ARE NO TOKENS HERE"',
+            'A$="FOR I=1 TO 10":B$=A$+" NEXT I"',
+            'PRINT@32,"SCORE:";S;" LIVES:";L',
+            'IF A$="" THEN {target}',
+        )
+    ).format(target=rnd.choice(line_numbers))
+
+
+def _data_line(rnd, line_numbers):
+    values = ",".join(str(rnd.randint(0, 255)) for _ in range(rnd.randint(4, 16)))
+    return rnd.choice(("DATA %s", 'DATA "PRINT",FOR,%s', "READ A,B:DATA %s")) % values
+
+
+def _rem_line(rnd, line_numbers):
+    return rnd.choice(
+        (
+            "REM THIS COMMENT CONTAINS GOTO 10 AND PRINT",
+            "' SHORT COMMENT WITH FOR AND NEXT",
+            "X=1:REM SET X",
+            "Y=2 ' SET Y",
+        )
+    )
+
+
+def _function_line(rnd, line_numbers):
+    return rnd.choice(
+        (
+            "A$=INKEY$:IF A$=\"\" THEN {target}",
+            "X=INT(RND(10)*SIN(Y))+ABS(Z)",
+            "PRINT LEFT$(A$,3);MID$(A$,2,1);RIGHT$(A$,2);STR$(LEN(A$))",
+            "Y=PEEK(65280) AND 127:Z=SQR(Y)+LOG(2)",
+            "PRINT TAB(3);CHR$(65);ASC(\"A\");VAL(\"12\")",
+        )
+    ).format(target=rnd.choice(line_numbers))
+
+
+def _on_goto_line(rnd, line_numbers):
+    targets = ",".join(str(rnd.choice(line_numbers)) for _ in range(rnd.randint(5, 20)))
+    return "ON X %s %s" % (rnd.choice(("GOTO", "GOSUB")), targets)
+
+
+LINE_GENERATORS = {
+    "code": _code_line,
+    "string": _string_line,
+    "data": _data_line,
+    "rem": _rem_line,
+    "function": _function_line,
+    "on_goto": _on_goto_line,
+}
+
+
+def generate_listing(line_count=1000, mix=None, seed=1):
+    """
+    Generate a ASCII BASIC listing with >line_count< lines.
+
+    >mix< is a dict with line kind -> weight, the kinds are the keys
+    of LINE_GENERATORS. All jump targets are existing line numbers.
+
+    >>> print(generate_listing(line_count=3, mix={"rem": 1}))
+    10 REM THIS COMMENT CONTAINS GOTO 10 AND PRINT
+    20 Y=2 ' SET Y
+    30 Y=2 ' SET Y
+    """
+    if mix is None:
+        mix = DEFAULT_MIX
+
+    unknown = set(mix) - set(LINE_GENERATORS)
+    if unknown:
+        raise ValueError("Unknown line kinds: %s" % ", ".join(sorted(unknown)))
+
+    kinds = [kind for kind, weight in mix.items() if weight > 0]
+    if not kinds:
+        raise ValueError("No line kind with a weight > 0 in: %r" % mix)
+    weights = [mix[kind] for kind in kinds]
+
+    rnd = random.Random(seed)
+    line_numbers = range(LINE_NUMBER_STEP, (line_count + 1) * LINE_NUMBER_STEP, LINE_NUMBER_STEP)
+    lines = []
+    for line_number in line_numbers:
+        kind = rnd.choices(kinds, weights)[0]
+        code = LINE_GENERATORS[kind](rnd, line_numbers)
+        lines.append("%i %s" % (line_number, code))
+    return "\n".join(lines)
+
+
+def parse_mix(text):
+    """
+    Parse a line kind mix from the command line.
+
+    >>> parse_mix("code=2, rem=1")
+    {'code': 2, 'rem': 1}
+    """
+    mix = {}
+    for part in text.split(","):
+        kind, sep, weight = part.partition("=")
+        if not sep:
+            raise ValueError("Mix part %r is not in the form: kind=weight" % part)
+        kind = kind.strip()
+        if kind not in LINE_GENERATORS:
+            raise ValueError("Unknown line kind %r (choices: %s)" % (kind, ", ".join(LINE_GENERATORS)))
+        mix[kind] = int(weight)
+    return mix
+
+
+def load_autoload_dwl(api):
+    """
+    Returns the ASCII listing of the bundled tests/AUTOLOAD.DWL
+    """
+    with open(AUTOLOAD_DWL_PATH, "rb") as f:
+        data = f.read()
+    return api.bin2bas(data)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+"""
+    Benchmark: replace token sequences
+    ==================================
+
+    Compare list_multi_replace() with the old element by element
+    list_replace() called once per rule, on a long token stream.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import timeit
+
+from dragonlib.api import Dragon32API
+from dragonlib.utils.iter_utils import list_multi_replace
+
+
+def old_list_replace(iterable, src, dst):
+    """
+    The old iter_utils.list_replace() implementation
+    """
+    result = []
+    iterable = list(iterable)
+
+    try:
+        dst = list(dst)
+    except TypeError:  # e.g.: int
+        dst = [dst]
+
+    src = list(src)
+    src_len = len(src)
+    index = 0
+    while index < len(iterable):
+        element = iterable[index]
+        if iterable[index:index + src_len] == src:
+            result += dst
+            index += src_len
+        else:
+            result.append(element)
+            index += 1
+    return result
+
+
+def get_tokens(token_util, line_count):
+    code = ":".join(
+        (
+            "A$=INKEY$:IF A$=\"\" GO TO 10 ELSE GO SUB 100",
+            "PRINT MID$( A$, 1, 2 ): 'COMMENT",
+            "FOR I=1 TO 10:NEXT",
+        )[no % 3]
+        for no in range(line_count)
+    )
+    return token_util.ascii2token(code.replace("'", ":'").replace("ELSE", ":ELSE"))
+
+
+def benchmark(rules, tokens, number=5):
+    """
+    Returns the best run time in seconds of the old and the new replace.
+    """
+
+    def old():
+        result = tokens
+        for src, dst in rules:
+            result = old_list_replace(result, src, dst)
+        return result
+
+    def new():
+        return list_multi_replace(tokens, rules)
+
+    assert old() == new()
+
+    old_time = min(timeit.repeat(old, number=number, repeat=3))
+    new_time = min(timeit.repeat(new, number=number, repeat=3))
+    return old_time, new_time
+
+
+def main():
+    token_util = Dragon32API().token_util
+    tokens = get_tokens(token_util, line_count=3000)
+    print("%i tokens:" % len(tokens))
+    for name, rules in (
+        ("token_load", token_util.tokens_replace_rules),
+        ("reformat", token_util.reformat_replace_rules),
+    ):
+        old_time, new_time = benchmark(rules, tokens)
+        print(
+            "%-12s old: %.3fsec. - new: %.3fsec. - speedup: %.1fx" % (name, old_time, new_time, old_time / new_time)
+        )
+
+
+if __name__ == "__main__":
+    main()
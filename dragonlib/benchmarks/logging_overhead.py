@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+"""
+    Benchmark: logging overhead
+    ===========================
+
+    Run bas2bin() and bin2bas() once with the dragonlib loggers at WARNING
+    (production: diagnostics are off) and once at DEBUG into a NullHandler
+    (all diagnostics are formatted, but thrown away).
+
+    The difference is the runtime that is spend only to build diagnostics.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import logging
+import timeit
+
+from dragonlib.api import Dragon32API
+
+
+LISTING_LINES = (
+    'PRINT "HELLO WORLD"',
+    'A$=INKEY$:IF A$="" THEN {line_no} ELSE PRINT STR$(LEN(A$))',
+    "FOR I=0 TO 255:POKE 1024+I,I:NEXT I",
+    "ON X GOSUB 10,20,30:GOTO 10 ' SELECT",
+)
+
+
+def get_listing(line_count):
+    return "\n".join(
+        "%i %s" % (line_no, LISTING_LINES[line_no % len(LISTING_LINES)].format(line_no=line_no))
+        for line_no in range(1, line_count + 1)
+    )
+
+
+def _measure(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3))
+
+
+def benchmark(line_count=500, number=3):
+    """
+    Returns a dict with the best run times of bas2bin() and bin2bas()
+    at WARNING and DEBUG log level.
+    """
+    api = Dragon32API()
+    listing = get_listing(line_count)
+
+    logger = logging.getLogger("dragonlib")
+    old_level = logger.level
+    old_handlers = logger.handlers
+    old_propagate = logger.propagate
+
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+    try:
+        data = api.bas2bin(listing)
+        results = {}
+        for level in (logging.WARNING, logging.DEBUG):
+            logger.setLevel(level)
+            level_name = logging.getLevelName(level)
+            results["bas2bin %s" % level_name] = _measure(lambda: api.bas2bin(listing), number)
+            results["bin2bas %s" % level_name] = _measure(lambda: api.bin2bas(data), number)
+    finally:
+        logger.setLevel(old_level)
+        logger.handlers = old_handlers
+        logger.propagate = old_propagate
+
+    return results
+
+
+def main():
+    results = benchmark()
+    for func_name in ("bas2bin", "bin2bas"):
+        production = results["%s WARNING" % func_name]
+        debug = results["%s DEBUG" % func_name]
+        print(
+            "%s: WARNING: %.3fsec. - DEBUG: %.3fsec. -> %.0f%% of the DEBUG runtime is logging"
+            % (func_name, production, debug, (debug - production) / debug * 100)
+        )
+
+
+if __name__ == "__main__":
+    main()
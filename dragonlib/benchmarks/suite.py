@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""
+    Benchmark suite
+    ===============
+
+    Time the main API functions of all BASIC dialects with the synthetic
+    and the real world corpus. The results are a JSON serializable dict
+    with the best run time, lines/second, bytes/second and the peak
+    memory usage of every API function.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import json
+import time
+import tracemalloc
+
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing, load_autoload_dwl
+
+
+API_CLASSES = (Dragon32API, CoCoAPI)
+
+OPERATIONS = (
+    # name, input type
+    ("parse_ascii_listing", "ascii"),
+    ("ascii_listing2program_dump", "ascii"),
+    ("program_dump2ascii_lines", "dump"),
+    ("renum_ascii_listing", "ascii"),
+    ("reformat_ascii_listing", "ascii"),
+    ("bas2bin", "ascii"),
+    ("bin2bas", "bin"),
+)
+
+
+def best_time(func, repeat):
+    """
+    Returns the fastest run time in seconds of >repeat< calls.
+    """
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def peak_memory(func):
+    """
+    Returns the peak of allocated memory in bytes while func() runs.
+    Measured in a separate run, because tracemalloc slows down the code.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        base_size = tracemalloc.get_traced_memory()[0]
+        func()
+        peak_size = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return peak_size - base_size
+
+
+def benchmark_corpus(api, listing, repeat=3):
+    """
+    Benchmark all OPERATIONS of the given API instance with one listing.
+    """
+    inputs = {
+        "ascii": listing,
+        "dump": api.ascii_listing2program_dump(listing),
+        "bin": api.bas2bin(listing),
+    }
+    line_count = listing.count("\n") + 1
+
+    results = {}
+    for name, input_type in OPERATIONS:
+        func = getattr(api, name)
+        data = inputs[input_type]
+
+        def call(func=func, data=data):
+            return func(data)
+
+        seconds = best_time(call, repeat)
+        if input_type == "ascii":
+            byte_count = len(data.encode("latin-1"))
+        else:
+            byte_count = len(data)
+
+        results[name] = {
+            "input": input_type,
+            "bytes": byte_count,
+            "seconds": seconds,
+            "lines_per_second": round(line_count / seconds),
+            "bytes_per_second": round(byte_count / seconds),
+            "peak_memory": peak_memory(call),
+        }
+    return results
+
+
+def run_suite(line_count=1000, mix=None, repeat=3, seed=1):
+    """
+    Run the complete suite: Every API class with the synthetic listing
+    and with the AUTOLOAD.DWL listing.
+    """
+    synthetic_listing = generate_listing(line_count=line_count, mix=mix, seed=seed)
+    autoload_listing = load_autoload_dwl(Dragon32API())
+
+    results = {}
+    for api_class in API_CLASSES:
+        api = api_class()
+        corpus = {}
+        for corpus_name, listing in (("synthetic", synthetic_listing), ("AUTOLOAD.DWL", autoload_listing)):
+            corpus[corpus_name] = {
+                "lines": listing.count("\n") + 1,
+                "results": benchmark_corpus(api, listing, repeat=repeat),
+            }
+        results[api.MACHINE_NAME] = corpus
+    return results
+
+
+def main():
+    print(json.dumps(run_suite(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
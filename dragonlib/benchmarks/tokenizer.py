@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+"""
+    Benchmark: tokenize BASIC code
+    ==============================
+
+    Compare the KeywordTrie based BasicTokenUtil.ascii2token() with the
+    old regex alternation over all keywords.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import re
+import timeit
+
+from dragonlib.api import CoCoAPI, Dragon32API
+
+
+CODE_LINES = (
+    'I$ = INKEY$:IF I$="" THEN 50',
+    'FOR I = 0 TO 255:POKE 1024+(I*2),I:NEXT I',
+    'A=B+C*D-RND(10):SOUND 100,1:PRINT@32,A$;TAB(3);B',
+    'ON X GOSUB 100,200,300:GOTO 10',
+    'IF LEFT$(A$,1)="Y" THEN PRINT "YES" ELSE PRINT "NO"',
+    'CLS:PRINT STRING$(32,"*"):X=PEEK(65280) AND 127',
+)
+
+
+class RegexTokenizer:
+    """
+    The old BasicTokenUtil.ascii2token() implementation
+    """
+
+    def __init__(self, token_util):
+        self.ascii2token_dict = token_util.ascii2token_dict
+        regex = r"(%s)" % "|".join(
+            [re.escape(statement) for statement in sorted(self.ascii2token_dict, key=len, reverse=True)]
+        )
+        self.regex = re.compile(regex)
+
+    def ascii2token(self, ascii_code):
+        tokens = []
+        for part in self.regex.split(ascii_code):
+            if not part:
+                continue
+
+            if part in self.ascii2token_dict:
+                new_token = self.ascii2token_dict[part]
+                if new_token > 0xFF:
+                    tokens.append(new_token >> 8)
+                    tokens.append(new_token & 0xFF)
+                else:
+                    tokens.append(new_token)
+            else:
+                tokens += [ord(char) for char in part]
+        return tokens
+
+
+def get_code(line_count):
+    return ":".join(CODE_LINES[no % len(CODE_LINES)] for no in range(line_count))
+
+
+def benchmark(api_class, line_count=5000, number=10):
+    """
+    Returns the best run time in seconds of the regex and trie tokenizer.
+    """
+    token_util = api_class().token_util
+    regex_tokenizer = RegexTokenizer(token_util)
+    keyword_trie = token_util.keyword_trie
+    code = get_code(line_count)
+
+    assert regex_tokenizer.ascii2token(code) == list(keyword_trie.tokenize(code))
+
+    regex_time = min(timeit.repeat(lambda: regex_tokenizer.ascii2token(code), number=number, repeat=3))
+    trie_time = min(timeit.repeat(lambda: list(keyword_trie.tokenize(code)), number=number, repeat=3))
+    return regex_time, trie_time
+
+
+def main():
+    for api_class in (Dragon32API, CoCoAPI):
+        regex_time, trie_time = benchmark(api_class)
+        print(
+            "%-12s regex: %.3fsec. - trie: %.3fsec. - speedup: %.2fx"
+            % (api_class.__name__, regex_time, trie_time, regex_time / trie_time)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+import rich_click as click
+from rich import print  # noqa
+
+from dragonlib.benchmarks.corpus import DEFAULT_MIX, parse_mix
+from dragonlib.benchmarks.suite import run_suite
+from dragonlib.cli_app import cli
+
+
+@cli.command()
+@click.option('--lines', default=1000, show_default=True, help='Line count of the synthetic listing')
+@click.option(
+    '--mix',
+    default=','.join(f'{kind}={weight}' for kind, weight in DEFAULT_MIX.items()),
+    show_default=True,
+    help='Weights of the line kinds in the synthetic listing',
+)
+@click.option('--repeat', default=3, show_default=True, help='Run every function n times and use the fastest run')
+@click.option('--seed', default=1, show_default=True, help='Random seed for the synthetic listing')
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    default=None,
+    help='Write the JSON results into this file, instead of printing them',
+)
+def bench(lines: int, mix: str, repeat: int, seed: int, output: Path | None):
+    """
+    Benchmark the API functions with a synthetic and real BASIC listing
+    """
+    try:
+        line_mix = parse_mix(mix)
+    except ValueError as err:
+        raise click.BadParameter(str(err), param_hint='--mix')
+
+    results = run_suite(line_count=lines, mix=line_mix, repeat=repeat, seed=seed)
+    json_results = json.dumps(results, indent=4)
+    if output:
+        output.write_text(json_results)
+        print(f'Benchmark results written to: {output}')
+    else:
+        click.echo(json_results)
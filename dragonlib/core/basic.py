@@ -12,10 +12,16 @@
 
 import logging
 import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from types import MappingProxyType
 
 from dragonlib.core import basic_parser
-from dragonlib.utils.byte_word_values import word2bytes
-from dragonlib.utils.iter_utils import list_replace
+from dragonlib.core.keyword_trie import KeywordTrie
+from dragonlib.utils.byte_word_values import as_memoryview, word2bytes
+from dragonlib.utils.iter_utils import list_multi_replace
 from dragonlib.utils.logging_utils import log_program_dump, pformat_byte_hex_list
 
 
@@ -23,14 +29,49 @@ log = logging.getLogger(__name__)
 
 
 class BasicTokenUtil:
+    """
+    All derived tables of one BASIC dialect.
+
+    Build it via get_token_util(), so every BASIC dialect is only prepared
+    once per process and the instance is shared. Therefore all tables are
+    read-only.
+    """
+
     def __init__(self, basic_token_dict):
-        self.basic_token_dict = basic_token_dict
-        self.ascii2token_dict = {code: token for token, code in list(basic_token_dict.items())}
+        self.basic_token_dict = MappingProxyType(dict(basic_token_dict))
+        self.ascii2token_dict = MappingProxyType({code: token for token, code in basic_token_dict.items()})
+        self.keyword_trie = KeywordTrie(
+            {code: word2bytes(token) if token > 0xFF else (token,) for code, token in self.ascii2token_dict.items()}
+        )
+
+        # Detokenize tables with one string for every byte value
+        # and one string for every function token (byte after $ff):
+        self.token_table = tuple(self.token2ascii(value) for value in range(0x100))
+        self.function_token_table = tuple(basic_token_dict.get(0xFF00 + value, "") for value in range(0x100))
+
+        try:
+            colon_token = self.ascii2token_dict[":"]
+        except KeyError:  # XXX: Always not defined as token?
+            colon_token = ord(":")
+        rem_token = self.ascii2token_dict["'"]
+        else_token = self.ascii2token_dict["ELSE"]
+        self.tokens_replace_rules = (
+            ((colon_token, rem_token), rem_token),
+            ((colon_token, else_token), else_token),
+        )
 
-        regex = r"(%s)" % "|".join(
-            [re.escape(statement) for statement in sorted(list(self.basic_token_dict.values()), key=len, reverse=True)]
+        self.tokens_replace_bytes = tuple((bytes(src), bytes((dst,))) for src, dst in self.tokens_replace_rules)
+
+        # Used in BasicLine.reformat():
+        self.space_token = ord(" ")
+        self.reformat_dont_split_tokens = frozenset(self.ascii2token(":()+-*/^<=>"))
+        self.reformat_split_tokens = frozenset(
+            token for token in basic_token_dict if token not in self.reformat_dont_split_tokens
+        )
+        self.reformat_replace_rules = tuple(
+            (tuple(self.ascii2token(src)), tuple(self.ascii2token(dst)))
+            for src, dst in (("GO TO", "GOTO"), ("GO SUB", "GOSUB"), (": ", ":"), ("( ", "("), (", ", ","))
         )
-        self.regex = re.compile(regex)
 
     def token2ascii(self, value):
         try:
@@ -43,18 +84,47 @@ class BasicTokenUtil:
         return result
 
     def tokens2ascii(self, values):
-        line = ""
-        old_value = None
-        for value in values:
-            if value == 0xFF:
-                old_value = value
-                continue
-            if old_value is not None:
-                value = (old_value << 8) + value
-                old_value = None
-            code = self.token2ascii(value)
-            line += code
-        return line
+        try:
+            data = bytes(values)
+        except ValueError:  # e.g.: a function token value > 0xFF
+            return "".join(self.token2ascii(value) for value in self.iter_token_values(values))
+        return self.detokenize(data)
+
+    def detokenize(self, data):
+        """
+        Convert tokenized bytes (bytes, bytearray, memoryview) into ASCII
+        via the precomputed detokenize tables.
+
+        >>> from dragonlib.dragon32.basic_tokens import DRAGON32_BASIC_TOKENS
+        >>> BasicTokenUtil(DRAGON32_BASIC_TOKENS).detokenize(b"A$=\\xff\\x9a:\\x87A$")
+        'A$=INKEY$:PRINTA$'
+        """
+        text = bytes(data).decode("latin-1")
+        token_table = self.token_table
+        if "\xff" not in text:
+            return text.translate(token_table)
+
+        function_token_table = self.function_token_table
+        parts = text.split("\xff")
+        result = [parts[0].translate(token_table)]
+        for part in parts[1:]:
+            if part:
+                result.append(function_token_table[ord(part[0])])
+                result.append(part[1:].translate(token_table))
+        return "".join(result)
+
+    def load_line_code(self, tokens):
+        """
+        Returns the line code bytes from the tokens of a program dump line:
+        Strip the \\x00 line end and apply the tokens replace rules.
+        """
+        assert tokens[-1] == 0x00, "line code {} doesn't ends with \\x00: {}".format(
+            repr(bytes(tokens)), repr(tokens[-1])
+        )
+        line_code = bytes(tokens[:-1])  # rstrip \x00
+        for src, dst in self.tokens_replace_bytes:
+            line_code = line_code.replace(src, dst)
+        return line_code
 
     def chars2tokens(self, chars):
         return [ord(char) for char in chars]
@@ -63,24 +133,8 @@ class BasicTokenUtil:
         """
         TODO: replace no tokens in comments and strings
         """
-        log.info(repr(ascii_code))
-        parts = self.regex.split(ascii_code)
-        log.info(repr(parts))
-        tokens = []
-        for part in parts:
-            if not part:
-                continue
-
-            if part in self.ascii2token_dict:
-                new_token = self.ascii2token_dict[part]
-                log.info("\t%r -> %x", part, new_token)
-                if new_token > 0xFF:
-                    tokens.append(new_token >> 8)
-                    tokens.append(new_token & 0xFF)
-                else:
-                    tokens.append(new_token)
-            else:
-                tokens += self.chars2tokens(part)
+        tokens = list(self.keyword_trie.tokenize(ascii_code))
+        log.debug("ascii2token %r -> %r", ascii_code, tokens)
         return tokens
 
     def code_objects2token(self, code_objects):
@@ -98,7 +152,6 @@ class BasicTokenUtil:
                 See also:
                 http://archive.worldofdragon.org/phpBB3/viewtopic.php?f=8&t=4310&p=11632#p11630
                 """
-                log.info("replace ' and ELSE with :' and :ELSE")
                 content = content.replace("'", ":'")
                 content = content.replace("ELSE", ":ELSE")
                 tokens += self.ascii2token(content)
@@ -141,17 +194,7 @@ class BasicLine:
         self.token_util = token_util
         self.line_number = None
         self.line_code = None
-
-        try:
-            colon_token = self.token_util.ascii2token_dict[":"]
-        except KeyError:  # XXX: Always not defined as token?
-            colon_token = ord(":")
-        rem_token = self.token_util.ascii2token_dict["'"]
-        else_token = self.token_util.ascii2token_dict["ELSE"]
-        self.tokens_replace_rules = (
-            ((colon_token, rem_token), rem_token),
-            ((colon_token, else_token), else_token),
-        )
+        self.tokens_replace_rules = token_util.tokens_replace_rules
 
     def token_load(self, line_number, tokens):
         self.line_number = line_number
@@ -166,10 +209,10 @@ class BasicLine:
         See also:
         http://archive.worldofdragon.org/phpBB3/viewtopic.php?f=8&t=4310&p=11632#p11630
         """
-        for src, dst in self.tokens_replace_rules:
-            log.info("Relace tokens %s with $%02x", pformat_byte_hex_list(src), dst)
+        if log.isEnabledFor(logging.DEBUG):
             log.debug("Before..: %s", pformat_byte_hex_list(tokens))
-            tokens = list_replace(tokens, src, dst)
+        tokens = list_multi_replace(tokens, self.tokens_replace_rules)
+        if log.isEnabledFor(logging.DEBUG):
             log.debug("After...: %s", pformat_byte_hex_list(tokens))
 
         self.line_code = tokens[:-1]  # rstrip \x00
@@ -195,16 +238,9 @@ class BasicLine:
 
     def reformat(self):
         # TODO: Use BASICParser to exclude string/comments etc.
-        space = self.token_util.ascii2token(" ")[0]
-
-        to_split = self.token_util.basic_token_dict.copy()
-        dont_split_tokens = self.token_util.ascii2token(":()+-*/^<=>")
-
-        for token_value in dont_split_tokens:
-            try:
-                del to_split[token_value]
-            except KeyError:  # e.g.: () are not tokens
-                pass
+        space = self.token_util.space_token
+        to_split = self.token_util.reformat_split_tokens
+        dont_split_tokens = self.token_util.reformat_dont_split_tokens
 
         tokens = tuple(self.token_util.iter_token_values(self.line_code))
 
@@ -217,8 +253,6 @@ class BasicLine:
                 next_token = None
 
             if token in to_split:
-                log.debug("X%sX" % to_split[token])
-
                 try:
                     if temp[-1] != space:
                         temp.append(space)
@@ -233,14 +267,9 @@ class BasicLine:
                 if was_token and token == space:
                     was_token = False
                     continue
-                log.debug("Y%rY" % self.token_util.tokens2ascii([token]))
                 temp.append(token)
 
-        temp = list_replace(temp, self.token_util.ascii2token("GO TO"), self.token_util.ascii2token("GOTO"))
-        temp = list_replace(temp, self.token_util.ascii2token("GO SUB"), self.token_util.ascii2token("GOSUB"))
-        temp = list_replace(temp, self.token_util.ascii2token(": "), self.token_util.ascii2token(":"))
-        temp = list_replace(temp, self.token_util.ascii2token("( "), self.token_util.ascii2token("("))
-        temp = list_replace(temp, self.token_util.ascii2token(", "), self.token_util.ascii2token(","))
+        temp = list_multi_replace(temp, self.token_util.reformat_replace_rules)
 
         self.line_code = temp
 
@@ -256,66 +285,315 @@ class BasicLine:
     def __repr__(self):
         return "{!r}: {}".format(self.get_content(), " ".join(["$%02x" % t for t in self.line_code]))
 
-    def log_line(self):
-        log.critical("%r:\n\t%s", self.get_content(), "\n\t".join(self.token_util.pformat_tokens(self.line_code)))
+    def log_line(self, level=logging.DEBUG):
+        if log.isEnabledFor(level):
+            pformated_tokens = "\n\t".join(self.token_util.pformat_tokens(self.line_code))
+            log.log(level, "%r:\n\t%s", self.get_content(), pformated_tokens)
+
+
+class CompactBasicLine:
+    """
+    Memory saving variant of BasicLine: The line code is stored as immutable
+    bytes and there is no reference to the BasicTokenUtil.
+    """
+
+    __slots__ = ("line_number", "line_code")
+
+    def __init__(self, line_number, line_code):
+        self.line_number = line_number
+        self.line_code = bytes(line_code)
+
+    @classmethod
+    def from_basic_line(cls, basic_line):
+        line_code = bytearray()
+        for value in basic_line.line_code:
+            if value > 0xFF:  # e.g.: function token value after BasicLine.reformat()
+                line_code += bytes(word2bytes(value))
+            else:
+                line_code.append(value)
+        return cls(basic_line.line_number, line_code)
+
+    def get_tokens(self):
+        """
+        return two bytes line number + the code
+        """
+        return bytes(word2bytes(self.line_number)) + self.line_code
+
+    def get_content(self, token_util):
+        return "%i %s" % (self.line_number, token_util.detokenize(self.line_code))
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactBasicLine):
+            return NotImplemented
+        return self.line_number == other.line_number and self.line_code == other.line_code
+
+    def __repr__(self):
+        return "<CompactBasicLine {}: {}>".format(self.line_number, " ".join(["$%02x" % t for t in self.line_code]))
+
+
+class BasicProgram:
+    """
+    Holds all lines of a BASIC program in one buffer:
+        * line_numbers: array with all line numbers
+        * offsets: array with the start offset of every line code, plus the end
+        * buffer: bytearray with all line codes (without the \\x00 line end)
+
+    >>> program = BasicProgram()
+    >>> program.append(10, b"\\x87")
+    >>> program.append(20, b"\\x81\\xbc10")
+    >>> len(program)
+    2
+    >>> program[1]
+    <CompactBasicLine 20: $81 $bc $31 $30>
+    >>> program.program_dump(program_start=0x1e01)
+    bytearray(b'\\x1e\\x07\\x00\\n\\x87\\x00\\x1e\\x10\\x00\\x14\\x81\\xbc10\\x00\\x00\\x00')
+    """
+
+    def __init__(self):
+        self.line_numbers = array("H")
+        self.offsets = array("L", (0,))
+        self.buffer = bytearray()
+
+    @classmethod
+    def from_basic_lines(cls, basic_lines):
+        program = cls()
+        for basic_line in basic_lines:
+            if not isinstance(basic_line, CompactBasicLine):
+                basic_line = CompactBasicLine.from_basic_line(basic_line)
+            program.append(basic_line.line_number, basic_line.line_code)
+        return program
+
+    def append(self, line_number, line_code):
+        self.line_numbers.append(line_number)
+        self.buffer += line_code
+        self.offsets.append(len(self.buffer))
+
+    def get_line_code(self, index):
+        """
+        Returns the line code as memoryview into the buffer, without copying it.
+        """
+        return memoryview(self.buffer)[self.offsets[index]:self.offsets[index + 1]]
+
+    def __len__(self):
+        return len(self.line_numbers)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("BasicProgram index out of range")
+        return CompactBasicLine(self.line_numbers[index], self.buffer[self.offsets[index]:self.offsets[index + 1]])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def program_dump(self, program_start):
+        """
+        Assemble the program dump (with next-address chain) with a single join.
+        """
+        if not self.line_numbers:
+            return bytearray()
+
+        view = memoryview(self.buffer)
+        offsets = self.offsets
+        parts = []
+        current_address = program_start
+        for index, line_number in enumerate(self.line_numbers):
+            start = offsets[index]
+            end = offsets[index + 1]
+            # next address + line number + line code + \x00
+            current_address += end - start + 5
+            parts.append(struct.pack(">HH", current_address, line_number))
+            parts.append(view[start:end])
+            parts.append(b"\x00")
+        parts.append(b"\x00\x00")  # program end
+        return bytearray(b"".join(parts))
+
+    def iter_ascii_lines(self, token_util):
+        detokenize = token_util.detokenize
+        for index, line_number in enumerate(self.line_numbers):
+            yield "%i %s" % (line_number, detokenize(self.get_line_code(index)))
+
+
+_TOKEN_UTILS = {}
+
+
+def get_token_util(basic_token_dict):
+    """
+    Returns the shared BasicTokenUtil instance for the given BASIC tokens.
+
+    >>> from dragonlib.dragon32.basic_tokens import DRAGON32_BASIC_TOKENS
+    >>> get_token_util(DRAGON32_BASIC_TOKENS) is get_token_util(DRAGON32_BASIC_TOKENS)
+    True
+    """
+    # Hold a reference to the dict, so that its id can't be reused:
+    key = id(basic_token_dict)
+    try:
+        return _TOKEN_UTILS[key][1]
+    except KeyError:
+        token_util = BasicTokenUtil(basic_token_dict)
+        _TOKEN_UTILS[key] = (basic_token_dict, token_util)
+        return token_util
 
 
 class BasicListing:
     def __init__(self, basic_token_dict):
-        self.token_util = BasicTokenUtil(basic_token_dict)
+        self.token_util = get_token_util(basic_token_dict)
 
-    def dump2basic_lines(self, dump, program_start, basic_lines=None):
-        if basic_lines is None:
-            basic_lines = []
+    def iter_dump_lines(self, dump, program_start):
+        """
+        Walk the next-address chain of a program dump and yield
+        (line number, tokens) tuples. The tokens contains the
+        \x00 line end.
 
+        The dump would not be copied: All tokens are slices of one memoryview,
+        so the costs are linear to the dump size, even for complete RAM images.
+        """
+        dump = as_memoryview(dump)
+        dump_length = len(dump)
+        offset = 0
+
+        debug = log.isEnabledFor(logging.DEBUG)
         log.debug("progam start $%04x", program_start)
-        try:
-            next_address = (dump[0] << 8) + dump[1]
-        except IndexError as err:
-            log.debug("Can't get address: %s", err)
-            return basic_lines
-
-        log.debug("next_address: $%04x", next_address)
-        if next_address == 0x0000:
-            # program end
-            log.debug("return: %s", repr(basic_lines))
-            return basic_lines
-
-        assert next_address > program_start, "Next address ${:04x} not bigger than program start ${:04x} ?!?".format(
-            next_address, program_start
-        )
+        while offset + 2 <= dump_length:
+            next_address = (dump[offset] << 8) + dump[offset + 1]
+            if next_address == 0x0000:
+                # program end
+                return
 
-        line_number = (dump[2] << 8) + dump[3]
-        log.debug("line_number: %i", line_number)
-        length = next_address - program_start
-        log.debug("length: %i", length)
-        tokens = dump[4:length]
-        log.debug("tokens:\n\t%s", "\n\t".join(self.token_util.pformat_tokens(tokens)))
+            assert (
+                next_address > program_start
+            ), "Next address ${:04x} not bigger than program start ${:04x} ?!?".format(next_address, program_start)
 
-        basic_line = BasicLine(self.token_util)
-        basic_line.token_load(line_number, tokens)
-        basic_lines.append(basic_line)
+            line_number = (dump[offset + 2] << 8) + dump[offset + 3]
+            length = next_address - program_start
+            if debug:
+                log.debug("next_address: $%04x line_number: %i length: %i", next_address, line_number, length)
+            yield line_number, dump[offset + 4:offset + length]
 
-        return self.dump2basic_lines(dump[length:], next_address, basic_lines)
+            offset += length
+            program_start = next_address
+
+        log.debug("Can't get address: end of dump at offset %i", offset)
+
+    def iter_basic_lines(self, dump, program_start):
+        """
+        Decode a program dump and yield the BasicLine instances one by one.
+        """
+        debug = log.isEnabledFor(logging.DEBUG)
+        for line_number, tokens in self.iter_dump_lines(dump, program_start):
+            if debug:
+                log.debug("line %i tokens:\n\t%s", line_number, "\n\t".join(self.token_util.pformat_tokens(tokens)))
+            basic_line = BasicLine(self.token_util)
+            basic_line.token_load(line_number, tokens)
+            yield basic_line
+
+    def iter_ascii_lines(self, dump, program_start):
+        """
+        Detokenize a program dump line by line via the detokenize tables,
+        without creating BasicLine instances.
+        """
+        load_line_code = self.token_util.load_line_code
+        detokenize = self.token_util.detokenize
+        for line_number, tokens in self.iter_dump_lines(dump, program_start):
+            yield "%i %s" % (line_number, detokenize(load_line_code(tokens)))
+
+    def dump2basic_lines(self, dump, program_start, basic_lines=None):
+        """
+        Decode a program dump and returns a list of BasicLine instances.
+        """
+        if basic_lines is None:
+            basic_lines = []
+        basic_lines.extend(self.iter_basic_lines(dump, program_start))
+        return basic_lines
 
     def basic_lines2program_dump(self, basic_lines, program_start):
-        program_dump = bytearray()
+        parts = []
         current_address = program_start
-        count = len(basic_lines)
-        for no, line in enumerate(basic_lines, 1):
-            line.log_line()
-            line_tokens = line.get_tokens() + [0x00]
+        for line in basic_lines:
+            line.log_line(level=logging.DEBUG)
+            line_tokens = bytes(line.get_tokens()) + b"\x00"
 
             current_address += len(line_tokens) + 2
             current_address_bytes = word2bytes(current_address)  # e.g.: word2bytes(0xff09) -> (255, 9)
 
-            program_dump += bytearray(current_address_bytes)
+            parts.append(bytes(current_address_bytes))
+            parts.append(line_tokens)
 
-            if no == count:  # It's the last line
-                line_tokens += [0x00, 0x00]
-            program_dump += bytearray(line_tokens)
+        if parts:
+            parts.append(b"\x00\x00")  # program end
+        return bytearray(b"".join(parts))
 
-        return program_dump
+    def iter_tokenized_lines(self, ascii_listing, parser=None, token_cache=None, dialect=None):
+        """
+        Parse and tokenize a ASCII listing in one pass: yield the line number
+        and the line code bytes of every line, in listing order.
+        No code objects or BasicLine instances are created.
+
+        With a TokenCache, only lines with a new content are tokenized.
+        >dialect< is the cache key for the BASIC dialect, e.g.: "Dragon32"
+        """
+        if parser is None:
+            parser = basic_parser.BASICParser()
+        tokenize = self.token_util.keyword_trie.tokenize
+        code_type = basic_parser.CODE_TYPE_CODE
+        debug = log.isEnabledFor(logging.DEBUG)
+        for line_number, start, end in parser.iter_lines(ascii_listing):
+            if token_cache is not None:
+                # Normalize the cache key: Trailing blanks are stored as they are,
+                # so they are appended to the cached line code.
+                content = ascii_listing[start:end].rstrip(" \t")
+                trailing = ascii_listing[start + len(content):end].encode("latin-1")
+                end = start + len(content)
+                line_code = token_cache.get(dialect, content)
+                if line_code is not None:
+                    yield line_number, line_code + trailing
+                    continue
+
+            line_code = []
+            for part_type, part_start, part_end in parser.split_line(ascii_listing, start, end):
+                part = ascii_listing[part_start:part_end]
+                if part_type == code_type:
+                    # The BASIC interpreter stores ' and ELSE as :' and :ELSE
+                    # see also: BasicTokenUtil.code_objects2token()
+                    line_code.append(tokenize(part.replace("'", ":'").replace("ELSE", ":ELSE")))
+                else:
+                    # Strings, Comments or DATA
+                    line_code.append(part.encode("latin-1"))
+            line_code = b"".join(line_code)
+            if debug:
+                log.debug(
+                    "%r:\n\t%s",
+                    "%i %s" % (line_number, self.token_util.detokenize(line_code)),
+                    "\n\t".join(self.token_util.pformat_tokens(line_code)),
+                )
+            if token_cache is not None:
+                token_cache.set(dialect, content, line_code)
+                line_code += trailing
+            yield line_number, line_code
+
+    def ascii_listing2basic_program(self, ascii_listing, parser=None, token_cache=None, dialect=None):
+        """
+        Parse and tokenize a ASCII listing into a BasicProgram.
+        Like BASICParser.parse(): The lines are sorted and if a line number
+        exists more than once, the last line wins.
+        """
+        lines = dict(self.iter_tokenized_lines(ascii_listing, parser, token_cache, dialect))
+        program = BasicProgram()
+        for line_number in sorted(lines):
+            program.append(line_number, lines[line_number])
+        return program
+
+    def dump2basic_program(self, dump, program_start):
+        """
+        Decode a program dump into a BasicProgram
+        """
+        load_line_code = self.token_util.load_line_code
+        program = BasicProgram()
+        for line_number, tokens in self.iter_dump_lines(dump, program_start):
+            program.append(line_number, load_line_code(tokens))
+        return program
 
     def ascii_listing2basic_lines(self, txt):
         basic_lines = []
@@ -327,47 +605,55 @@ class BasicListing:
                 basic_lines.append(basic_line)
         return basic_lines
 
-    def pformat_program_dump(self, program_dump, program_start, formated_dump=None):
+    def iter_pformat_program_dump(self, program_dump, program_start):
         """
         format a BASIC program dump. Useful for debugging.
-        returns a list of formated string lines.
+        yields the formated string lines while walking the next-address chain.
         """
-        if formated_dump is None:
-            formated_dump = []
-            formated_dump.append("program start address: $%04x" % program_start)
-
-        assert isinstance(program_dump, bytearray)
-
-        if not program_dump:
-            return program_dump
+        yield "program start address: $%04x" % program_start
 
-        try:
-            next_address = (program_dump[0] << 8) + program_dump[1]
-        except IndexError as err:
-            raise IndexError(
-                "Can't get next address from: {} program start: ${:04x} (Origin error: {})".format(
-                    repr(program_dump), program_start, err
+        program_dump = as_memoryview(program_dump)
+        dump_length = len(program_dump)
+        offset = 0
+        while offset < dump_length:
+            try:
+                next_address = (program_dump[offset] << 8) + program_dump[offset + 1]
+            except IndexError as err:
+                raise IndexError(
+                    "Can't get next address from: {} program start: ${:04x} (Origin error: {})".format(
+                        repr(bytes(program_dump[offset:])), program_start, err
+                    )
                 )
-            )
 
-        if next_address == 0x0000:
-            formated_dump.append("$%04x -> end address" % next_address)
-            return formated_dump
+            if next_address == 0x0000:
+                yield "$%04x -> end address" % next_address
+                return
 
-        assert next_address > program_start, "Next address ${:04x} not bigger than program start ${:04x} ?!?".format(
-            next_address, program_start
-        )
+            assert (
+                next_address > program_start
+            ), "Next address ${:04x} not bigger than program start ${:04x} ?!?".format(next_address, program_start)
+
+            length = next_address - program_start
+            yield "$%04x -> next address (length: %i)" % (next_address, length)
+            line_number = (program_dump[offset + 2] << 8) + program_dump[offset + 3]
+            yield "$%04x -> %i (line number)" % (line_number, line_number)
 
-        length = next_address - program_start
-        formated_dump.append("$%04x -> next address (length: %i)" % (next_address, length))
-        line_number = (program_dump[2] << 8) + program_dump[3]
-        formated_dump.append("$%04x -> %i (line number)" % (line_number, line_number))
+            tokens = program_dump[offset + 4:offset + length]
+            yield "tokens:"
+            yield from self.token_util.pformat_tokens(tokens)
 
-        tokens = program_dump[4:length]
-        formated_dump.append("tokens:")
-        formated_dump += self.token_util.pformat_tokens(tokens)
+            offset += length
+            program_start = next_address
 
-        return self.pformat_program_dump(program_dump[length:], next_address, formated_dump)
+    def pformat_program_dump(self, program_dump, program_start, formated_dump=None):
+        """
+        format a BASIC program dump. Useful for debugging.
+        returns a list of formated string lines.
+        """
+        if formated_dump is None:
+            formated_dump = []
+        formated_dump.extend(self.iter_pformat_program_dump(program_dump, program_start))
+        return formated_dump
 
     def debug_listing(self, basic_lines):
         for line in basic_lines:
@@ -387,12 +673,168 @@ class BasicListing:
     #             for code_object in code_objects:
 
     def program_dump2ascii_lines(self, dump, program_start):
-        basic_lines = self.dump2basic_lines(dump, program_start)
-        log.info("basic_lines: %s", repr(basic_lines))
-        ascii_lines = []
-        for line in basic_lines:
-            ascii_lines.append(line.get_content())
-        return ascii_lines
+        return list(self.iter_ascii_lines(dump, program_start))
+
+    def program_dump2ascii(self, dump, program_start):
+        """
+        Detokenize a complete program dump into one ASCII listing string.
+        """
+        return "\n".join(self.iter_ascii_lines(dump, program_start))
+
+
+MAX_LINE_NUMBER = 63999
+
+
+class RenumPlan:
+    """
+    The line number mapping of a RENUM new,old,step command, computed once
+    and used for the line headers and the jump targets.
+
+    Only the lines from >old_start< to >old_end< are renumbered (in program
+    order), all other lines keep their numbers. Collisions with the unchanged
+    lines are found via the sorted line numbers. Collisions and line
+    numbers > 63999 raise a ValueError, before anything is changed.
+
+    >>> plan = RenumPlan([10, 20, 30, 40], new_start=21, old_start=30, step=5)
+    >>> plan.renum_dict
+    {10: 10, 20: 20, 30: 21, 40: 26}
+    >>> RenumPlan([10, 20, 30, 40], new_start=15, old_start=30)
+    Traceback (most recent call last):
+        ...
+    ValueError: RENUM collision: new line 15 is not after the unchanged line 20
+    >>> RenumPlan([10, 20], new_start=10, old_start=10, old_end=10, step=20).renum_dict
+    {10: 10, 20: 20}
+    >>> RenumPlan([10, 20], new_start=63990, step=10)
+    Traceback (most recent call last):
+        ...
+    ValueError: RENUM overflow: line 20 would get the number 64000 > 63999
+    """
+
+    def __init__(self, line_numbers, new_start=10, old_start=0, step=10, old_end=None):
+        if step < 1:
+            raise ValueError("RENUM step must be >= 1, not: %i" % step)
+        if not 0 <= new_start <= MAX_LINE_NUMBER:
+            raise ValueError("RENUM new line %i not in range 0-%i" % (new_start, MAX_LINE_NUMBER))
+        if old_end is not None and old_end < old_start:
+            raise ValueError("RENUM range end %i before start %i" % (old_end, old_start))
+
+        if old_end is None:
+            old_end = 0xFFFF
+        self.line_numbers = list(line_numbers)  # in program order
+        renum_numbers = [line_number for line_number in self.line_numbers if old_start <= line_number <= old_end]
+        if renum_numbers:
+            new_end = new_start + (len(renum_numbers) - 1) * step
+            if new_end > MAX_LINE_NUMBER:
+                raise ValueError(
+                    "RENUM overflow: line %i would get the number %i > %i"
+                    % (renum_numbers[-1], new_end, MAX_LINE_NUMBER)
+                )
+            # The nearest unchanged lines before and after the range:
+            sorted_numbers = sorted(set(self.line_numbers))
+            first_index = bisect_left(sorted_numbers, old_start)
+            last_index = bisect_right(sorted_numbers, old_end)
+            if first_index > 0 and new_start <= sorted_numbers[first_index - 1]:
+                raise ValueError(
+                    "RENUM collision: new line %i is not after the unchanged line %i"
+                    % (new_start, sorted_numbers[first_index - 1])
+                )
+            if last_index < len(sorted_numbers) and new_end >= sorted_numbers[last_index]:
+                raise ValueError(
+                    "RENUM collision: new line %i is not before the unchanged line %i"
+                    % (new_end, sorted_numbers[last_index])
+                )
+
+        # The new number of every line, in program order:
+        new_numbers = iter(range(new_start, MAX_LINE_NUMBER + 1, step))
+        self.new_line_numbers = [
+            next(new_numbers) if old_start <= line_number <= old_end else line_number
+            for line_number in self.line_numbers
+        ]
+        # If a line number exists more than once, jumps go to the last line:
+        self.renum_dict = dict(zip(self.line_numbers, self.new_line_numbers))
+
+    def __len__(self):
+        return len(self.line_numbers)
+
+
+RenumLine = namedtuple("RenumLine", ("line", "number", "number_end", "jumps"))
+
+
+class RenumIndex:
+    """
+    Line index of a ASCII listing, created in one pass:
+    The line number of every line and the jump statements (GOTO, GOSUB,
+    THEN, ELSE) in the code parts. Strings, DATA and comments are skipped.
+
+    >>> from dragonlib.api import Dragon32API
+    >>> renum_tool = RenumTool(Dragon32API.RENUM_REGEX)
+    >>> index = renum_tool.create_index('10 GOTO 20\\n20 PRINT "GOTO 99":REM GOSUB 98')
+    >>> [(line.number, line.number_end) for line in index.lines]
+    [('10', 2), ('20', 2)]
+    >>> [[match.group("no") for match in line.jumps] for line in index.lines]
+    [['20'], []]
+    """
+
+    line_no_regex = re.compile(r"(?P<no>\d+)")
+
+    def __init__(self, ascii_listing, renum_regex, parser=None):
+        if parser is None:
+            parser = basic_parser.BASICParser()
+        split_line = parser.split_line
+        code_type = basic_parser.CODE_TYPE_CODE
+        match_line_no = self.line_no_regex.match
+        search_jump = renum_regex.search
+        find_jumps = renum_regex.finditer
+
+        self.lines = []
+        append = self.lines.append
+        for line in ascii_listing.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            match = match_line_no(line)
+            if match is None:
+                # line without a line number
+                append(RenumLine(line, None, 0, ()))
+                continue
+
+            number_end = match.end()
+            if search_jump(line, number_end) is None:
+                # The most lines contains no jump: No need to split the line
+                append(RenumLine(line, match.group("no"), number_end, ()))
+                continue
+
+            jumps = []
+            for part_type, start, end in split_line(line, number_end, len(line)):
+                if part_type == code_type and start < end:
+                    jumps.extend(find_jumps(line, start, end))
+            append(RenumLine(line, match.group("no"), number_end, jumps))
+
+    def iter_destinations(self):
+        """
+        yield all line numbers (as strings) that are used in a jump.
+        """
+        for line in self.lines:
+            for match in line.jumps:
+                for number in match.group("no").split(","):
+                    number = number.strip()
+                    if number:
+                        yield number
+
+    def iter_line_targets(self):
+        """
+        yield the line number and the list of jump targets of every line.
+        """
+        for line in self.lines:
+            if line.number is None:
+                continue
+            targets = []
+            for match in line.jumps:
+                for number in match.group("no").split(","):
+                    number = number.strip()
+                    if number.isdigit():
+                        targets.append(int(number))
+            yield int(line.number), targets
 
 
 class RenumTool:
@@ -401,18 +843,51 @@ class RenumTool:
     """
 
     def __init__(self, renum_regex):
-        self.line_no_regex = re.compile(r"(?P<no>\d+)(?P<code>.+)")
         self.renum_regex = re.compile(renum_regex, re.VERBOSE)
+        self.parser = basic_parser.BASICParser()
+        self._index_listing = None
+        self._index = None
 
-    def renum(self, ascii_listing):
-        self.renum_dict = self.create_renum_dict(ascii_listing)
-        log.info("renum: %s", ", ".join(["{}->{}".format(o, n) for o, n in sorted(self.renum_dict.items())]))
+    def create_index(self, ascii_listing):
+        """
+        Returns the RenumIndex of the listing. The index of the last listing
+        is reused, e.g.: for renum() and get_destinations() of the same listing.
+        """
+        if ascii_listing != self._index_listing:
+            self._index = RenumIndex(ascii_listing, self.renum_regex, self.parser)
+            self._index_listing = ascii_listing
+        return self._index
+
+    def renum(self, ascii_listing, new_start=10, old_start=0, step=10, old_end=None):
+        """
+        Renumber the listing like: RENUM new_start,old_start,step
+        Only lines from >old_start< to >old_end< (if given) are renumbered.
+        """
+        index = self.create_index(ascii_listing)
+        plan = self.create_renum_plan(index, new_start, old_start, step, old_end)
+        self.renum_dict = plan.renum_dict
+        new_line_numbers = iter(plan.new_line_numbers)
+        if log.isEnabledFor(logging.INFO):
+            log.info("renum: %s", ", ".join(["{}->{}".format(o, n) for o, n in sorted(self.renum_dict.items())]))
+
+        debug = log.isEnabledFor(logging.DEBUG)
         new_listing = []
-        for new_number, line in enumerate(self._iter_lines(ascii_listing), 1):
-            new_number *= 10
-            line = self.line_no_regex.sub(r"%s\g<code>" % new_number, line)
-            new_line = self.renum_regex.sub(self.renum_inline, line)
-            log.debug("%r -> %r", line, new_line)
+        for indexed_line in index.lines:
+            line = indexed_line.line
+            if indexed_line.number is None:
+                new_listing.append(line)
+                continue
+
+            parts = [str(next(new_line_numbers))]
+            pos = indexed_line.number_end
+            for match in indexed_line.jumps:
+                parts.append(line[pos:match.start()])
+                parts.append(self.renum_inline(match))
+                pos = match.end()
+            parts.append(line[pos:])
+            new_line = "".join(parts)
+            if debug:
+                log.debug("%r -> %r", line, new_line)
             new_listing.append(new_line)
         return "\n".join(new_listing)
 
@@ -420,27 +895,13 @@ class RenumTool:
         """
         returns all line numbers that are used in a jump.
         """
-        self.destinations = set()
-
-        def collect_destinations(matchobj):
-            numbers = matchobj.group("no")
-            if numbers:
-                self.destinations.update({n.strip() for n in numbers.split(",")})
-
-        for line in self._iter_lines(ascii_listing):
-            self.renum_regex.sub(collect_destinations, line)
-
-        return sorted([int(no) for no in self.destinations if no])
-
-    def _iter_lines(self, ascii_listing):
-        lines = ascii_listing.splitlines()
-        lines = [line.strip() for line in lines if line.strip()]
-        yield from lines
+        self.destinations = set(self.create_index(ascii_listing).iter_destinations())
+        return sorted([int(no) for no in self.destinations])
 
     def _get_new_line_number(self, line, old_number):
         try:
-            new_number = "%s" % self.renum_dict[old_number]
-        except KeyError:
+            new_number = "%s" % self.renum_dict[int(old_number)]
+        except (KeyError, ValueError):
             log.error("Error in line '%s': line no. '%s' doesn't exist.", line, old_number)
             new_number = old_number
         return new_number
@@ -448,6 +909,9 @@ class RenumTool:
     def renum_inline(self, matchobj):
         #         log.critical(matchobj.groups())
         old_numbers = matchobj.group("no")
+        if not old_numbers.strip():
+            # No line number, e.g.: IF A$="X" THEN DLOAD
+            return matchobj.group(0)
         if old_numbers[-1] == " ":
             # e.g.: space before comment: ON X GOTO 1,2 ' Comment
             space_after = " "
@@ -457,13 +921,226 @@ class RenumTool:
         new_numbers = [self._get_new_line_number(matchobj.group(0), old_number) for old_number in old_numbers]
         return "".join([matchobj.group("statement"), matchobj.group("space"), ",".join(new_numbers), space_after])
 
-    def create_renum_dict(self, ascii_listing):
-        old_numbers = [match[0] for match in self.line_no_regex.findall(ascii_listing)]
-        renum_dict = {}
-        for new_number, old_number in enumerate(old_numbers, 1):
-            new_number *= 10
-            renum_dict[old_number] = new_number
-        return renum_dict
+    def create_renum_plan(self, index, new_start=10, old_start=0, step=10, old_end=None):
+        line_numbers = (int(indexed_line.number) for indexed_line in index.lines if indexed_line.number is not None)
+        return RenumPlan(line_numbers, new_start, old_start, step, old_end)
+
+    def create_renum_dict(self, index, new_start=10, old_start=0, step=10, old_end=None):
+        """
+        Map the old line numbers to the new line numbers.
+        """
+        return self.create_renum_plan(index, new_start, old_start, step, old_end).renum_dict
+
+
+class TokenRenumTool:
+    """
+    Renumber a tokenized BASIC program dump, without the text round trip:
+    The line headers and the ASCII line numbers after the jump tokens
+    (GOTO, GO TO, GOSUB, THEN, ELSE) are rewritten and the next-address
+    chain is rebuilt. Strings, DATA and comments are not changed.
+
+    >>> from dragonlib.api import Dragon32API
+    >>> api = Dragon32API()
+    >>> dump = api.ascii_listing2program_dump('1 GOTO 5\\n5 PRINT "GOTO 1":GO TO 1 \\'GOTO 5')
+    >>> tool = TokenRenumTool(api.token_util)
+    >>> api.program_dump2ascii(tool.renum(dump, program_start=0x1e01), program_start=0x1e01)
+    '10 GOTO 20\\n20 PRINT "GOTO 1":GO TO 10 \\'GOTO 5'
+    """
+
+    def __init__(self, token_util):
+        self.token_util = token_util
+
+        def token(code):
+            return re.escape(bytes((token_util.ascii2token_dict[code],)))
+
+        self.jump_token_regex = re.compile(b"[%s%s%s]" % (token("GO"), token("THEN"), token("ELSE")))
+        self.line_regex = re.compile(
+            rb"""
+                "[^"]*"?                              # string (maybe not terminated)
+                | (?:%(rem)s|%(rem2)s).*              # comment until the line end
+                | %(data)s(?:"[^"]*"?|[^:"])*         # DATA until : outside a string
+                | \xff.                                # function token
+                | (?P<jump>(?:%(go)s\x20*(?:%(to)s|%(sub)s)|%(then)s|%(else)s)\x20*)
+                  (?P<numbers>[0-9][0-9,\x20]*)
+            """
+            % {
+                b"rem": token("REM"),
+                b"rem2": token("'"),
+                b"data": token("DATA"),
+                b"go": token("GO"),
+                b"to": token("TO"),
+                b"sub": token("SUB"),
+                b"then": token("THEN"),
+                b"else": token("ELSE"),
+            },
+            re.VERBOSE | re.DOTALL,
+        )
+        self.number_regex = re.compile(rb"[0-9]+")
+
+    def create_renum_dict(self, line_numbers, new_start=10, old_start=0, step=10, old_end=None):
+        """
+        Map the old line numbers to the new line numbers.
+        """
+        return RenumPlan(line_numbers, new_start, old_start, step, old_end).renum_dict
+
+    def _renum_number(self, matchobj):
+        old_number = int(matchobj.group())
+        try:
+            new_number = self.renum_dict[old_number]
+        except KeyError:
+            log.error("Error in line %i: line no. '%i' doesn't exist.", self.current_line_number, old_number)
+            return matchobj.group()
+        return b"%i" % new_number
+
+    def _renum_jump(self, matchobj):
+        numbers = matchobj.group("numbers")
+        if numbers is None:
+            # string, comment, DATA or function token: leave it untouched
+            return matchobj.group()
+        return matchobj.group("jump") + self.number_regex.sub(self._renum_number, numbers)
+
+    def iter_jump_targets(self, line_code):
+        """
+        yield the line numbers of all jumps in the line code.
+        """
+        for _jump, target in self.iter_jumps(line_code):
+            yield target
+
+    def iter_jumps(self, line_code):
+        """
+        yield the jump tokens (e.g.: GO SUB, THEN) and the line number
+        of all jumps in the line code.
+        """
+        if self.jump_token_regex.search(line_code) is None:
+            return
+        for matchobj in self.line_regex.finditer(line_code):
+            numbers = matchobj.group("numbers")
+            if numbers is not None:
+                jump = matchobj.group("jump")
+                for number in self.number_regex.findall(numbers):
+                    yield jump, int(number)
+
+    def iter_line_targets(self, dump, program_start, listing=None):
+        """
+        yield the line number and the list of jump targets of every line.
+        """
+        if listing is None:
+            listing = BasicListing(self.token_util.basic_token_dict)
+        for line_number, tokens in listing.iter_dump_lines(dump, program_start):
+            yield line_number, list(self.iter_jump_targets(bytes(tokens)))
+
+    def renum_line_code(self, line_code):
+        """
+        Returns the line code with the new line numbers in all jumps.
+        """
+        if self.jump_token_regex.search(line_code) is None:
+            return line_code
+        return self.line_regex.sub(self._renum_jump, line_code)
+
+    def renum(self, dump, program_start, listing=None, new_start=10, old_start=0, step=10, old_end=None):
+        """
+        Returns the renumbered program dump as bytearray.
+        See RenumPlan for the >new_start<, >old_start<, >step< and >old_end< arguments.
+        """
+        if listing is None:
+            listing = BasicListing(self.token_util.basic_token_dict)
+        lines = [
+            (line_number, bytes(tokens[:-1]) if tokens[-1:] == b"\x00" else bytes(tokens))
+            for line_number, tokens in listing.iter_dump_lines(dump, program_start)
+        ]
+        self.renum_dict = self.create_renum_dict(
+            (line_number for line_number, line_code in lines), new_start, old_start, step, old_end
+        )
+        if log.isEnabledFor(logging.INFO):
+            log.info("renum: %s", ", ".join(["{}->{}".format(o, n) for o, n in sorted(self.renum_dict.items())]))
+
+        return self.renum_program(lines, self.renum_dict).program_dump(program_start)
+
+    def renum_program(self, lines, renum_dict, program=None):
+        """
+        Returns a BasicProgram of the (line number, line code) tuples,
+        renumbered by >renum_dict< (old -> new line number), in the given order.
+        The lines are appended to >program<, if given.
+        """
+        self.renum_dict = renum_dict
+        if program is None:
+            program = BasicProgram()
+        for line_number, line_code in lines:
+            self.current_line_number = line_number
+            program.append(renum_dict[line_number], self.renum_line_code(line_code))
+        return program
+
+
+class CrossReference:
+    """
+    Jump target cross-reference of a BASIC program, built in one pass:
+        * .targets - line number -> tuple of the jump targets of this line
+        * .callers - target line number -> list of the lines that jumps to it
+        * .missing_targets - target line number -> callers, for all targets
+          that doesn't exist in the program
+
+    >>> xref = CrossReference.from_line_targets([(10, [30]), (20, [10, 30, 99]), (30, [20])])
+    >>> xref.get_targets(20)
+    (10, 30, 99)
+    >>> xref.get_callers(30)
+    [10, 20]
+    >>> xref.is_target(10), xref.is_target(40)
+    (True, False)
+    >>> xref.missing_targets
+    {99: [20]}
+    """
+
+    def __init__(self):
+        self.targets = {}
+        self.callers = {}
+        self.missing_targets = {}
+
+    @classmethod
+    def from_line_targets(cls, line_targets):
+        """
+        Build the cross-reference from (line number, jump targets) tuples.
+        """
+        xref = cls()
+        targets = xref.targets
+        callers = xref.callers
+        for line_number, jump_targets in line_targets:
+            jump_targets = tuple(dict.fromkeys(jump_targets))  # unique, but in order
+            targets[line_number] = jump_targets
+            for target in jump_targets:
+                try:
+                    target_callers = callers[target]
+                except KeyError:
+                    callers[target] = [line_number]
+                else:
+                    if target_callers[-1] != line_number:
+                        target_callers.append(line_number)
+
+        xref.missing_targets = {
+            target: target_callers for target, target_callers in sorted(callers.items()) if target not in targets
+        }
+        return xref
+
+    def get_targets(self, line_number):
+        """
+        Returns the jump targets of the given line.
+        """
+        return self.targets.get(line_number, ())
+
+    def get_callers(self, line_number):
+        """
+        Returns the line numbers of all lines that jumps to the given line.
+        """
+        return self.callers.get(line_number, [])
+
+    def is_target(self, line_number):
+        return line_number in self.callers
+
+    def __repr__(self):
+        return "<CrossReference lines: %i, targets: %i, missing: %i>" % (
+            len(self.targets),
+            len(self.callers),
+            len(self.missing_targets),
+        )
 
 
 def _test_renum():
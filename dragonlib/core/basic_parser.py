@@ -20,6 +20,7 @@
 
 import logging
 import re
+from collections import namedtuple
 
 
 log = logging.getLogger(__name__)
@@ -32,8 +33,34 @@ CODE_TYPE_COMMENT = "COMMENT"
 
 
 class BaseCode:
-    def __init__(self, content):
-        self.content = content
+    """
+    A segment of a BASIC line. >start< and >end< are the offsets of the
+    segment in >source< (for parsed segments: the complete ASCII listing).
+    The content is only sliced on access.
+
+    >>> code = BASIC_Code('10 PRINT "HELLO"', start=3, end=9)
+    >>> code
+    <CODE:PRINT >
+    >>> code.start, code.end
+    (3, 9)
+    >>> BASIC_String('"FOO"').content
+    '"FOO"'
+    """
+
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source, start=0, end=None):
+        self.source = source
+        self.start = start
+        if end is None:
+            end = len(source)
+        self.end = end
+
+    @property
+    def content(self):
+        if self.start == 0 and self.end == len(self.source):
+            return self.source
+        return self.source[self.start:self.end]
 
     def __repr__(self):
         return "<{}:{}>".format(self.PART_TYPE, self.content)
@@ -55,6 +82,11 @@ class BASIC_Comment(BaseCode):
     PART_TYPE = CODE_TYPE_COMMENT
 
 
+PART_CLASSES = {
+    part_class.PART_TYPE: part_class for part_class in (BASIC_Code, BASIC_Data, BASIC_String, BASIC_Comment)
+}
+
+
 class ParsedBASIC(dict):
     """
     Normal dict with special __repr__
@@ -88,29 +120,38 @@ class BASICParser:
         * DATA
         * Strings
         * Comments
+
+    Every line is scanned once from left to right. The segments are
+    BaseCode instances with the offsets into the given listing.
     """
 
     def __init__(self):
         self.regex_line_no = re.compile(
             # Split the line number from the code
-            r"^\s*(?P<no>\d+)\s?(?P<content>.+)\s*$",
+            # Note: A line number without code must not take the next line as code!
+            r"^\s*(?P<no>\d+)(?!\d)[ \t]?(?P<content>.+)\s*$",
             re.MULTILINE,
         )
         self.regex_split_all = re.compile(
-            # To split a code line for parse CODE, DATA, STRING or COMMENT
+            # Find the next start of a DATA, STRING or COMMENT in a code part
             r""" ( " | DATA | REM | ') """,
             re.VERBOSE | re.MULTILINE,
         )
         self.regex_split_data = re.compile(
-            # To consume the complete DATA until " or :
+            # Find the end of a DATA part: The next " or :
             r""" ( " | : ) """,
             re.VERBOSE | re.MULTILINE,
         )
-        self.regex_split_string = re.compile(
-            # To consume a string
-            r""" ( " ) """,
-            re.VERBOSE | re.MULTILINE,
-        )
+        self.split_count = 0  # Number of regex searches, used for statistics
+
+    def iter_lines(self, ascii_listing):
+        """
+        yield the line number and the start/end offsets of the code
+        for every line of the given ASCII BASIC listing.
+        """
+        for match in self.regex_line_no.finditer(ascii_listing):
+            log.debug("parse line >>>%r<<<", match.group())
+            yield (int(match.group("no")), *match.span("content"))
 
     def parse(self, ascii_listing):
         """
@@ -118,101 +159,244 @@ class BASICParser:
         Return a ParsedBASIC() instance.
         """
         self.parsed_lines = ParsedBASIC()
-        for match in self.regex_line_no.finditer(ascii_listing):
-            log.info("_" * 79)
-            log.info("parse line >>>%r<<<", match.group())
-            line_no = int(match.group("no"))
-            line_content = match.group("content")
+        self.split_count = 0
+        for line_no, start, end in self.iter_lines(ascii_listing):
+            self.parsed_lines[line_no] = self.parse_line(ascii_listing, start, end)
 
-            self.line_data = []
-            self._parse_code(line_content)
-            log.info("*** line %s result: %r", line_no, self.line_data)
+        return self.parsed_lines
 
-            self.parsed_lines[line_no] = self.line_data
+    def parse_line(self, source, start, end):
+        """
+        Split the code in source[start:end] into BaseCode instances.
 
-        return self.parsed_lines
+        >>> BASICParser().parse_line('10 A$="1":REM END', 3, 17)
+        [<CODE:A$=>, <STRING:"1">, <CODE::REM>, <COMMENT: END>]
+        """
+        line_data = [
+            PART_CLASSES[part_type](source, part_start, part_end)
+            for part_type, part_start, part_end in self.split_line(source, start, end)
+        ]
+        log.debug("line result: %r", line_data)
+        return line_data
+
+    def split_line(self, source, start, end):
+        """
+        Split the code in source[start:end] and returns a list of
+        (part type, start, end) tuples.
+
+        >>> BASICParser().split_line('10 DATA 1,2:PRINT', 3, 17)
+        [('CODE', 3, 7), ('DATA', 7, 11), ('CODE', 11, 17)]
+        """
+        search_all = self.regex_split_all.search
+        parts = []
+        append = parts.append
+
+        pos = start
+        while pos < end:
+            match = search_all(source, pos, end)
+            self.split_count += 1
+            if match is None:
+                append((CODE_TYPE_CODE, pos, end))
+                break
+
+            match_start, match_end = match.span()
+            keyword = match.group()
+            if keyword == '"':
+                append((CODE_TYPE_CODE, pos, match_start))
+                pos = self._find_string_end(source, match_end, end)
+                append((CODE_TYPE_STRING, match_start, pos))
+            elif keyword == "DATA":
+                append((CODE_TYPE_CODE, pos, match_end))
+                pos = self._find_data_end(source, match_end, end)
+                append((CODE_TYPE_DATA, match_end, pos))
+            else:  # ' or REM: consume the rest of the line as comment
+                append((CODE_TYPE_CODE, pos, match_end))
+                if match_end < end:
+                    append((CODE_TYPE_COMMENT, match_end, end))
+                break
+
+        return parts
+
+    def _find_string_end(self, source, pos, end):
+        """
+        Returns the offset after the closing " or the line end
+        """
+        string_end = source.find('"', pos, end)
+        if string_end == -1:  # not terminated string
+            return end
+        return string_end + 1
 
-    def _parse_data(self, line, old_data=""):
+    def _find_data_end(self, source, pos, end):
         """
-        Parse a DATA section until : or \n but exclude : in a string part.
-        e.g.:
+        A DATA section ends at : or the line end, but : in a string part
+        doesn't count. e.g.:
             10 DATA 1,"FOO:BAR",2:PRINT "NO DATA"
         """
-        log.debug("*** parse DATA: >>>%r<<< old data: >>>%r<<<", line, old_data)
-        parts = self.regex_split_data.split(line, maxsplit=1)
-        if len(parts) == 1:  # end
-            return old_data + parts[0], None
-
-        pre, match, post = parts
-        log.debug("\tpre: >>>%r<<<", pre)
-        pre = old_data + pre
-        log.debug("\tmatch: >>>%r<<<", match)
-        log.debug("\tpost: >>>%r<<<", post)
-        if match == ":":
-            return old_data, match + post
-        elif match == '"':
-            string_part, rest = self._parse_string(post)
-            return self._parse_data(rest, old_data=pre + match + string_part)
-
-        raise RuntimeError("Wrong Reg.Exp.? match is: %r" % match)
-
-    def _parse_string(self, line):
-        """
-        Consume the complete string until next " or \n
-        """
-        log.debug("*** parse STRING: >>>%r<<<", line)
-        parts = self.regex_split_string.split(line, maxsplit=1)
-        if len(parts) == 1:  # end
-            return parts[0], None
-
-        pre, match, post = parts
-        log.debug("\tpre: >>>%r<<<", pre)
-        log.debug("\tmatch: >>>%r<<<", match)
-        log.debug("\tpost: >>>%r<<<", post)
-        pre = pre + match
-        log.debug("Parse string result: %r,%r", pre, post)
-        return pre, post
-
-    def _parse_code(self, line):
-        """
-        parse the given BASIC line and branch into DATA, String and
-        consume a complete Comment
-        """
-        log.debug("*** parse CODE: >>>%r<<<", line)
-        parts = self.regex_split_all.split(line, maxsplit=1)
-        if len(parts) == 1:  # end
-            self.line_data.append(BASIC_Code(parts[0]))
-            return
-        pre, match, post = parts
-        log.debug("\tpre: >>>%r<<<", pre)
-        log.debug("\tmatch: >>>%r<<<", match)
-        log.debug("\tpost: >>>%r<<<", post)
-
-        if match == '"':
-            log.debug("%r --> parse STRING", match)
-            self.line_data.append(BASIC_Code(pre))
-            string_part, rest = self._parse_string(post)
-            self.line_data.append(BASIC_String(match + string_part))
-            if rest:
-                self._parse_code(rest)
-            return
-
-        self.line_data.append(BASIC_Code(pre + match))
-
-        if match == "DATA":
-            log.debug("%r --> parse DATA", match)
-            data_part, rest = self._parse_data(post)
-            self.line_data.append(BASIC_Data(data_part))
-            if rest:
-                self._parse_code(rest)
-            return
-        elif match in ("'", "REM"):
-            log.debug("%r --> consume rest of the line as COMMENT", match)
-            if post:
-                self.line_data.append(BASIC_Comment(post))
-            return
-
-        raise RuntimeError("Wrong Reg.Exp.? match is: %r" % match)
+        search_data = self.regex_split_data.search
+        while pos < end:
+            match = search_data(source, pos, end)
+            self.split_count += 1
+            if match is None:
+                break
+            if match.group() == ":":
+                return match.start()
+            pos = self._find_string_end(source, match.end(), end)
+        return end
+
+
+EditResult = namedtuple("EditResult", ("added", "changed", "removed"))
+
+
+class _PhysicalLine:
+    """
+    One line of the text in a BASICParserSession
+    """
+
+    __slots__ = ("line_no", "content", "code_objects")
+
+    def __init__(self, line_no=None, content=None, code_objects=None):
+        self.line_no = line_no
+        self.content = content
+        self.code_objects = code_objects
+
+
+_EMPTY_LINE = _PhysicalLine()
+
+
+class BASICParserSession:
+    '''
+    Keep a parsed ASCII listing up-to-date while it is edited.
+
+    Only the physical lines touched by an edit are parsed again, so the
+    costs of an edit doesn't depend on the size of the listing.
+    The segment offsets of the code objects are relative to the physical line.
+
+    Like in BASICParser.parse(): A line number without any code is ignored
+    and if a line number exists more than once, the last physical line wins.
+
+    >>> session = BASICParserSession("10 PRINT 1\\n20 PRINT 2")
+    >>> session.parsed_lines
+    {
+        10: [
+            """<CODE:PRINT 1>""",
+        ],
+        20: [
+            """<CODE:PRINT 2>""",
+        ],
+    }
+    >>> session.edit((1, 9), (1, 10), '"TWO"\\n30 END')
+    EditResult(added=[30], changed=[20], removed=[])
+    >>> session.text
+    '10 PRINT 1\\n20 PRINT "TWO"\\n30 END'
+    >>> session.edit((0, 0), (1, 0), "")
+    EditResult(added=[], changed=[], removed=[10])
+    >>> sorted(session.parsed_lines)
+    [20, 30]
+    '''
+
+    def __init__(self, ascii_listing="", parser=None):
+        if parser is None:
+            parser = BASICParser()
+        self.parser = parser
+        self.lines = ascii_listing.split("\n")
+        self.physical_lines = [self._parse_physical_line(line) for line in self.lines]
+
+        # line number -> all physical lines with this number:
+        self._physical_lines_by_no = {}
+        self.parsed_lines = ParsedBASIC()
+        for physical_line in self.physical_lines:
+            if physical_line.line_no is not None:
+                self._physical_lines_by_no.setdefault(physical_line.line_no, []).append(physical_line)
+                self.parsed_lines[physical_line.line_no] = physical_line.code_objects
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def _parse_physical_line(self, line):
+        match = self.parser.regex_line_no.match(line)
+        if match is None:
+            return _EMPTY_LINE
+
+        content_start, content_end = match.span("content")
+        return _PhysicalLine(
+            line_no=int(match.group("no")),
+            content=line[content_start:content_end],
+            code_objects=self.parser.parse_line(line, content_start, content_end),
+        )
+
+    def _get_current(self, line_no):
+        """
+        Returns the physical line that is used for the line number or None
+        """
+        physical_lines = self._physical_lines_by_no.get(line_no)
+        if not physical_lines:
+            return None
+        if len(physical_lines) == 1:
+            return physical_lines[0]
+
+        # Duplicate line numbers (should be rare): The last one wins
+        return max(physical_lines, key=self.physical_lines.index)
+
+    def edit(self, start, end, text):
+        """
+        Replace the text between start and end with the given text.
+        start and end are (row, column) tuples, both zero based.
+
+        Returns a EditResult with the sorted lists of the added, changed and
+        removed line numbers.
+        """
+        start_row, start_col = start
+        end_row, end_col = end
+        if not (0 <= start_row <= end_row < len(self.lines)):
+            raise IndexError("Edit rows %i-%i out of range 0-%i" % (start_row, end_row, len(self.lines) - 1))
+        if start_row == end_row and start_col > end_col:
+            raise IndexError("Edit start column %i after end column %i" % (start_col, end_col))
+
+        new_text = self.lines[start_row][:start_col] + text + self.lines[end_row][end_col:]
+        new_lines = new_text.split("\n")
+        new_physical_lines = [self._parse_physical_line(line) for line in new_lines]
+
+        old_physical_lines = self.physical_lines[start_row:end_row + 1]
+        old_current = {}
+        for physical_line in old_physical_lines:
+            line_no = physical_line.line_no
+            if line_no is not None and line_no not in old_current:
+                old_current[line_no] = self._get_current(line_no)
+
+        self.lines[start_row:end_row + 1] = new_lines
+        self.physical_lines[start_row:end_row + 1] = new_physical_lines
+
+        for physical_line in old_physical_lines:
+            if physical_line.line_no is not None:
+                self._physical_lines_by_no[physical_line.line_no].remove(physical_line)
+        for physical_line in new_physical_lines:
+            line_no = physical_line.line_no
+            if line_no is not None:
+                if line_no not in old_current:
+                    old_current[line_no] = self._get_current(line_no)
+                self._physical_lines_by_no.setdefault(line_no, []).append(physical_line)
+
+        added = []
+        changed = []
+        removed = []
+        for line_no, old_line in old_current.items():
+            new_line = self._get_current(line_no)
+            if new_line is None:
+                if not self._physical_lines_by_no.get(line_no, True):
+                    del self._physical_lines_by_no[line_no]
+                if old_line is not None:
+                    del self.parsed_lines[line_no]
+                    removed.append(line_no)
+                continue
+
+            self.parsed_lines[line_no] = new_line.code_objects
+            if old_line is None:
+                added.append(line_no)
+            elif old_line.content != new_line.content:
+                changed.append(line_no)
+
+        return EditResult(sorted(added), sorted(changed), sorted(removed))
 
 
 if __name__ == "__main__":
@@ -10,17 +10,94 @@
 """
 
 
+import io
 import logging
+import mmap
+import os
 import struct
+import traceback
+from array import array
+from collections import namedtuple
 
 
-from dragonlib.utils.byte_word_values import bin2hexline
+from dragonlib.utils.byte_word_values import as_memoryview, bin2hexline
 from dragonlib.utils.logging_utils import log_bytes
 
 
 log = logging.getLogger(__name__)
 
 
+DECB_PREAMBLE = 0x00
+DECB_POSTAMBLE = 0xFF
+
+
+Segment = namedtuple("Segment", ("load_address", "offset", "length"))
+
+
+class SegmentIndex:
+    """
+    Compact index of the segments of a CoCo DECB file: The load address,
+    offset and length of every segment in arrays. The payloads are not
+    copied, get_data() returns a view into the file data.
+
+    >>> index = SegmentIndex(b"\\x00\\x00\\x02\\x0e\\x00AB")
+    >>> index.append(0x0e00, 5, 2)
+    >>> len(index), index[0]
+    (1, Segment(load_address=3584, offset=5, length=2))
+    >>> index.get_data(0).tobytes()
+    b'AB'
+    """
+
+    def __init__(self, data):
+        self.data = as_memoryview(data)
+        self.load_addresses = array("H")
+        self.offsets = array("L")
+        self.lengths = array("H")
+
+    def append(self, load_address, offset, length):
+        self.load_addresses.append(load_address)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def release(self):
+        """
+        Release the view into the file data.
+        """
+        self.data.release()
+
+    def get_data(self, index):
+        """
+        Returns the payload of the segment as memoryview into the file data.
+        """
+        offset = self.offsets[index]
+        return self.data[offset:offset + self.lengths[index]]
+
+    def memory_image(self):
+        """
+        Returns the start address and a bytearray with all segments at their
+        load addresses (gaps are filled with $00). Later segments overwrite
+        earlier ones, like LOADM does.
+        """
+        if not self.load_addresses:
+            return None, bytearray()
+        start = min(self.load_addresses)
+        end = max(address + length for address, length in zip(self.load_addresses, self.lengths))
+        image = bytearray(end - start)
+        for index, address in enumerate(self.load_addresses):
+            image[address - start:address - start + self.lengths[index]] = self.get_data(index)
+        return start, image
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        return Segment(self.load_addresses[index], self.offsets[index], self.lengths[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
 class BinaryFile:
     def __init__(self):
         self.file_type = None  # $01 == BAS | $02 == BIN
@@ -28,8 +105,57 @@ class BinaryFile:
         self.length = None
         self.exec_address = None
         self.data = None
+        self.segments = None  # SegmentIndex of a CoCo DECB file
+        self._mmap = None
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map the file and load it: .data is a view into the mapped
+        file, so only the pages that are used would be read. Close the
+        BinaryFile after use, e.g.:
+            with BinaryFile.open(path) as binary_file:
+                print(binary_file.load_address)
+        """
+        binary_file = cls()
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Can't load empty file %r" % path)
+            binary_file._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            binary_file.load_from_bin(binary_file._mmap)
+        except BaseException as err:
+            # The frames of the traceback still hold views into the mapping:
+            traceback.clear_frames(err.__traceback__)
+            binary_file.close()
+            raise
+        return binary_file
+
+    def close(self):
+        """
+        Release the data view and unmap the file, if it's loaded via open()
+        """
+        if self._mmap is None:
+            return
+        if isinstance(self.data, memoryview):
+            self.data.release()
+        self.data = None
+        if self.segments is not None:
+            self.segments.release()
+            self.segments = None
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def debug2log(self, level=logging.DEBUG):
+        if not log.isEnabledFor(level):
+            return
+
         def verbose_value(value, fmt="$%02x"):
             try:
                 return fmt % value
@@ -70,6 +196,36 @@ class BinaryFile:
         header = self.get_header()
         return header + self.data
 
+    def write_to(self, fileobj):
+        """
+        Write the Dragon DOS binary (header + data) into the file object,
+        without concatenating them: With one vectored write, if the file
+        object has a file descriptor, otherwise with two write() calls.
+        Returns the number of written bytes.
+        """
+        self.debug2log(level=logging.DEBUG)
+        buffers = [self.get_header(), as_memoryview(self.data)]
+        size = sum(len(buffer) for buffer in buffers)
+
+        try:
+            fileno = fileobj.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fileno = None
+        if fileno is None or not hasattr(os, "writev"):
+            for buffer in buffers:
+                fileobj.write(buffer)
+            return size
+
+        fileobj.flush()  # Don't mix buffered data and our direct writes
+        while buffers:
+            written = os.writev(fileno, buffers)
+            # Skip the written buffers, after a partial write:
+            while buffers and written >= len(buffers[0]):
+                written -= len(buffers.pop(0))
+            if written:
+                buffers[0] = buffers[0][written:]
+        return size
+
     def load_DragonDosBinary(self, data, strip_padding=True):
         """
         Dragon DOS Binary Format
@@ -84,17 +240,28 @@ class BinaryFile:
           6:7     word    Exec Address
           8       byte    $AA           Constant
           9-xxx   byte[]  Data
+
+        >data< can be any buffer (bytes, bytearray, mmap, memoryview...)
+        self.data is a memoryview into it: The payload is not copied.
+
+        >>> binary_file = BinaryFile()
+        >>> binary_file.load_DragonDosBinary(b"\\x55\\x01\\x1e\\x01\\x00\\x02\\x1e\\x01\\xaa\\x00\\x00\\xff")
+        >>> isinstance(binary_file.data, memoryview)
+        True
+        >>> binary_file.data.tobytes()
+        b'\\x00\\x00'
         """
-        data = bytearray(data)
+        data = as_memoryview(data)
 
         log.debug("Load Dragon DOS Binary Format.")
 
-        meta_data = struct.unpack(">BBHHHB", data[:9])
+        meta_data = struct.unpack_from(">BBHHHB", data)
 
         machine_type = meta_data[0]
         if machine_type != 0x55:
             log.error("ERROR: Machine type wrong: is $%02X but should be $55!", machine_type)
 
+        self.segments = None
         self.file_type = meta_data[1]
         self.load_address = meta_data[2]
         self.length = meta_data[3]
@@ -125,6 +292,85 @@ class BinaryFile:
         # log_bytes(self.data, "data in hex: %s", level=logging.DEBUG)
         self.debug2log(level=logging.DEBUG)
 
+    def load_DECB(self, data):
+        """
+        CoCo DECB (Disk Extended Color BASIC) binary format: A sequence of
+        records, walked once without copying a payload:
+
+        Offset:  Type:   Value:
+          0       byte    $00           Preamble: one segment
+          1:2     word    Length
+          3:4     word    Load Address
+          5-xxx   byte[]  Data
+          ...
+          0       byte    $FF           Postamble: end of file
+          1:2     word    $0000
+          3:4     word    Exec Address
+
+        All segments are in self.segments, self.load_address and self.data
+        are from the first segment, self.length is the size of all segments.
+
+        >>> binary_file = BinaryFile()
+        >>> binary_file.load_DECB(
+        ...     b"\\x00\\x00\\x02\\x0e\\x00AB"  # 2 Bytes at $0e00
+        ...     b"\\x00\\x00\\x01\\x20\\x00C"   # 1 Byte at $2000
+        ...     b"\\xff\\x00\\x00\\x0e\\x00"    # exec $0e00
+        ... )
+        >>> list(binary_file.segments)
+        [Segment(load_address=3584, offset=5, length=2), Segment(load_address=8192, offset=12, length=1)]
+        >>> "$%04x" % binary_file.exec_address
+        '$0e00'
+        >>> binary_file.data.tobytes(), binary_file.length
+        (b'AB', 3)
+        """
+        data = as_memoryview(data)
+        data_length = len(data)
+        segments = SegmentIndex(data)
+        unpack_from = struct.unpack_from
+
+        log.debug("Load CoCo DECB Binary Format.")
+
+        exec_address = None
+        offset = 0
+        while offset < data_length:
+            if offset + 5 > data_length:
+                raise ValueError("DECB record at offset %i truncated" % offset)
+            record_type, length, address = unpack_from(">BHH", data, offset)
+            if record_type == DECB_PREAMBLE:
+                if offset + 5 + length > data_length:
+                    raise ValueError(
+                        "DECB segment at offset %i truncated: %i Bytes missing"
+                        % (offset, offset + 5 + length - data_length)
+                    )
+                segments.append(address, offset + 5, length)
+                offset += 5 + length
+            elif record_type == DECB_POSTAMBLE:
+                if length != 0:
+                    log.error("ERROR: DECB postamble length is $%04X but should be $0000!", length)
+                exec_address = address
+                break
+            else:
+                raise ValueError("Unknown DECB record type $%02X at offset %i" % (record_type, offset))
+
+        if exec_address is None:
+            log.error("ERROR: No DECB postamble: exec address unknown!")
+        if not segments:
+            raise ValueError("No DECB segments")
+
+        self.segments = segments
+        self.file_type = None  # DECB stores the type in the directory entry, not in the file
+        self.load_address = segments.load_addresses[0]
+        self.length = sum(segments.lengths)
+        self.exec_address = exec_address
+        self.data = segments.get_data(0)
+        log.debug(
+            "DECB: %i segments, %i Bytes, Load Address: $%04X Exec Address: %s",
+            len(segments),
+            self.length,
+            self.load_address,
+            "None" if exec_address is None else "$%04X" % exec_address,
+        )
+
     def load_from_bin(self, data):
         """
         convert binary files to a ASCII basic string.
@@ -135,7 +381,7 @@ class BinaryFile:
         see:
         http://archive.worldofdragon.org/phpBB3/viewtopic.php?f=8&t=348&p=10139#p10139
         """
-        data = bytearray(data)
+        data = as_memoryview(data)
 
         machine_type = data[0]
 
@@ -143,8 +389,9 @@ class BinaryFile:
         if machine_type == 0x55:
             # Dragon DOS Binary Format
             self.load_DragonDosBinary(data)
-        elif machine_type == 0x00:
-            raise NotImplementedError("CoCo DECB (Disk Extended Color BASIC) Format not supported, yet.")
+        elif machine_type == DECB_PREAMBLE:
+            # CoCo DECB (Disk Extended Color BASIC) Format
+            self.load_DECB(data)
         else:
             raise NotImplementedError("ERROR: Format $%02X unknown." % machine_type)
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+
+"""
+    Crunch BASIC programs
+    =====================
+
+    Shrink a tokenized BASIC program, so it needs less RAM and the
+    interpreter has less to parse on the real machine:
+
+        * Remove REM and ' comments. Comment only lines are removed,
+          if they are not a jump target.
+        * Remove all spaces outside of strings, DATA and comments.
+        * Merge consecutive lines, if the next line is not a jump target
+          and the merged line fits into the input buffer.
+
+    Only the GOTO, GOSUB, THEN, ELSE and ON... jumps are known as jump
+    targets (see CrossReference). e.g.: RUN 100 doesn't protect line 100.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import logging
+import re
+
+from dragonlib.core.basic import BasicListing, BasicProgram, CrossReference, TokenRenumTool
+
+
+log = logging.getLogger(__name__)
+
+
+# The input buffer of the Dragon/CoCo BASIC holds 249 characters of a
+# line. A merged line must fit into it to be editable on the machine:
+MAX_LINE_LENGTH = 249
+
+
+class CrunchReport:
+    """
+    Size of the program before and after crunching it.
+    """
+
+    def __init__(self, program_start, old_size, new_size, old_lines, new_lines, removed_lines, merged_lines):
+        self.program_start = program_start
+        self.old_size = old_size
+        self.new_size = new_size
+        self.old_lines = old_lines
+        self.new_lines = new_lines
+        self.removed_lines = removed_lines
+        self.merged_lines = merged_lines
+
+    @property
+    def bytes_saved(self):
+        return self.old_size - self.new_size
+
+    @property
+    def old_end(self):
+        return self.program_start + self.old_size
+
+    @property
+    def new_end(self):
+        return self.program_start + self.new_size
+
+    def __str__(self):
+        return (
+            "%i lines, %i Bytes ($%04x-$%04x) -> %i lines, %i Bytes ($%04x-$%04x):"
+            " %i Bytes saved (%i comment lines removed, %i lines merged)"
+        ) % (
+            self.old_lines,
+            self.old_size,
+            self.program_start,
+            self.old_end,
+            self.new_lines,
+            self.new_size,
+            self.program_start,
+            self.new_end,
+            self.bytes_saved,
+            self.removed_lines,
+            self.merged_lines,
+        )
+
+
+class CrunchTool:
+    """
+    >>> from dragonlib.api import Dragon32API
+    >>> api = Dragon32API()
+    >>> dump = api.ascii_listing2program_dump(
+    ...     '10 REM DEMO\\n20 PRINT "A B" \\'HELLO\\n30 FOR I = 1 TO 5\\n40 GOTO 20'
+    ... )
+    >>> tool = CrunchTool(api.token_util)
+    >>> new_dump, report = tool.crunch(dump, program_start=0x1e01)
+    >>> api.program_dump2ascii(new_dump, program_start=0x1e01)
+    '20 PRINT"A B":FORI=1TO5:GOTO20'
+    >>> report.bytes_saved, report.removed_lines, report.merged_lines
+    (34, 1, 2)
+    >>> "$%04x -> $%04x" % (report.old_end, report.new_end)
+    '$1e3c -> $1e1a'
+    """
+
+    def __init__(self, token_util):
+        self.token_util = token_util
+        self.renum_tool = TokenRenumTool(token_util)
+
+        def token(code):
+            return re.escape(bytes((token_util.ascii2token_dict[code],)))
+
+        self.colon = b":"
+        self.line_regex = re.compile(
+            rb"""
+                (?P<keep>
+                    "[^"]*"?                          # string (maybe not terminated)
+                    | %(data)s(?:"[^"]*"?|[^:"])*     # DATA until : outside a string
+                    | \xff.                            # function token
+                )
+                | [\x20:]*(?:%(rem)s|%(rem2)s).*      # comment until the line end
+                | \x20+                                # spaces
+            """
+            % {
+                b"rem": token("REM"),
+                b"rem2": token("'"),
+                b"data": token("DATA"),
+            },
+            re.VERBOSE | re.DOTALL,
+        )
+        self.if_regex = re.compile(
+            rb'"[^"]*"?|%(data)s(?:"[^"]*"?|[^:"])*|\xff.|(?P<if>%(if)s)'
+            % {b"data": token("DATA"), b"if": token("IF")},
+            re.DOTALL,
+        )
+        self.comment_regex = re.compile(rb"(?:%s|%s)" % (token("REM"), token("'")))
+
+    def _crunch_part(self, matchobj):
+        keep = matchobj.group("keep")
+        if keep is None:
+            return b""  # space or comment
+        return keep
+
+    def crunch_line_code(self, line_code):
+        """
+        Returns the line code without spaces and comments.
+        """
+        return self.line_regex.sub(self._crunch_part, line_code)
+
+    def has_if(self, line_code):
+        """
+        The code after a IF is conditional: Nothing can be appended to this line.
+        """
+        for matchobj in self.if_regex.finditer(line_code):
+            if matchobj.group("if") is not None:
+                return True
+        return False
+
+    def line_length(self, line_number, line_code):
+        """
+        Length of the line in the input buffer: the detokenized line
+        """
+        return len("%i " % line_number) + len(self.token_util.detokenize(line_code))
+
+    def crunch(self, dump, program_start, listing=None):
+        """
+        Returns the crunched program dump as bytearray and a CrunchReport.
+        """
+        if listing is None:
+            listing = BasicListing(self.token_util.basic_token_dict)
+
+        lines = [
+            (line_number, bytes(tokens[:-1]) if tokens[-1:] == b"\x00" else bytes(tokens))
+            for line_number, tokens in listing.iter_dump_lines(dump, program_start)
+        ]
+        xref = CrossReference.from_line_targets(
+            (line_number, self.renum_tool.iter_jump_targets(line_code)) for line_number, line_code in lines
+        )
+        is_target = xref.is_target
+
+        program = BasicProgram()
+        removed_lines = merged_lines = 0
+        current_number = current_code = None
+        current_length = 0
+        can_append = False
+        for line_number, line_code in lines:
+            new_code = self.crunch_line_code(line_code)
+            if not new_code:
+                # A comment only line
+                if not is_target(line_number):
+                    log.debug("Remove line %i: %r", line_number, line_code)
+                    removed_lines += 1
+                    continue
+                # Jumps need the line: keep only the comment token
+                matchobj = self.comment_regex.search(line_code)
+                new_code = self.colon if matchobj is None else matchobj.group()
+
+            if can_append and not is_target(line_number):
+                merged_length = current_length + 1 + len(self.token_util.detokenize(new_code))
+                if merged_length <= MAX_LINE_LENGTH:
+                    log.debug("Merge line %i into line %i", line_number, current_number)
+                    current_code += self.colon + new_code
+                    current_length = merged_length
+                    can_append = not self.has_if(new_code) and self.comment_regex.match(new_code) is None
+                    merged_lines += 1
+                    continue
+
+            if current_number is not None:
+                program.append(current_number, current_code)
+            current_number = line_number
+            current_code = new_code
+            current_length = self.line_length(line_number, new_code)
+            can_append = not self.has_if(new_code) and self.comment_regex.match(new_code) is None
+
+        if current_number is not None:
+            program.append(current_number, current_code)
+
+        new_dump = program.program_dump(program_start)
+        report = CrunchReport(
+            program_start=program_start,
+            old_size=self._program_size(dump, lines),
+            new_size=len(new_dump),
+            old_lines=len(lines),
+            new_lines=len(program),
+            removed_lines=removed_lines,
+            merged_lines=merged_lines,
+        )
+        return new_dump, report
+
+    def _program_size(self, dump, lines):
+        """
+        Size of the program in the dump: 5 Bytes per line (next address,
+        line number, line end) + the line code + the program end marker.
+        """
+        if not lines:
+            return 0
+        return sum(len(line_code) + 5 for line_number, line_code in lines) + 2
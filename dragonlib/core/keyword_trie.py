@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+"""
+    Keyword trie
+    ============
+
+    Longest-match keyword scanner used to tokenize BASIC code parts.
+
+    The trie would be build once per BASIC dialect and scans a code
+    part in a single pass from left to right. The result are directly
+    the token bytes.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+# Key to store the token of a complete keyword in a trie node:
+_TOKEN = None
+
+
+class KeywordTrie:
+    """
+    >>> trie = KeywordTrie({"GO": b"\\x81", "TO": b"\\xbc", "TOP": b"\\x01"})
+    >>> trie.tokenize("GOTO 10")
+    b'\\x81\\xbc 10'
+    >>> trie.tokenize("GOTOP")
+    b'\\x81\\x01'
+    >>> trie.tokenize("G T")
+    b'G T'
+    """
+
+    def __init__(self, keywords):
+        """
+        :param keywords: dict with keyword -> token bytes
+        """
+        self.root = {}
+        for keyword, token_bytes in keywords.items():
+            node = self.root
+            for char in keyword:
+                node = node.setdefault(char, {})
+
+            # Store the token as latin-1 string: So the tokenize() result
+            # can be joined and encoded in one step.
+            node[_TOKEN] = bytes(token_bytes).decode("latin-1")
+
+    def tokenize(self, code):
+        """
+        Replace all keywords in the given code string with there tokens.
+        On every position the longest keyword wins. Characters that are not
+        part of a keyword are returned as they are.
+        """
+        root_get = self.root.get
+        parts = []
+        append = parts.append
+
+        pos = 0
+        code_length = len(code)
+        while pos < code_length:
+            char = code[pos]
+            node = root_get(char)
+            if node is None:
+                append(char)
+                pos += 1
+                continue
+
+            token = node.get(_TOKEN)
+            token_end = pos + 1
+
+            next_pos = pos + 1
+            while next_pos < code_length:
+                node = node.get(code[next_pos])
+                if node is None:
+                    break
+                next_pos += 1
+                if _TOKEN in node:
+                    token = node[_TOKEN]
+                    token_end = next_pos
+
+            if token is None:
+                append(char)
+                pos += 1
+            else:
+                append(token)
+                pos = token_end
+
+        return "".join(parts).encode("latin-1")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+"""
+    Minify variable names
+    =====================
+
+    Dragon/CoCo BASIC uses only the first two characters of a variable
+    name: "COUNT" and "CODE" are the same variable "CO". Longer names only
+    cost memory and tokenizer/interpreter time.
+
+    The minifier collects all variables in the code parts of a listing
+    (strings, DATA and comments are never changed) and renames them to the
+    shortest names. The most used variables get the single letter names.
+    Simple variables, string variables and arrays are separate namespaces
+    in BASIC, so every namespace starts with "A" again.
+
+    Variables that already collide under the two character rule (e.g.:
+    COUNT and CODE) are the same variable on the machine, so they get the
+    same new name and are reported.
+
+    The function names after FN are not renamed.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import logging
+import re
+import string
+from collections import Counter
+
+from dragonlib.core import basic_parser
+
+
+log = logging.getLogger(__name__)
+
+
+class MinifyResult:
+    """
+    * .renames - old name -> new name, e.g.: {"COUNT": "A", "NAME$": "A$", "LIST(": "A("}
+    * .collisions - two character name -> the different old names, e.g.: {"CO": ["COUNT", "CODE"]}
+    * .counts - old name -> number of uses
+    """
+
+    def __init__(self, renames, collisions, counts):
+        self.renames = renames
+        self.collisions = collisions
+        self.counts = counts
+
+    def __repr__(self):
+        return "<MinifyResult renames: %i, collisions: %i>" % (len(self.renames), len(self.collisions))
+
+
+class VariableMinifier:
+    """
+    >>> from dragonlib.api import Dragon32API
+    >>> minifier = VariableMinifier(Dragon32API().token_util)
+    >>> listing, result = minifier.minify(
+    ...     '10 COUNT=0:NAME$="COUNT"\\n20 FOR I=1 TO 5:COUNT=COUNT+I:NEXT I\\n30 PRINT NAME$;CODE'
+    ... )
+    >>> print(listing)
+    10 A=0:A$="COUNT"
+    20 FOR B=1 TO 5:A=A+B:NEXT B
+    30 PRINT A$;A
+    >>> result.renames
+    {'COUNT': 'A', 'CODE': 'A', 'NAME$': 'A$', 'I': 'B'}
+    >>> result.collisions
+    {'CO': ['COUNT', 'CODE']}
+    """
+
+    def __init__(self, token_util):
+        self.token_util = token_util
+        self.tokenize = token_util.keyword_trie.tokenize
+        self.detokenize = token_util.detokenize
+
+        fn_token = re.escape(bytes((token_util.ascii2token_dict["FN"],)))
+        self.code_regex = re.compile(
+            rb"""
+                %(fn)s\x20*[A-Z][A-Z0-9]*                  # function name: not renamed
+                | &[HO]?[0-9A-F]*                           # hex/octal number
+                | [0-9]*\.?[0-9]+(?:E[+-]?[0-9]+)?          # decimal number
+                | \xff.                                     # function token
+                | (?P<name>[A-Z][A-Z0-9]*)(?P<type>\$?(?:\x20*\()?)
+            """
+            % {b"fn": fn_token},
+            re.VERBOSE | re.DOTALL,
+        )
+
+        # All new names, shortest first, without the names that are keywords:
+        keywords = set(token_util.ascii2token_dict)
+        letters = string.ascii_uppercase
+        self.identifier_table = tuple(
+            name
+            for name in [*letters, *(first + second for first in letters for second in letters + string.digits)]
+            if name not in keywords
+        )
+
+    def _iter_variables(self, line_code):
+        """
+        yield the regex match of every variable in the tokenized code part.
+        """
+        for matchobj in self.code_regex.finditer(line_code):
+            if matchobj.group("name") is not None:
+                yield matchobj
+
+    def _get_key(self, matchobj):
+        """
+        The variable on the machine: first two characters + namespace
+        e.g.: b"COUNT", b"$(" -> ("CO", "$(")
+        """
+        return matchobj.group("name")[:2].decode("ascii"), matchobj.group("type").replace(b" ", b"").decode("ascii")
+
+    def minify(self, ascii_listing, parser=None):
+        """
+        Returns the listing with the new variable names and a MinifyResult.
+        """
+        if parser is None:
+            parser = basic_parser.BASICParser()
+        code_type = basic_parser.CODE_TYPE_CODE
+        tokenize = self.tokenize
+
+        # 1. pass: split and tokenize the code parts and count the variables:
+        lines = []
+        key_counts = Counter()
+        spellings = {}  # key -> {old name: count}
+        for line_number, start, end in parser.iter_lines(ascii_listing):
+            parts = []
+            for part_type, part_start, part_end in parser.split_line(ascii_listing, start, end):
+                part = ascii_listing[part_start:part_end]
+                if part_type != code_type:
+                    parts.append((False, part))
+                    continue
+                line_code = tokenize(part)
+                for matchobj in self._iter_variables(line_code):
+                    key = self._get_key(matchobj)
+                    key_counts[key] += 1
+                    old_name = matchobj.group("name").decode("ascii") + key[1]
+                    key_spellings = spellings.setdefault(key, {})
+                    key_spellings[old_name] = key_spellings.get(old_name, 0) + 1
+                parts.append((True, line_code))
+            lines.append((line_number, parts))
+
+        # 2. plan: per namespace, the most used variables get the shortest names:
+        new_names = {}
+        namespace_counts = {}
+        identifier_table = self.identifier_table
+        for key in sorted(key_counts, key=key_counts.get, reverse=True):  # stable: same counts in listing order
+            namespace = key[1]
+            index = namespace_counts.get(namespace, 0)
+            namespace_counts[namespace] = index + 1
+            new_names[key] = identifier_table[index]
+
+        renames = {}
+        counts = {}
+        collisions = {}
+        for key, key_spellings in spellings.items():
+            for old_name, count in key_spellings.items():
+                renames[old_name] = new_names[key] + key[1]
+                counts[old_name] = count
+            if len(key_spellings) > 1:
+                collisions[key[0] + key[1]] = list(key_spellings)
+                log.info("Variables %s are the same variable %r", ", ".join(key_spellings), key[0] + key[1])
+
+        # 3. pass: write the new listing:
+        def replace(matchobj):
+            if matchobj.group("name") is None:
+                return matchobj.group()
+            return new_names[self._get_key(matchobj)].encode("ascii") + matchobj.group("type")
+
+        def replace_spaced(matchobj):
+            if matchobj.group("name") is None:
+                return matchobj.group()
+            return b" %s " % replace(matchobj)
+
+        new_lines = []
+        for line_number, parts in lines:
+            new_parts = []
+            for is_code, part in parts:
+                if is_code:
+                    line_code = self.code_regex.sub(replace, part)
+                    code = self.detokenize(line_code)
+                    if tokenize(code) != line_code:
+                        # A new name and the keyword next to it would be
+                        # tokenized in a different way: separate them
+                        code = self.detokenize(self.code_regex.sub(replace_spaced, part))
+                    part = code
+                new_parts.append(part)
+            new_lines.append("%i %s" % (line_number, "".join(new_parts)))
+
+        return "\n".join(new_lines), MinifyResult(renames, collisions, counts)
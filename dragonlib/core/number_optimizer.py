@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+
+"""
+    Numeric literal optimizer
+    =========================
+
+    Dragon/CoCo BASIC converts every numeric literal from ASCII to floating
+    point each time the line runs, and the decimal conversion is slow on the
+    6809. The optimizer rewrites the literals in the code parts of a listing
+    (strings, DATA, comments and line numbers are never changed):
+
+        * Fold constant integer expressions, e.g.: 2*3 -> 6
+          Only if the operator precedence allows it and the result is an
+          exact integer >= 0.
+        * Rewrite large integer literals (0-65535) into the &H hex form,
+          which is converted without floating point multiplications.
+        * Hoist numbers with a decimal point or exponent (e.g.: 1.0625, 1E3)
+          that are used more than once in the hot lines into variables.
+          They are set in a new line before the program start.
+          The hot lines are the loop bodies: FOR...NEXT and the lines of a
+          backwards jump. Or the lines given by the caller.
+          Plain integers are not hoisted: They are converted fast enough
+          (or in the &H form) and every new variable slows down the
+          variable lookups.
+
+    The saved interpreter cycles per line are estimated with a simple cost
+    model (see: *_CYCLES), for one run of the line.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import logging
+import re
+import string
+
+from dragonlib.core import basic_parser
+
+
+log = logging.getLogger(__name__)
+
+
+# Rough cost model of the Color BASIC interpreter in CPU cycles:
+NUMBER_CYCLES = 200  # start a decimal number conversion
+DECIMAL_DIGIT_CYCLES = 350  # FPA0 * 10 + digit
+HEX_CYCLES = 250  # start a &H conversion + integer to float
+HEX_DIGIT_CYCLES = 60  # shift + add
+VARIABLE_CYCLES = 150  # search the variable table + copy into FPA0
+OPERATOR_CYCLES = {"+": 300, "-": 300, "*": 1200, "/": 2000, "^": 8000}
+
+# Operator precedence, higher binds stronger:
+PRECEDENCE = {"^": 4, "unary": 3, "*": 2, "/": 2, "+": 1, "-": 1}
+
+MIN_HEX_VALUE = 100  # "large" literals with three and more digits
+MAX_HEX_VALUE = 0xFFFF
+MAX_FOLD_VALUE = 2**31 - 1  # exact in the 32 bit mantissa
+
+# Item kinds of a scanned code part:
+KIND_NUMBER = "number"
+KIND_HEX = "hex"
+KIND_NAME = "name"
+KIND_OPERATOR = "operator"
+KIND_SPACE = "space"
+KIND_OTHER = "other"
+
+
+def literal_cycles(literal):
+    """
+    Estimated cycles to convert the literal into a floating point number.
+
+    >>> literal_cycles("1234"), literal_cycles("&H4D2")
+    (1600, 430)
+    """
+    if literal.startswith("&"):
+        return HEX_CYCLES + HEX_DIGIT_CYCLES * (len(literal) - 2)
+    return NUMBER_CYCLES + DECIMAL_DIGIT_CYCLES * sum(char.isdigit() for char in literal)
+
+
+class NumberOptimizerResult:
+    """
+    * .cycles_saved - line number -> estimated cycles saved per run of the line
+    * .folded - count of folded constant expressions
+    * .hex_literals - count of literals rewritten into the &H form
+    * .hoisted - number literal -> variable name
+    * .hot_lines - line numbers of the hot lines
+    """
+
+    def __init__(self, cycles_saved, folded, hex_literals, hoisted, hot_lines):
+        self.cycles_saved = cycles_saved
+        self.folded = folded
+        self.hex_literals = hex_literals
+        self.hoisted = hoisted
+        self.hot_lines = hot_lines
+
+    @property
+    def total_cycles_saved(self):
+        return sum(self.cycles_saved.values())
+
+    def __repr__(self):
+        return "<NumberOptimizerResult folded: %i, hex: %i, hoisted: %i, cycles saved: %i>" % (
+            self.folded,
+            self.hex_literals,
+            len(self.hoisted),
+            self.total_cycles_saved,
+        )
+
+
+class NumberOptimizer:
+    """
+    >>> from dragonlib.api import CoCoAPI
+    >>> optimizer = NumberOptimizer(CoCoAPI().token_util)
+    >>> listing, result = optimizer.optimize(
+    ...     '10 POKE 1024+2*16,255\\n20 FOR I=1 TO 10:X=X*1.0625+1.0625:NEXT I\\n30 GOTO 200'
+    ... )
+    >>> print(listing)
+    9 A=1.0625
+    10 POKE &H420,&HFF
+    20 FOR I=1 TO 10:X=X*A+A:NEXT I
+    30 GOTO 200
+    >>> result.cycles_saved
+    {10: 5000, 20: 3600}
+    """
+
+    def __init__(self, token_util, hex_literals=True):
+        """
+        :param hex_literals: The BASIC dialect supports &H numbers
+        """
+        self.token_util = token_util
+        self.hex_literals = hex_literals
+        self.tokenize = token_util.keyword_trie.tokenize
+        self.detokenize = token_util.detokenize
+
+        ascii2token = token_util.ascii2token_dict
+
+        def token(code):
+            return bytes((ascii2token[code],))
+
+        self.operators = {token(code): code for code in OPERATOR_CYCLES}
+        self.for_token = token("FOR")
+        self.next_token = token("NEXT")
+        # These delete all variables, without running the init line again:
+        self.clear_tokens = {
+            token(code) for code in ("CLEAR", "RUN", "NEW", "LOAD", "CLOAD") if code in ascii2token
+        }
+
+        def escaped(*codes):
+            return b"|".join(re.escape(token(code)) for code in codes if code in ascii2token)
+
+        self.code_regex = re.compile(
+            rb"""
+                (?P<jump>(?:%(go)s\x20*(?:%(to)s|%(sub)s)|%(jump)s)\x20*)(?P<line_numbers>[0-9][0-9,\x20]*)?
+                | (?P<function>\xff.)
+                | (?P<hex>&[HO]?[0-9A-F]*)
+                | (?P<number>[0-9]*\.?[0-9]+(?:E(?:[+-]|%(sign)s)?[0-9]+)?)
+                | (?P<name>[A-Z][A-Z0-9]*\$?)
+                | (?P<operator>%(operator)s)
+                | (?P<space>\x20+)
+                | (?P<other>.)
+            """
+            % {
+                b"go": escaped("GO"),
+                b"to": escaped("TO"),
+                b"sub": escaped("SUB"),
+                b"jump": escaped("THEN", "ELSE", "RUN", "LIST", "LLIST", "RENUM", "DEL", "EDIT", "AUTO", "RESTORE"),
+                b"sign": escaped("+", "-"),
+                b"operator": escaped(*OPERATOR_CYCLES),
+            },
+            re.VERBOSE | re.DOTALL,
+        )
+        self.line_numbers_regex = re.compile(rb"[0-9]+")
+
+        letters = string.ascii_uppercase
+        self.identifier_table = tuple(
+            name
+            for name in [*letters, *(first + second for first in letters for second in letters + string.digits)]
+            if name not in ascii2token
+        )
+
+    def scan(self, line_code):
+        """
+        Split the tokenized code part into (kind, bytes) items.
+        Also returns the jump targets in this code part.
+        """
+        items = []
+        targets = []
+        for matchobj in self.code_regex.finditer(line_code):
+            kind = matchobj.lastgroup
+            if kind == "line_numbers" or kind == "jump":
+                line_numbers = matchobj.group("line_numbers")
+                if line_numbers:
+                    targets.extend(int(number) for number in self.line_numbers_regex.findall(line_numbers))
+                kind = KIND_OTHER
+            elif kind == "function":
+                kind = KIND_OTHER
+            items.append((kind, matchobj.group()))
+        return items, targets
+
+    def _significant(self, items, index, step):
+        """
+        Returns the index of the next item that is not a space, or None.
+        """
+        index += step
+        while 0 <= index < len(items):
+            if items[index][0] != KIND_SPACE:
+                return index
+            index += step
+        return None
+
+    def _precedence(self, items, index):
+        """
+        Returns the precedence of the operator item or None for all other
+        items. A + or - without a operand before is a unary operator.
+        """
+        if index is None or items[index][0] != KIND_OPERATOR:
+            return None
+        operator = self.operators[items[index][1]]
+        if operator in "+-":
+            before = self._significant(items, index, -1)
+            if before is None:
+                return PRECEDENCE["unary"]
+            if items[before][0] not in (KIND_NUMBER, KIND_HEX, KIND_NAME) and items[before][1] != b")":
+                return PRECEDENCE["unary"]
+        return PRECEDENCE[operator]
+
+    def _calculate(self, left, operator, right):
+        if operator == "+":
+            return left + right
+        if operator == "-":
+            return left - right
+        if operator == "*":
+            return left * right
+        if operator == "/":
+            if right == 0 or left % right:
+                return None
+            return left // right
+        if right > 31:
+            return None
+        return left**right
+
+    def fold(self, items):
+        """
+        Fold the constant integer expressions in the items.
+        Returns the count of folded expressions and the saved cycles.
+        """
+        folded = cycles = 0
+        index = 0
+        while index < len(items):
+            kind, value = items[index]
+            if kind != KIND_OPERATOR or self._precedence(items, index) == PRECEDENCE["unary"]:
+                index += 1
+                continue
+            left_index = self._significant(items, index, -1)
+            right_index = self._significant(items, index, 1)
+            if (
+                left_index is None
+                or right_index is None
+                or items[left_index][0] != KIND_NUMBER
+                or items[right_index][0] != KIND_NUMBER
+                or not items[left_index][1].isdigit()
+                or not items[right_index][1].isdigit()
+            ):
+                index += 1
+                continue
+
+            operator = self.operators[value]
+            precedence = PRECEDENCE[operator]
+            before_precedence = self._precedence(items, self._significant(items, left_index, -1))
+            after_precedence = self._precedence(items, self._significant(items, right_index, 1))
+            if (before_precedence is not None and before_precedence >= precedence) or (
+                after_precedence is not None and after_precedence > precedence
+            ):
+                index += 1
+                continue
+
+            result = self._calculate(int(items[left_index][1]), operator, int(items[right_index][1]))
+            if result is None or not 0 <= result <= MAX_FOLD_VALUE:
+                index += 1
+                continue
+
+            left_text = items[left_index][1].decode("ascii")
+            right_text = items[right_index][1].decode("ascii")
+            result_text = "%i" % result
+            cycles += (
+                literal_cycles(left_text)
+                + literal_cycles(right_text)
+                + OPERATOR_CYCLES[operator]
+                - literal_cycles(result_text)
+            )
+            items[left_index:right_index + 1] = [(KIND_NUMBER, result_text.encode("ascii"))]
+            folded += 1
+            index = 0  # the result can be folded again, e.g.: 1+2*3
+        return folded, cycles
+
+    def rewrite_hex(self, items):
+        """
+        Rewrite the large integer literals into the &H form.
+        Returns the count of rewritten literals and the saved cycles.
+        """
+        count = cycles = 0
+        for index, (kind, value) in enumerate(items):
+            if kind != KIND_NUMBER or not value.isdigit():
+                continue
+            number = int(value)
+            if not MIN_HEX_VALUE <= number <= MAX_HEX_VALUE:
+                continue
+            hex_text = "&H%X" % number
+            saved = literal_cycles(value.decode("ascii")) - literal_cycles(hex_text)
+            if saved > 0:
+                items[index] = (KIND_HEX, hex_text.encode("ascii"))
+                count += 1
+                cycles += saved
+        return count, cycles
+
+    def find_hot_lines(self, lines):
+        """
+        The loop bodies: the lines from a FOR to the next NEXT and the
+        lines from a jump target to a backwards jump.
+        """
+        line_numbers = [line_number for line_number, parts, targets in lines]
+        indexes = {line_number: index for index, line_number in enumerate(line_numbers)}
+        hot = [False] * len(lines)
+        for_stack = []
+        for index, (_line_number, parts, targets) in enumerate(lines):
+            for is_code, items in parts:
+                if not is_code:
+                    continue
+                for _kind, value in items:
+                    if value == self.for_token:
+                        for_stack.append(index)
+                    elif value == self.next_token and for_stack:
+                        start = for_stack.pop()
+                        hot[start:index + 1] = [True] * (index + 1 - start)
+            for target in targets:
+                start = indexes.get(target)
+                if start is not None and start <= index:
+                    hot[start:index + 1] = [True] * (index + 1 - start)
+        return [line_number for line_number, is_hot in zip(line_numbers, hot) if is_hot]
+
+    def optimize(self, ascii_listing, hot_lines=None, parser=None):
+        """
+        Returns the optimized listing and a NumberOptimizerResult.
+        :param hot_lines: line numbers of the hot lines, found automatically if None
+        """
+        if parser is None:
+            parser = basic_parser.BASICParser()
+        code_type = basic_parser.CODE_TYPE_CODE
+
+        # 1. pass: scan, fold and rewrite the literals in all code parts:
+        lines = []
+        cycles_saved = {}
+        folded = hex_literals = 0
+        used_names = set()
+        uses_clear = False
+        for line_number, start, end in parser.iter_lines(ascii_listing):
+            parts = []
+            targets = []
+            line_cycles = 0
+            for part_type, part_start, part_end in parser.split_line(ascii_listing, start, end):
+                part = ascii_listing[part_start:part_end]
+                if part_type != code_type:
+                    parts.append((False, part))
+                    continue
+                items, part_targets = self.scan(self.tokenize(part))
+                targets += part_targets
+                count, cycles = self.fold(items)
+                folded += count
+                line_cycles += cycles
+                if self.hex_literals:
+                    count, cycles = self.rewrite_hex(items)
+                    hex_literals += count
+                    line_cycles += cycles
+                for kind, value in items:
+                    if kind == KIND_NAME:
+                        used_names.add(value[:2].decode("ascii"))
+                    elif value[:1] in self.clear_tokens:  # also "RUN 10" jump items
+                        uses_clear = True
+                parts.append((True, items))
+            if line_cycles:
+                cycles_saved[line_number] = line_cycles
+            lines.append((line_number, parts, targets))
+
+        if hot_lines is None:
+            hot_lines = self.find_hot_lines(lines)
+        hot_lines = set(hot_lines)
+
+        # 2. hoist the non-integer numbers that are used more than once in the hot lines:
+        hoisted = {}
+        if lines and not uses_clear and lines[0][0] > 0:
+            literal_counts = {}
+            for line_number, parts, _targets in lines:
+                if line_number in hot_lines:
+                    for is_code, items in parts:
+                        if is_code:
+                            for kind, value in items:
+                                if kind == KIND_NUMBER and not value.isdigit():
+                                    literal_counts[value] = literal_counts.get(value, 0) + 1
+            free_names = (name for name in self.identifier_table if name[:2] not in used_names)
+            for literal, count in literal_counts.items():
+                if count > 1 and literal_cycles(literal.decode("ascii")) > VARIABLE_CYCLES:
+                    hoisted[literal] = next(free_names).encode("ascii")
+        elif uses_clear:
+            log.info("No numbers hoisted: The program uses CLEAR, RUN, NEW or LOAD, that delete all variables.")
+
+        # 3. pass: write the new listing:
+        new_lines = []
+        if hoisted:
+            init_code = b":".join(b"%s=%s" % (name, literal) for literal, name in hoisted.items())
+            new_lines.append("%i %s" % (lines[0][0] - 1, init_code.decode("ascii")))
+        for line_number, parts, _targets in lines:
+            new_parts = []
+            line_cycles = 0
+            for is_code, items in parts:
+                if not is_code:
+                    new_parts.append(items)
+                    continue
+                if line_number in hot_lines and hoisted:
+                    new_items = []
+                    for kind, value in items:
+                        if kind in (KIND_NUMBER, KIND_HEX) and value in hoisted:
+                            line_cycles += literal_cycles(value.decode("ascii")) - VARIABLE_CYCLES
+                            new_items.append((KIND_NAME, hoisted[value]))
+                        else:
+                            new_items.append((kind, value))
+                    items = new_items
+                new_parts.append(self._items2code(items))
+            if line_cycles:
+                cycles_saved[line_number] = cycles_saved.get(line_number, 0) + line_cycles
+            new_lines.append("%i %s" % (line_number, "".join(new_parts)))
+
+        result = NumberOptimizerResult(
+            cycles_saved=dict(sorted(cycles_saved.items())),
+            folded=folded,
+            hex_literals=hex_literals,
+            hoisted={literal.decode("ascii"): name.decode("ascii") for literal, name in hoisted.items()},
+            hot_lines=sorted(hot_lines),
+        )
+        return "\n".join(new_lines), result
+
+    def _items2code(self, items):
+        line_code = b"".join(value for kind, value in items)
+        code = self.detokenize(line_code)
+        if self.tokenize(code) != line_code:
+            # A new name/number and the keyword next to it would be
+            # tokenized in a different way: separate them
+            line_code = b"".join(b" %s " % value if kind == KIND_NAME else value for kind, value in items)
+            code = self.detokenize(line_code)
+        return code
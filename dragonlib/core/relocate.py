@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+
+"""
+    Relocate hot subroutines
+    ========================
+
+    The ROM interpreter finds the line of a GOTO/GOSUB by walking the
+    next-address chain of the program: From the current line, if the
+    target line number is bigger, otherwise from the program start.
+    Every line on the way costs one link hop, so a subroutine at the end
+    of a long program is expensive to call from everywhere.
+
+    The SubroutineRelocator estimates the link hops of all jumps and can
+    move the most called subroutines to the front of the program. The
+    program gets a new first line "GOTO <first main line>" and all lines
+    are renumbered in the new order.
+
+    A subroutine is the block of lines from a GOSUB target to the first line
+    that ends with a unconditional RETURN, GOTO, END or STOP. A block is
+    only moved if no code can run into it: The line before must also end
+    with one of them. Lines with IF or ON are never unconditional.
+    Blocks with DATA are not moved, because it would change the READ order.
+
+    Like RENUM only the GOTO, GOSUB, THEN, ELSE and ON... line numbers are
+    changed, e.g.: RUN 100 isn't.
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import logging
+import re
+from collections import namedtuple
+
+from dragonlib.core.basic import BasicListing, BasicProgram, RenumPlan, TokenRenumTool
+
+
+log = logging.getLogger(__name__)
+
+
+JumpHops = namedtuple("JumpHops", ("line_number", "target", "is_gosub", "hops"))
+
+
+def count_hops(line_index, target_index):
+    """
+    Link hops of the line search from line >line_index< to >target_index<:
+
+    >>> count_hops(2, 5)  # forward: search from the current line
+    3
+    >>> count_hops(5, 2)  # backward: search from the program start
+    2
+    >>> count_hops(5, 5)  # the own line: search from the program start
+    5
+    """
+    if target_index > line_index:
+        return target_index - line_index
+    return target_index
+
+
+class HopAnalysis:
+    """
+    Estimated link hops of all jumps of a program:
+        * .jumps - list of JumpHops, .hops is None for missing targets
+        * .weights - line number -> how often the line runs (default: 1)
+    """
+
+    def __init__(self, jumps, weights=None):
+        self.jumps = jumps
+        self.weights = weights or {}
+
+    @property
+    def total_hops(self):
+        """
+        The weighted link hops of all jumps.
+        """
+        weights = self.weights
+        return sum(jump.hops * weights.get(jump.line_number, 1) for jump in self.jumps if jump.hops is not None)
+
+    def get_target_hops(self):
+        """
+        Returns target line number -> the weighted link hops of all jumps to it.
+        """
+        weights = self.weights
+        target_hops = {}
+        for jump in self.jumps:
+            if jump.hops is not None:
+                hops = jump.hops * weights.get(jump.line_number, 1)
+                target_hops[jump.target] = target_hops.get(jump.target, 0) + hops
+        return target_hops
+
+    @property
+    def missing_targets(self):
+        return sorted({jump.target for jump in self.jumps if jump.hops is None})
+
+    def __repr__(self):
+        return "<HopAnalysis jumps: %i, hops: %i>" % (len(self.jumps), self.total_hops)
+
+
+class RelocationReport:
+    """
+    Result of SubroutineRelocator.relocate():
+        * .old_hops / .new_hops - weighted link hops of all jumps
+        * .moved - the old first line numbers of the moved subroutines
+        * .skipped - old first line number -> why the subroutine is not moved
+        * .renum_dict - old line number -> new line number (empty: nothing changed)
+    """
+
+    def __init__(self, old_hops, new_hops, moved, skipped, renum_dict):
+        self.old_hops = old_hops
+        self.new_hops = new_hops
+        self.moved = moved
+        self.skipped = skipped
+        self.renum_dict = renum_dict
+
+    @property
+    def hops_saved(self):
+        return self.old_hops - self.new_hops
+
+    def __str__(self):
+        return "%i subroutines moved: %i -> %i link hops (%i saved)" % (
+            len(self.moved),
+            self.old_hops,
+            self.new_hops,
+            self.hops_saved,
+        )
+
+
+class SubroutineRelocator:
+    """
+    >>> from dragonlib.api import Dragon32API
+    >>> api = Dragon32API()
+    >>> dump = api.ascii_listing2program_dump(
+    ...     '10 FOR I=1 TO 9\\n20 GOSUB 100\\n30 NEXT I\\n40 END\\n'
+    ...     '50 PRINT "A"\\n60 PRINT "B"\\n70 RETURN\\n100 PRINT I\\n110 RETURN'
+    ... )
+    >>> relocator = SubroutineRelocator(api.token_util)
+    >>> relocator.analyze(dump, program_start=0x1e01).jumps
+    [JumpHops(line_number=20, target=100, is_gosub=True, hops=6)]
+    >>> new_dump, report = relocator.relocate(dump, program_start=0x1e01, weights={20: 9})
+    >>> print(api.program_dump2ascii(new_dump, program_start=0x1e01))
+    10 GOTO 40
+    20 PRINT I
+    30 RETURN
+    40 FOR I=1 TO 9
+    50 GOSUB 20
+    60 NEXT I
+    70 END
+    80 PRINT "A"
+    90 PRINT "B"
+    100 RETURN
+    >>> print(report)
+    1 subroutines moved: 54 -> 12 link hops (42 saved)
+    """
+
+    def __init__(self, token_util):
+        self.token_util = token_util
+        self.renum_tool = TokenRenumTool(token_util)
+
+        def token(code):
+            return re.escape(bytes((token_util.ascii2token_dict[code],)))
+
+        self.sub_token = bytes((token_util.ascii2token_dict["SUB"],))
+        self.goto_code = token_util.keyword_trie.tokenize("GOTO")
+        self.statement_regex = re.compile(
+            rb"""
+                "[^"]*"?                                  # string (maybe not terminated)
+                | (?P<comment>(?:%(rem)s|%(rem2)s).*)     # comment until the line end
+                | (?P<data>%(data)s)(?:"[^"]*"?|[^:"])*   # DATA until : outside a string
+                | \xff.                                    # function token
+                | (?P<condition>%(if)s|%(on)s)
+                | (?P<colon>:)
+            """
+            % {
+                b"rem": token("REM"),
+                b"rem2": token("'"),
+                b"data": token("DATA"),
+                b"if": token("IF"),
+                b"on": token("ON"),
+            },
+            re.VERBOSE | re.DOTALL,
+        )
+        self.unconditional_regex = re.compile(
+            rb"(?:%(return)s|%(end)s|%(stop)s|%(go)s\x20*%(to)s\x20*[0-9]+)\x20*\Z"
+            % {
+                b"return": token("RETURN"),
+                b"end": token("END"),
+                b"stop": token("STOP"),
+                b"go": token("GO"),
+                b"to": token("TO"),
+            }
+        )
+
+    def _get_lines(self, dump, program_start, listing):
+        if listing is None:
+            listing = BasicListing(self.token_util.basic_token_dict)
+        return [
+            (line_number, bytes(tokens[:-1]) if tokens[-1:] == b"\x00" else bytes(tokens))
+            for line_number, tokens in listing.iter_dump_lines(dump, program_start)
+        ]
+
+    def _get_jumps(self, lines):
+        """
+        Returns the (line index, target index, target, is gosub) of all jumps.
+        The target index is None, if the line doesn't exist.
+        """
+        line_indexes = {line_number: index for index, (line_number, line_code) in enumerate(lines)}
+        sub_token = self.sub_token
+        jumps = []
+        for index, (_line_number, line_code) in enumerate(lines):
+            for jump, target in self.renum_tool.iter_jumps(line_code):
+                jumps.append((index, line_indexes.get(target), target, sub_token in jump))
+        return jumps
+
+    def analyze(self, dump, program_start, listing=None, weights=None):
+        """
+        Returns the HopAnalysis of all jumps in the program dump.
+        >weights< maps line numbers to how often the line runs, e.g.:
+        from a profiler or a guess for loops. Missing lines count 1.
+        """
+        lines = self._get_lines(dump, program_start, listing)
+        return self._analyze(lines, self._get_jumps(lines), weights)
+
+    def _analyze(self, lines, jumps, weights):
+        hop_jumps = []
+        for line_index, target_index, target, is_gosub in jumps:
+            hops = None if target_index is None else count_hops(line_index, target_index)
+            hop_jumps.append(JumpHops(lines[line_index][0], target, is_gosub, hops))
+        return HopAnalysis(hop_jumps, weights)
+
+    def _line_flow(self, line_code):
+        """
+        Returns if the line ends unconditional and if it contains DATA.
+        """
+        code_end = len(line_code)
+        colons = []
+        conditional = has_data = False
+        for matchobj in self.statement_regex.finditer(line_code):
+            if matchobj.group("comment") is not None:
+                code_end = matchobj.start()
+                break
+            elif matchobj.group("colon") is not None:
+                colons.append(matchobj.start())
+            elif matchobj.group("condition") is not None:
+                conditional = True
+            elif matchobj.group("data") is not None:
+                has_data = True
+
+        code = line_code[:code_end].rstrip(b" :")
+        statement_start = 0
+        for position in colons:
+            if position < len(code):
+                statement_start = position + 1
+        statement = code[statement_start:].lstrip(b" ")
+        unconditional = not conditional and self.unconditional_regex.match(statement) is not None
+        return unconditional, has_data
+
+    def _find_block(self, lines, flows, start):
+        """
+        Returns the index after the subroutine block that starts at
+        line index >start< or the reason why it can't be moved.
+        """
+        if start == 0:
+            return None, "first line"
+        if not flows[start - 1][0]:
+            return None, "previous line %i runs into it" % lines[start - 1][0]
+        for index in range(start, len(lines)):
+            unconditional, has_data = flows[index]
+            if has_data:
+                return None, "DATA in line %i" % lines[index][0]
+            if unconditional:
+                return index + 1, None
+        return None, "no RETURN"
+
+    def _total_hops(self, order, jumps, weights, line_count):
+        """
+        The weighted link hops of the program in the new line order.
+        A moved program starts with the GOTO to the first main line.
+        """
+        positions = [0] * line_count
+        for position, index in enumerate(order, start=1):  # position 0: the GOTO line
+            positions[index] = position
+        # The first line is never moved: The GOTO to it runs once
+        total = positions[0]
+        for line_index, target_index, _target, _is_gosub in jumps:
+            if target_index is not None:
+                hops = count_hops(positions[line_index], positions[target_index])
+                total += hops * weights.get(line_index, 1)
+        return total
+
+    def relocate(
+        self, dump, program_start, listing=None, weights=None, max_subroutines=None, new_start=10, step=10
+    ):
+        """
+        Move the most called subroutines to the front of the program, as
+        long as the weighted link hops (see analyze()) gets less.
+        Returns the new program dump as bytearray and a RelocationReport.
+        The new line numbers starts with >new_start< in >step< steps.
+        """
+        lines = self._get_lines(dump, program_start, listing)
+        jumps = self._get_jumps(lines)
+        analysis = self._analyze(lines, jumps, weights)
+        old_hops = analysis.total_hops
+
+        # weights by line index and the weighted GOSUB calls per line index:
+        weights = weights or {}
+        index_weights = {}
+        calls = {}
+        for index, (line_number, _line_code) in enumerate(lines):
+            if line_number in weights:
+                index_weights[index] = weights[line_number]
+        for line_index, target_index, _target, is_gosub in jumps:
+            if is_gosub and target_index is not None:
+                calls[target_index] = calls.get(target_index, 0) + index_weights.get(line_index, 1)
+
+        flows = [self._line_flow(line_code) for line_number, line_code in lines]
+        line_count = len(lines)
+        blocks = []
+        moved_indexes = set()
+        moved = []
+        skipped = {}
+        new_hops = old_hops
+        for start in sorted(calls, key=lambda index: (-calls[index], index)):
+            line_number = lines[start][0]
+            if max_subroutines is not None and len(blocks) >= max_subroutines:
+                skipped[line_number] = "max subroutines"
+                continue
+            end, reason = self._find_block(lines, flows, start)
+            if reason is None and moved_indexes.intersection(range(start, end)):
+                reason = "overlaps a moved subroutine"
+            if reason is None:
+                new_blocks = blocks + [range(start, end)]
+                order = self._get_order(new_blocks, line_count)
+                hops = self._total_hops(order, jumps, index_weights, line_count)
+                if hops >= new_hops:
+                    reason = "no hops saved"
+            if reason is not None:
+                log.debug("Don't move subroutine %i: %s", line_number, reason)
+                skipped[line_number] = reason
+                continue
+
+            log.info("Move subroutine %i (lines: %i): %i -> %i hops", line_number, end - start, new_hops, hops)
+            blocks = new_blocks
+            moved_indexes.update(range(start, end))
+            moved.append(line_number)
+            new_hops = hops
+
+        if not blocks:
+            return bytearray(dump), RelocationReport(old_hops, old_hops, moved, skipped, {})
+
+        order = self._get_order(blocks, line_count)
+        new_lines = [lines[index] for index in order]
+        renum_dict = RenumPlan(
+            [line_number for line_number, line_code in new_lines], new_start=new_start + step, step=step
+        ).renum_dict
+        program = BasicProgram()
+        program.append(new_start, b"%s %i" % (self.goto_code, renum_dict[lines[0][0]]))
+        self.renum_tool.renum_program(new_lines, renum_dict, program)
+
+        new_dump = program.program_dump(program_start)
+        return new_dump, RelocationReport(old_hops, new_hops, moved, skipped, renum_dict)
+
+    def _get_order(self, blocks, line_count):
+        """
+        The line indexes of the moved blocks and then all other lines.
+        """
+        order = []
+        for block in blocks:
+            order.extend(block)
+        moved_indexes = set(order)
+        order.extend(index for index in range(line_count) if index not in moved_indexes)
+        return order
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+
+"""
+    API statistics
+    ==============
+
+    Opt-in wall time per processing stage and counters of the API calls.
+
+    If the statistics are disabled, all stages and counters go to the
+    NULL_STATS object that does nothing. So the costs are only a few
+    method calls per API call, not per BASIC line.
+
+    >>> api_stats = APIStats(enabled=True)
+    >>> with api_stats.call() as stats:
+    ...     with stats.stage("parse"):
+    ...         stats.count("lines", 10)
+    >>> api_stats.last.counters
+    {'lines': 10}
+    >>> with api_stats.call() as stats:
+    ...     stats.count("lines", 5)
+    >>> api_stats.last.counters
+    {'lines': 5}
+    >>> api_stats.total.counters
+    {'lines': 15}
+    >>> list(api_stats.total.stage_times)
+    ['parse']
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import contextlib
+import time
+
+
+class StageTimer:
+    __slots__ = ("stats", "stage_name", "start_time")
+
+    def __init__(self, stats, stage_name):
+        self.stats = stats
+        self.stage_name = stage_name
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.add_time(self.stage_name, time.perf_counter() - self.start_time)
+
+
+class Stats:
+    """
+    Wall time in seconds per stage and counters of one or more API calls.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stage_times = {}
+        self.counters = {}
+
+    def stage(self, stage_name):
+        """
+        Returns a context manager that measures the wall time of a stage.
+        """
+        return StageTimer(self, stage_name)
+
+    def add_time(self, stage_name, seconds):
+        self.stage_times[stage_name] = self.stage_times.get(stage_name, 0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """
+        Set a counter of this call, e.g.: the bytes in/out of the outermost
+        API call overwrites the values of the inner calls.
+        """
+        self.counters[name] = value
+
+    def add(self, other):
+        """
+        Sum the stage times and counters of the other Stats instance into this one.
+        """
+        for stage_name, seconds in other.stage_times.items():
+            self.add_time(stage_name, seconds)
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def as_dict(self):
+        return {
+            "stage_times": dict(self.stage_times),
+            "counters": dict(self.counters),
+        }
+
+    def __repr__(self):
+        stages = ", ".join("%s=%.6fsec." % item for item in self.stage_times.items())
+        counters = ", ".join("%s=%i" % item for item in self.counters.items())
+        return "<Stats stages: %s - counters: %s>" % (stages or "-", counters or "-")
+
+
+class NullStats:
+    """
+    Used if the statistics are disabled: Records nothing.
+    """
+
+    enabled = False
+    stage_times = {}
+    counters = {}
+
+    _null_context = contextlib.nullcontext()
+
+    def stage(self, stage_name):
+        return self._null_context
+
+    def add_time(self, stage_name, seconds):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def set(self, name, value):
+        pass
+
+    def add(self, other):
+        pass
+
+    def as_dict(self):
+        return {"stage_times": {}, "counters": {}}
+
+    def __repr__(self):
+        return "<NullStats>"
+
+
+NULL_STATS = NullStats()
+
+
+class StatsCall:
+    """
+    Context manager for one API call: Only the outermost call starts new
+    >last< statistics and adds them to the >total< on exit.
+    """
+
+    __slots__ = ("api_stats",)
+
+    def __init__(self, api_stats):
+        self.api_stats = api_stats
+
+    def __enter__(self):
+        api_stats = self.api_stats
+        if api_stats.call_depth == 0:
+            api_stats.last = Stats()
+        api_stats.call_depth += 1
+        return api_stats.last
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        api_stats = self.api_stats
+        api_stats.call_depth -= 1
+        if api_stats.call_depth == 0:
+            api_stats.total.add(api_stats.last)
+
+
+class APIStats:
+    """
+    Statistics of the API calls:
+        * .last - Stats of the last API call
+        * .total - Sum of all API calls since the last reset()
+    """
+
+    _null_call = contextlib.nullcontext(NULL_STATS)
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.call_depth = 0
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+        self.reset()
+
+    def disable(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        if self.enabled:
+            self.last = Stats()
+            self.total = Stats()
+        else:
+            self.last = NULL_STATS
+            self.total = NULL_STATS
+
+    def call(self):
+        """
+        Returns a context manager for one API call, that returns the
+        Stats instance to record into.
+        """
+        if not self.enabled:
+            return self._null_call
+        return StatsCall(self)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+"""
+    Tokenization cache
+    ==================
+
+    Cache the tokenized code of BASIC lines, keyed by the BASIC dialect and
+    the line content (the code without the line number). So unchanged lines
+    are not tokenized again, even if they are moved or renumbered.
+
+    The content is normalized by the caller: Trailing blanks are not part of
+    the key, see BasicListing.iter_tokenized_lines()
+
+    The cache is a in-memory LRU with a optional on-disk store (via dbm),
+    to share the cache between runs. The store records TOKENIZER_VERSION and
+    is emptied, if it was written by a other tokenizer version.
+
+    >>> cache = TokenCache(maxsize=2)
+    >>> cache.get("Dragon32", "PRINT") is None
+    True
+    >>> cache.set("Dragon32", "PRINT", b"\\x87")
+    >>> cache.get("Dragon32", "PRINT")
+    b'\\x87'
+    >>> cache.get("CoCo", "PRINT") is None
+    True
+    >>> cache.cache_info()
+    CacheInfo(hits=1, misses=2, disk_hits=0, maxsize=2, currsize=1)
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import dbm
+import logging
+from collections import OrderedDict, namedtuple
+
+
+log = logging.getLogger(__name__)
+
+
+# Increase this, if the tokenizer output changes: Stored line codes of a
+# other version are not used.
+TOKENIZER_VERSION = 1
+
+VERSION_KEY = b"\x00version"
+
+
+CacheInfo = namedtuple("CacheInfo", ("hits", "misses", "disk_hits", "maxsize", "currsize"))
+
+
+class TokenCache:
+    def __init__(self, maxsize=10000, path=None):
+        """
+        :param maxsize: max. number of lines in the in-memory LRU
+        :param path: file path of the on-disk store, created if not exists
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self.memory = OrderedDict()
+        if path is None:
+            self.store = None
+        else:
+            self.store = dbm.open(str(path), "c")
+            version = str(TOKENIZER_VERSION).encode("ascii")
+            if self.store.get(VERSION_KEY) != version:
+                log.info("Empty token cache %r: Not written by tokenizer version %s", str(path), TOKENIZER_VERSION)
+                self.store.close()
+                self.store = dbm.open(str(path), "n")
+                self.store[VERSION_KEY] = version
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def _get_key(self, dialect, content):
+        return "%s\x00%s" % (dialect, content)
+
+    def get(self, dialect, content):
+        """
+        Returns the cached line code bytes or None
+        """
+        key = self._get_key(dialect, content)
+        try:
+            line_code = self.memory[key]
+        except KeyError:
+            pass
+        else:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return line_code
+
+        if self.store is not None:
+            line_code = self.store.get(key.encode("utf-8"))
+            if line_code is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._set_memory(key, line_code)
+                return line_code
+
+        self.misses += 1
+        return None
+
+    def set(self, dialect, content, line_code):
+        key = self._get_key(dialect, content)
+        self._set_memory(key, line_code)
+        if self.store is not None:
+            self.store[key.encode("utf-8")] = line_code
+
+    def _set_memory(self, key, line_code):
+        self.memory[key] = line_code
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.disk_hits, self.maxsize, len(self.memory))
+
+    def clear(self):
+        """
+        Clear the in-memory LRU and the statistics, but not the on-disk store.
+        """
+        self.memory.clear()
+        self.hits = self.misses = self.disk_hits = 0
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
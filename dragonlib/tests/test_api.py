@@ -10,12 +10,17 @@
 """
 
 
+import mmap
 import os
+import struct
 import textwrap
 import logging
+from unittest import mock
 
-from dragonlib.api import Dragon32API
-from dragonlib.core.basic import BasicLine
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing, load_autoload_dwl
+from dragonlib.core.basic import BasicLine, BasicProgram, CompactBasicLine
+from dragonlib.core.binary_files import BinaryFile
 from dragonlib.tests import testdata
 from dragonlib.tests.test_base import BaseTestCase
 
@@ -144,6 +149,26 @@ class Dragon32BASIC_LowLevel_ApiTest(BaseDragon32ApiTestCase):
         self.assertEqual(ascii_listing, "10 CLS")
         self.assertEqual(len(basic_lines), 1)
 
+    def test_iter_basic_lines(self):
+        dump = bytes(testdata.LISTING_02_BIN)
+        basic_lines = self.dragon32api.listing.iter_basic_lines(memoryview(dump), program_start=0xABCD)
+        self.assertEqual(next(basic_lines).get_content(), "10 CLS")
+        self.assertEqual(
+            [line.get_content() for line in basic_lines],
+            list(testdata.LISTING_02[1:]),
+        )
+
+    def test_load_big_dump(self):
+        ascii_listing = "\n".join("%i PRINT %i" % (line_no, line_no) for line_no in range(1, 3001))
+        program_dump = self.dragon32api.ascii_listing2program_dump(ascii_listing)
+
+        # More lines than the recursion limit:
+        basic_lines = self.dragon32api.listing.dump2basic_lines(program_dump, program_start=0x1E01)
+        self.assertEqual(len(basic_lines), 3000)
+        self.assertEqual(basic_lines[-1].get_content(), "3000 PRINT 3000")
+
+        self.assertEqual(self.dragon32api.program_dump2ascii_lines(program_dump), ascii_listing.splitlines())
+
     def test_tokens2ascii(self):
         self.basic_line.token_load(
             line_number=50,
@@ -174,6 +199,19 @@ class Dragon32BASIC_LowLevel_ApiTest(BaseDragon32ApiTestCase):
         code = self.basic_line.get_content()
         self.assertEqual(code, '50 I$ = INKEY$:IF I$="" THEN 50')
 
+    def test_detokenize(self):
+        self.assertEqual(self.token_util.detokenize(b""), "")
+        self.assertEqual(self.token_util.detokenize(b"\x80I=1\xbc9"), "FORI=1TO9")
+        self.assertEqual(
+            self.token_util.detokenize(memoryview(b"\x87\xff\x9a;\xff\x8e(1)")),
+            "PRINTINKEY$;STR$(1)",
+        )
+        # Unknown function token:
+        self.assertEqual(self.token_util.detokenize(b"A\xff\xfeB"), "AB")
+
+        # Combined function token values:
+        self.assertEqual(self.token_util.tokens2ascii([0x87, 0xFF9A]), "PRINTINKEY$")
+
     def test_ascii2tokens01(self):
         basic_lines = self.dragon32api.listing.ascii_listing2basic_lines('10 CLS')
         tokens = basic_lines[0].get_tokens()
@@ -220,6 +258,37 @@ class Dragon32BASIC_LowLevel_ApiTest(BaseDragon32ApiTestCase):
         )
         self.assertEqual(len(basic_lines), 1)
 
+    def test_ascii2token_all_keywords(self):
+        for token, keyword in self.token_util.basic_token_dict.items():
+            if token > 0xFF:
+                expected = [token >> 8, token & 0xFF]
+            else:
+                expected = [token]
+            self.assertHexList(self.token_util.ascii2token(keyword), expected, msg=keyword)
+
+    def test_ascii2token_longest_match(self):
+        self.assertHexList(
+            self.token_util.ascii2token("GOSUB10:INPUTA$:PRINTLEN(A$)"),
+            [
+                0x81,  # GO
+                0xBD,  # SUB
+                0x31,
+                0x30,  # 10
+                0x3A,  # :
+                0x89,  # INPUT
+                0x41,
+                0x24,  # A$
+                0x3A,  # :
+                0x87,  # PRINT
+                0xFF,
+                0x8D,  # LEN
+                0x28,
+                0x41,
+                0x24,
+                0x29,  # (A$)
+            ],
+        )
+
     def test_format_tokens(self):
         tokens = (0x49, 0x24, 0x20, 0xCB, 0x20, 0xFF, 0x9A)  # I$ = INKEY$
         formated_tokens = self.token_util.pformat_tokens(tokens)
@@ -236,11 +305,181 @@ class Dragon32BASIC_LowLevel_ApiTest(BaseDragon32ApiTestCase):
         )
 
 
+class BasicProgramTest(BaseDragon32ApiTestCase):
+    def test_dump2basic_program(self):
+        program = self.dragon32api.listing.dump2basic_program(testdata.LISTING_02_BIN, program_start=0xABCD)
+        self.assertEqual(len(program), 5)
+        self.assertEqual(list(program.line_numbers), [10, 20, 30, 40, 50])
+        self.assertEqual(program[0], CompactBasicLine(10, b"\xa0"))
+        self.assertEqual(program[-1].get_content(self.dragon32api.token_util), testdata.LISTING_02[-1])
+        self.assertEqual(
+            list(program.iter_ascii_lines(self.dragon32api.token_util)),
+            list(testdata.LISTING_02),
+        )
+        self.assertEqual(program.program_dump(program_start=0xABCD), bytearray(testdata.LISTING_02_BIN))
+
+    def test_from_basic_lines(self):
+        basic_lines = self.dragon32api.ascii_listing2basic_lines("\n".join(testdata.LISTING_02), program_start=0xABCD)
+        program = BasicProgram.from_basic_lines(basic_lines)
+        program_dump = program.program_dump(program_start=0xABCD)
+        self.assertEqual(program_dump, self.dragon32api.listing.basic_lines2program_dump(basic_lines, 0xABCD))
+        self.assertEqual(program_dump, bytearray(testdata.LISTING_02_BIN))
+
+    def test_compact_basic_line(self):
+        line = CompactBasicLine(10, [0xA0])
+        self.assertEqual(line.get_tokens(), b"\x00\x0a\xa0")
+        self.assertFalse(hasattr(line, "__dict__"))
+
+
+class SharedTokenUtilTest(BaseDragon32ApiTestCase):
+    def test_shared_token_util(self):
+        dragon32api = Dragon32API()
+        self.assertIs(dragon32api.token_util, self.dragon32api.token_util)
+        self.assertIs(dragon32api.listing.token_util, dragon32api.token_util)
+
+        coco_api = CoCoAPI()
+        self.assertIs(coco_api.token_util, CoCoAPI().token_util)
+        self.assertIsNot(coco_api.token_util, dragon32api.token_util)
+
+        basic_line = BasicLine(dragon32api.token_util)
+        self.assertIs(basic_line.tokens_replace_rules, dragon32api.token_util.tokens_replace_rules)
+
+    def test_read_only_tables(self):
+        token_util = self.dragon32api.token_util
+        with self.assertRaises(TypeError):
+            token_util.ascii2token_dict["FOO"] = 0x01
+        with self.assertRaises(TypeError):
+            token_util.basic_token_dict[0x01] = "FOO"
+
+
+class FusedTokenizeTest(BaseTestCase):
+    """
+    The fused parse and tokenize pass must create the same program dump
+    as the way over code objects and BasicLine instances.
+    """
+
+    def assert_same_program_dump(self, api, listing):
+        program_start = api.DEFAULT_PROGRAM_START
+        basic_lines = api.ascii_listing2basic_lines(listing, program_start)
+        reference = api.listing.basic_lines2program_dump(basic_lines, program_start)
+        self.assertEqual(api.ascii_listing2program_dump(listing, program_start), reference)
+
+    def test_corpus(self):
+        listings = [
+            "\n".join(testdata.LISTING_01),
+            "\n".join(testdata.LISTING_02),
+            load_autoload_dwl(Dragon32API()),
+            '10 DATA 1,"A:B":PRINT "ELSE\'"\n20 IF A THEN 10 ELSE PRINT\'COMMENT\n10 REM DUPLICATE',
+            "",
+        ]
+        listings += [generate_listing(line_count=300, seed=seed) for seed in range(3)]
+        for api_class in (Dragon32API, CoCoAPI):
+            api = api_class()
+            for no, listing in enumerate(listings):
+                with self.subTest(api=api.MACHINE_NAME, listing=no):
+                    self.assert_same_program_dump(api, listing)
+
+
+class APIStatsTest(BaseTestCase):
+    def test_disabled(self):
+        api = Dragon32API()
+        api.bas2bin("10 PRINT")
+        self.assertFalse(api.stats.last.enabled)
+        self.assertEqual(api.stats.total.as_dict(), {"stage_times": {}, "counters": {}})
+
+    def test_bas2bin_bin2bas(self):
+        api = Dragon32API(collect_stats=True)
+        listing = '10 A$="HELLO":PRINT A$\n20 GOTO 10'
+        data = api.bas2bin(listing)
+
+        bas2bin_stats = api.stats.last
+        self.assertEqual(list(bas2bin_stats.stage_times), ["tokenize", "link", "pack"])
+        self.assertEqual(
+            bas2bin_stats.counters,
+            {
+                "lines": 2,
+                "regex_splits": 3,
+                "tokens": 20,
+                "bytes_in": len(listing),
+                "bytes_out": len(data),
+            },
+        )
+
+        self.assertEqual(api.bin2bas(data), listing)
+        bin2bas_stats = api.stats.last
+        self.assertEqual(list(bin2bas_stats.stage_times), ["unpack", "detokenize"])
+        self.assertEqual(
+            bin2bas_stats.counters,
+            {"lines": 2, "bytes_in": len(data), "bytes_out": len(listing)},
+        )
+
+        total = api.stats.total
+        self.assertEqual(total.counters["lines"], 4)
+        self.assertEqual(total.counters["bytes_in"], len(listing) + len(data))
+        self.assertEqual(
+            total.stage_times["tokenize"] + total.stage_times["detokenize"],
+            bas2bin_stats.stage_times["tokenize"] + bin2bas_stats.stage_times["detokenize"],
+        )
+
+        api.stats.reset()
+        self.assertEqual(api.stats.total.counters, {})
+
+        api.stats.disable()
+        api.bas2bin(listing)
+        self.assertFalse(api.stats.total.enabled)
+
+
 class Dragon32BASIC_HighLevel_ApiTest(BaseDragon32ApiTestCase):
     def test_program_dump2ascii(self):
         listing = self.dragon32api.program_dump2ascii_lines(testdata.LISTING_02_BIN, program_start=0xABCD)
         self.assertEqual("\n".join(listing), "\n".join(testdata.LISTING_02))
 
+    def test_pformat_program_dump(self):
+        formated_dump = self.dragon32api.pformat_program_dump(bytearray(testdata.LISTING_01_BIN), program_start=0x1234)
+        self.assertEqual(
+            formated_dump,
+            [
+                "program start address: $1234",
+                "$123a -> next address (length: 6)",
+                "$000a -> 10 (line number)",
+                "tokens:",
+                "\t  $87 -> 'PRINT'",
+                "\t  $00 -> '\\x00'",
+                "$0000 -> end address",
+            ],
+        )
+
+    def test_iter_pformat_big_program_dump(self):
+        ascii_listing = "\n".join("%i CLS" % line_no for line_no in range(1, 3001))
+        program_dump = self.dragon32api.ascii_listing2program_dump(ascii_listing)
+
+        formated_lines = self.dragon32api.iter_pformat_program_dump(memoryview(program_dump))
+        self.assertEqual(next(formated_lines), "program start address: $1e01")
+        self.assertEqual(next(formated_lines), "$1e07 -> next address (length: 6)")
+
+        formated_lines = list(formated_lines)
+        self.assertEqual(len(formated_lines), 3000 * 5)
+        self.assertEqual(
+            formated_lines[-5:],
+            [
+                "$0bb8 -> 3000 (line number)",
+                "tokens:",
+                "\t  $a0 -> 'CLS'",
+                "\t  $00 -> '\\x00'",
+                "$0000 -> end address",
+            ],
+        )
+
+    def test_program_dump2ascii_string(self):
+        listing = self.dragon32api.program_dump2ascii(testdata.LISTING_02_BIN, program_start=0xABCD)
+        self.assertEqual(listing, "\n".join(testdata.LISTING_02))
+
+        program_dump = self.dragon32api.ascii_listing2program_dump("10 'FOO\n20 IF A THEN 10 ELSE 20")
+        self.assertEqual(
+            self.dragon32api.program_dump2ascii(program_dump),
+            "10 'FOO\n20 IF A THEN 10 ELSE 20",
+        )
+
     def test_ascii_listing2tokens(self):
         basic_program_ascii = "\n".join(testdata.LISTING_02)
         program_dump = self.dragon32api.ascii_listing2program_dump(basic_program_ascii, program_start=0xABCD)
@@ -544,6 +783,25 @@ class Dragon32BASIC_HighLevel_ApiTest(BaseDragon32ApiTestCase):
 
 
 class RenumTests(BaseDragon32ApiTestCase):
+    def test_renum_then_without_line_number(self):
+        old_listing = self._prepare_text(
+            """
+            5 IF A$="X" THEN DLOAD
+            7 IF A$="Y" THEN 5
+        """
+        )
+        with self.assertNoLogs("dragonlib", level=logging.ERROR):
+            new_listing = self.dragon32api.renum_ascii_listing(old_listing)
+        self.assertEqual(
+            new_listing,
+            self._prepare_text(
+                """
+            10 IF A$="X" THEN DLOAD
+            20 IF A$="Y" THEN 10
+        """
+            ),
+        )
+
     def test_renum01(self):
         old_listing = self._prepare_text(
             """
@@ -701,6 +959,91 @@ class RenumTests(BaseDragon32ApiTestCase):
         destinations = self.dragon32api.renum_tool.get_destinations(listing)
         self.assertEqual(destinations, [10, 20, 30, 40, 50, 70, 999])
 
+    def test_skip_strings_data_and_comments(self):
+        old_listing = self._prepare_text(
+            """
+            5 PRINT "GOTO 5":GOTO 7 ' GOTO 5
+            7 DATA GOTO 5:GOSUB 5 REM GOSUB 7
+        """
+        )
+        new_listing = self.dragon32api.renum_ascii_listing(old_listing)
+        self.assertEqual(
+            new_listing,
+            self._prepare_text(
+                """
+            10 PRINT "GOTO 5":GOTO 20 ' GOTO 5
+            20 DATA GOTO 5:GOSUB 10 REM GOSUB 7
+        """
+            ),
+        )
+        destinations = self.dragon32api.renum_tool.get_destinations(old_listing)
+        self.assertEqual(destinations, [5, 7])
+
+    def test_renum_new_old_step(self):
+        old_listing = self._prepare_text(
+            """
+            10 GOTO 30
+            20 GOSUB 40
+            30 GOTO 20
+            40 ON X GOTO 10,30,50
+            50 END
+        """
+        )
+        # like: RENUM 100,30,5
+        new_listing = self.dragon32api.renum_ascii_listing(old_listing, new_start=100, old_start=30, step=5)
+        self.assertEqual(
+            new_listing,
+            self._prepare_text(
+                """
+            10 GOTO 100
+            20 GOSUB 105
+            100 GOTO 20
+            105 ON X GOTO 10,100,110
+            110 END
+        """
+            ),
+        )
+
+    def test_renum_range(self):
+        old_listing = self._prepare_text(
+            """
+            10 GOTO 31
+            31 GOSUB 32
+            32 GOTO 40
+            40 GOTO 10
+        """
+        )
+        new_listing = self.dragon32api.renum_ascii_listing(old_listing, new_start=20, old_start=31, old_end=32, step=5)
+        self.assertEqual(
+            new_listing,
+            self._prepare_text(
+                """
+            10 GOTO 20
+            20 GOSUB 25
+            25 GOTO 40
+            40 GOTO 10
+        """
+            ),
+        )
+
+    def test_renum_collision_and_overflow(self):
+        listing = "10 PRINT\n20 PRINT\n30 PRINT"
+        with self.assertRaisesRegex(ValueError, "new line 10 is not after the unchanged line 10"):
+            self.dragon32api.renum_ascii_listing(listing, new_start=10, old_start=20)
+        with self.assertRaisesRegex(ValueError, "new line 30 is not before the unchanged line 30"):
+            self.dragon32api.renum_ascii_listing(listing, new_start=30, old_start=20, old_end=20)
+        with self.assertRaisesRegex(ValueError, "line 30 would get the number 64010 > 63999"):
+            self.dragon32api.renum_ascii_listing(listing, new_start=63990)
+        with self.assertRaisesRegex(ValueError, "step must be >= 1"):
+            self.dragon32api.renum_ascii_listing(listing, step=0)
+
+    def test_renum_duplicate_line_numbers(self):
+        # Every line gets a new number, jumps go to the last line:
+        self.assertEqual(
+            self.dragon32api.renum_ascii_listing("10 PRINT 1\n10 PRINT 2\n20 GOTO 10"),
+            "10 PRINT 1\n20 PRINT 2\n30 GOTO 20",
+        )
+
     def test_on_gosub_and_goto(self):
         old_listing = self._prepare_text(
             """
@@ -727,6 +1070,137 @@ class RenumTests(BaseDragon32ApiTestCase):
         )
 
 
+class TokenRenumTests(BaseDragon32ApiTestCase):
+    def assertRenumProgramDump(self, api, old_listing, new_listing, **renum_kwargs):
+        program_dump = api.ascii_listing2program_dump(self._prepare_text(old_listing))
+        new_program_dump = api.renum_program_dump(program_dump, **renum_kwargs)
+        self.assertEqual(api.program_dump2ascii(new_program_dump), self._prepare_text(new_listing))
+        return new_program_dump
+
+    def test_renum(self):
+        for api in (self.dragon32api, CoCoAPI()):
+            with self.subTest(api.MACHINE_NAME):
+                self.assertRenumProgramDump(
+                    api,
+                    """
+                    1 PRINT "ONE"
+                    11 GOTO 12
+                    12 PRINT "FOO":GOSUB 15
+                    14 IF A=1 THEN 20 ELSE 1
+                    15 ON X GO TO 1, 12 ,14:ON Y GO SUB 20
+                    20 PRINT "END?"
+                """,
+                    """
+                    10 PRINT "ONE"
+                    20 GOTO 30
+                    30 PRINT "FOO":GOSUB 50
+                    40 IF A=1 THEN 60 ELSE 10
+                    50 ON X GO TO 10, 30 ,40:ON Y GO SUB 60
+                    60 PRINT "END?"
+                """,
+                )
+
+    def test_skip_strings_data_comments_and_functions(self):
+        self.assertRenumProgramDump(
+            self.dragon32api,
+            """
+            5 PRINT "GOTO 5":GOTO 7 ' GOTO 5
+            7 DATA "GOTO 5",GOTO 5:GOSUB 5:REM GOSUB 7
+            9 X=RND 5:IF X THEN DLOAD
+        """,
+            """
+            10 PRINT "GOTO 5":GOTO 20 ' GOTO 5
+            20 DATA "GOTO 5",GOTO 5:GOSUB 10:REM GOSUB 7
+            30 X=RND 5:IF X THEN DLOAD
+        """,
+        )
+
+    def test_missing_line_number(self):
+        with self.assertLogs("dragonlib", level=logging.ERROR) as logs:
+            self.assertRenumProgramDump(
+                self.dragon32api,
+                """
+                1 GOTO 2
+                2 GOTO 123
+            """,
+                """
+                10 GOTO 20
+                20 GOTO 123
+            """,
+            )
+        self.assertEqual(logs.output, ["ERROR:dragonlib.core.basic:Error in line 2: line no. '123' doesn't exist."])
+
+    def test_same_as_ascii_renum(self):
+        for api in (self.dragon32api, CoCoAPI()):
+            for listing in (generate_listing(line_count=300), load_autoload_dwl(api)):
+                with self.subTest(api.MACHINE_NAME):
+                    program_dump = api.ascii_listing2program_dump(listing)
+                    self.assertEqual(
+                        api.renum_program_dump(program_dump),
+                        api.ascii_listing2program_dump(api.renum_ascii_listing(listing)),
+                    )
+
+    def test_renum_range(self):
+        self.assertRenumProgramDump(
+            self.dragon32api,
+            """
+            10 GOTO 31
+            31 GOSUB 32
+            32 GOTO 40
+            40 GOTO 10
+        """,
+            """
+            10 GOTO 20
+            20 GOSUB 25
+            25 GOTO 40
+            40 GOTO 10
+        """,
+            new_start=20,
+            old_start=31,
+            old_end=32,
+            step=5,
+        )
+        with self.assertRaisesRegex(ValueError, "RENUM collision"):
+            self.dragon32api.renum_program_dump(
+                self.dragon32api.ascii_listing2program_dump("10 PRINT\n20 PRINT"), new_start=10, old_start=20
+            )
+
+    def test_empty_program(self):
+        self.assertEqual(self.dragon32api.renum_program_dump(bytearray(b"\x00\x00")), bytearray())
+
+
+class CrossReferenceTests(BaseDragon32ApiTestCase):
+    def test_xref(self):
+        listing = self._prepare_text(
+            """
+            10 PRINT "GOTO 99":GOSUB 30
+            20 ON X GOTO 10, 30 ,40:GOTO 10 ' GOTO 77
+            30 IF A=1 THEN 10 ELSE 123
+            40 RETURN
+        """
+        )
+        program_dump = self.dragon32api.ascii_listing2program_dump(listing)
+        for xref in (self.dragon32api.xref_ascii_listing(listing), self.dragon32api.xref_program_dump(program_dump)):
+            with self.subTest(xref=xref):
+                self.assertEqual(xref.targets, {10: (30,), 20: (10, 30, 40), 30: (10, 123), 40: ()})
+                self.assertEqual(xref.callers, {30: [10, 20], 10: [20, 30], 40: [20], 123: [30]})
+                self.assertEqual(xref.get_callers(10), [20, 30])
+                self.assertEqual(xref.get_callers(20), [])
+                self.assertEqual(xref.get_targets(99), ())
+                self.assertEqual(xref.missing_targets, {123: [30]})
+
+    def test_ascii_and_program_dump(self):
+        for api in (self.dragon32api, CoCoAPI()):
+            for listing in (generate_listing(line_count=300), load_autoload_dwl(api)):
+                with self.subTest(api.MACHINE_NAME):
+                    xref1 = api.xref_ascii_listing(listing)
+                    xref2 = api.xref_program_dump(api.ascii_listing2program_dump(listing))
+                    self.assertEqual(xref1.targets, xref2.targets)
+                    self.assertEqual(xref1.callers, xref2.callers)
+                    self.assertEqual(xref1.missing_targets, {})
+                    self.assertEqual(sorted(xref1.callers), api.renum_tool.get_destinations(listing))
+
+
 class Dragon32bin(BaseDragon32ApiTestCase):
     def test_bas2bin_bin2bas_api_1(self):
         bas1 = "10 PRINT"
@@ -740,6 +1214,22 @@ class Dragon32bin(BaseDragon32ApiTestCase):
         bas2 = self.dragon32api.bin2bas(data)
         self.assertEqual(bas2, bas1)
 
+    def test_bas2bin_bin2bas_without_debug_logging(self):
+        bas1 = "\n".join(testdata.LISTING_01)
+        # No debug formatting of the tokens, if DEBUG is not enabled:
+        with mock.patch.object(
+            self.dragon32api.token_util, "pformat_tokens", side_effect=AssertionError("pformat_tokens called")
+        ):
+            with self.assertNoLogs("dragonlib", level=logging.INFO):
+                data = self.dragon32api.bas2bin(bas1)
+                bas2 = self.dragon32api.bin2bas(data)
+        self.assertEqual(bas2, bas1)
+
+    def test_bas2bin_with_debug_logging(self):
+        with self.assertLogs("dragonlib", level=logging.DEBUG) as cm:
+            self.dragon32api.bas2bin("10 PRINT")
+        self.assertIn("DEBUG:dragonlib.core.basic:'10 PRINT':\n\t\t  $87 -> 'PRINT'", cm.output)
+
     def test_bas2bin_api_1(self):
         bin = self.dragon32api.bas2bin("\n".join(testdata.LISTING_01), load_address=0x1234, exec_address=0x5678)
         self.assertBinEqual(bin, testdata.LISTING_01_DOS_DUMP)
@@ -780,3 +1270,30 @@ class Dragon32bin(BaseDragon32ApiTestCase):
 
         self.maxDiff = None
         self.assertBinEqual(bin, data)
+
+    def test_bin2bas_buffers(self):
+        filepath = os.path.join(os.path.dirname(__file__), "AUTOLOAD.DWL")
+        with open(filepath, "rb") as f:
+            data = f.read()
+            bas1 = self.dragon32api.bin2bas(data)
+            self.assertEqual(self.dragon32api.bin2bas(bytearray(data)), bas1)
+            self.assertEqual(self.dragon32api.bin2bas(memoryview(data)), bas1)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                self.assertEqual(self.dragon32api.bin2bas(mapped_file), bas1)
+
+    def test_bin2bas_decb(self):
+        listing = "\n".join(testdata.LISTING_01)
+        api = CoCoAPI()
+        program_dump = api.ascii_listing2program_dump(listing, program_start=0x2601)
+        data = struct.pack(">BHH", 0x00, len(program_dump), 0x2601) + program_dump + b"\xff\x00\x00\xa0\x27"
+        self.assertEqual(api.bin2bas(data), listing)
+
+    def test_load_from_bin_without_copy(self):
+        data = bytearray(self.dragon32api.bas2bin("10 PRINT"))
+        binary_file = BinaryFile()
+        binary_file.load_from_bin(data)
+        self.assertIs(binary_file.data.obj, data)
+        self.assertEqual(binary_file.data, data[9:])
+
+        data[9] = 0x12  # The payload is a view into the data
+        self.assertEqual(binary_file.data[0], 0x12)
@@ -11,10 +11,11 @@
 
 
 import logging
+import random
 import sys
 import unittest
 
-from dragonlib.core.basic_parser import BASICParser
+from dragonlib.core.basic_parser import BASICParser, BASICParserSession, EditResult
 
 
 log = logging.getLogger(__name__)
@@ -189,6 +190,35 @@ class TestBASICParser(unittest.TestCase):
             #             print_parsed_lines=True
         )
 
+    def test_code_after_data_without_string(self):
+        ascii_listing = """
+            10 DATA 1,2,3:PRINT 123
+        """
+        self.assertParser(
+            ascii_listing,
+            {
+                10: [
+                    """<CODE:DATA>""",
+                    """<DATA: 1,2,3>""",
+                    """<CODE::PRINT 123>""",
+                ],
+            },
+        )
+
+    def test_data_string_not_terminated(self):
+        ascii_listing = """
+            10 DATA 1,"FOO:BAR
+        """
+        self.assertParser(
+            ascii_listing,
+            {
+                10: [
+                    """<CODE:DATA>""",
+                    """<DATA: 1,"FOO:BAR>""",
+                ],
+            },
+        )
+
     def test_comment(self):
         ascii_listing = """
             10 REM A COMMENT
@@ -277,6 +307,20 @@ class TestBASICParser(unittest.TestCase):
             #             print_parsed_lines=True
         )
 
+    def test_line_no_without_code(self):
+        ascii_listing = """
+            10
+            20 PRINT
+        """
+        self.assertParser(
+            ascii_listing,
+            {
+                20: [
+                    """<CODE:PRINT>""",
+                ],
+            },
+        )
+
     def test_spaces_after_line_no(self):
         ascii_listing = """
             10 FOR I=1 TO 3:
@@ -299,6 +343,127 @@ class TestBASICParser(unittest.TestCase):
             #             print_parsed_lines=True
         )
 
+    def test_source_offsets(self):
+        ascii_listing = '10 A$="X":DATA 1,2\n20 PRINT \'COMMENT'
+        parsed_lines = self.parser.parse(ascii_listing)
+        offsets = [
+            (code_object.PART_TYPE, code_object.start, code_object.end)
+            for code_objects in parsed_lines.values()
+            for code_object in code_objects
+        ]
+        self.assertEqual(
+            offsets,
+            [
+                ("CODE", 3, 6),
+                ("STRING", 6, 9),
+                ("CODE", 9, 14),
+                ("DATA", 14, 18),
+                ("CODE", 22, 29),
+                ("COMMENT", 29, 36),
+            ],
+        )
+        for code_objects in parsed_lines.values():
+            for code_object in code_objects:
+                self.assertIs(code_object.source, ascii_listing)
+                self.assertEqual(code_object.content, ascii_listing[code_object.start:code_object.end])
+
+    def test_many_strings(self):
+        line = ":".join('A$(%i)="%i"' % (no, no) for no in range(500))
+        parsed_lines = self.parser.parse("10 %s" % line)
+        code_objects = parsed_lines[10]
+        self.assertEqual(len(code_objects), 1000)
+        self.assertEqual("".join(code_object.content for code_object in code_objects), line)
+        self.assertEqual(repr(code_objects[-1]), '<STRING:"499">')
+
+
+class TestBASICParserSession(unittest.TestCase):
+    def assertSessionParsed(self, session):
+        """
+        The session must have the same result as a complete parse of the text
+        """
+        reference = BASICParser().parse(session.text)
+        self.assertEqual(repr(session.parsed_lines), repr(reference))
+
+    def test_edit_in_line(self):
+        session = BASICParserSession('10 PRINT "A"\n20 GOTO 10')
+        result = session.edit((0, 10), (0, 11), "HELLO")
+        self.assertEqual(result, EditResult(added=[], changed=[10], removed=[]))
+        self.assertEqual(session.text, '10 PRINT "HELLO"\n20 GOTO 10')
+        self.assertEqual(repr(session.parsed_lines[10]), '[<CODE:PRINT >, <STRING:"HELLO">]')
+        self.assertSessionParsed(session)
+
+    def test_unchanged(self):
+        session = BASICParserSession("10 PRINT\n20 GOTO 10")
+        result = session.edit((1, 3), (1, 7), "GOTO")
+        self.assertEqual(result, EditResult(added=[], changed=[], removed=[]))
+
+    def test_add_and_remove_lines(self):
+        session = BASICParserSession("10 CLS\n20 END")
+        result = session.edit((0, 6), (0, 6), "\n15 PRINT\n")
+        self.assertEqual(result, EditResult(added=[15], changed=[], removed=[]))
+        self.assertEqual(session.text, "10 CLS\n15 PRINT\n\n20 END")
+        self.assertSessionParsed(session)
+
+        result = session.edit((0, 0), (3, 0), "")
+        self.assertEqual(result, EditResult(added=[], changed=[], removed=[10, 15]))
+        self.assertEqual(session.text, "20 END")
+        self.assertSessionParsed(session)
+
+    def test_change_line_number(self):
+        session = BASICParserSession("10 CLS\n20 END")
+        result = session.edit((0, 0), (0, 2), "30")
+        self.assertEqual(result, EditResult(added=[30], changed=[], removed=[10]))
+        self.assertSessionParsed(session)
+
+    def test_duplicate_line_numbers(self):
+        session = BASICParserSession("10 PRINT 1\n10 PRINT 2")
+        self.assertEqual(repr(session.parsed_lines[10]), "[<CODE:PRINT 2>]")
+
+        # Remove the last one: The first line is used again
+        result = session.edit((0, 10), (1, 10), "")
+        self.assertEqual(result, EditResult(added=[], changed=[10], removed=[]))
+        self.assertEqual(repr(session.parsed_lines[10]), "[<CODE:PRINT 1>]")
+        self.assertSessionParsed(session)
+
+        # Insert a duplicate before: The existing line is still used
+        result = session.edit((0, 0), (0, 0), "10 PRINT 0\n")
+        self.assertEqual(result, EditResult(added=[], changed=[], removed=[]))
+        self.assertEqual(repr(session.parsed_lines[10]), "[<CODE:PRINT 1>]")
+        self.assertSessionParsed(session)
+
+        result = session.edit((1, 0), (1, 10), "")
+        self.assertEqual(result, EditResult(added=[], changed=[10], removed=[]))
+        self.assertEqual(repr(session.parsed_lines[10]), "[<CODE:PRINT 0>]")
+        self.assertSessionParsed(session)
+
+    def test_random_edits(self):
+        rnd = random.Random(1)
+        fragments = ("10 ", "20 ", "\n", '"', ":", "'", "DATA ", "REM ", "PRINT ", "1,2", " ")
+        session = BASICParserSession('10 PRINT "A"\n20 DATA 1,2:GOTO 10\n30 REM END')
+        for _ in range(300):
+            start_row = rnd.randrange(len(session.lines))
+            end_row = rnd.randrange(start_row, min(start_row + 2, len(session.lines)))
+            start_col = rnd.randint(0, len(session.lines[start_row]))
+            if start_row == end_row:
+                end_col = rnd.randint(start_col, len(session.lines[end_row]))
+            else:
+                end_col = rnd.randint(0, len(session.lines[end_row]))
+            text = "".join(rnd.choice(fragments) for _ in range(rnd.randint(0, 3)))
+
+            old_parsed_lines = dict(session.parsed_lines)
+            result = session.edit((start_row, start_col), (end_row, end_col), text)
+            self.assertSessionParsed(session)
+
+            self.assertEqual(result.added, sorted(set(session.parsed_lines) - set(old_parsed_lines)))
+            self.assertEqual(result.removed, sorted(set(old_parsed_lines) - set(session.parsed_lines)))
+
+    def test_edit_out_of_range(self):
+        session = BASICParserSession("10 CLS")
+        with self.assertRaises(IndexError):
+            session.edit((0, 0), (1, 0), "")
+        with self.assertRaises(IndexError):
+            session.edit((0, 3), (0, 1), "")
+
 
 if __name__ == "__main__":
     from dragonlib.utils.logging_utils import setup_logging
@@ -0,0 +1,79 @@
+"""
+    DragonLib - unittests for the benchmark suite
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import json
+import unittest
+
+from manageprojects.test_utils.click_cli_utils import invoke_click
+
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing, load_autoload_dwl, parse_mix
+from dragonlib.benchmarks.suite import OPERATIONS, run_suite
+from dragonlib.cli_app import cli
+
+
+class CorpusTest(unittest.TestCase):
+    def test_generate_listing_is_deterministic(self):
+        listing = generate_listing(line_count=50)
+        self.assertEqual(listing, generate_listing(line_count=50))
+        self.assertNotEqual(listing, generate_listing(line_count=50, seed=2))
+        self.assertEqual(len(listing.splitlines()), 50)
+
+    def test_generate_listing_mix(self):
+        listing = generate_listing(line_count=20, mix={"on_goto": 1})
+        for line in listing.splitlines():
+            self.assertRegex(line, r"^\d+ ON X GO(TO|SUB) [\d,]+$")
+
+        with self.assertRaisesRegex(ValueError, "Unknown line kinds: foo"):
+            generate_listing(mix={"foo": 1})
+        with self.assertRaisesRegex(ValueError, "No line kind with a weight > 0"):
+            generate_listing(mix={"rem": 0})
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("data=3,rem=0"), {"data": 3, "rem": 0})
+        with self.assertRaisesRegex(ValueError, "not in the form"):
+            parse_mix("data")
+        with self.assertRaisesRegex(ValueError, "Unknown line kind 'foo'"):
+            parse_mix("foo=1")
+
+    def test_roundtrip(self):
+        listing = generate_listing(line_count=200)
+        for api_class in (Dragon32API, CoCoAPI):
+            api = api_class()
+            with self.subTest(api.MACHINE_NAME):
+                self.assertEqual(api.bin2bas(api.bas2bin(listing)), listing)
+
+    def test_load_autoload_dwl(self):
+        listing = load_autoload_dwl(Dragon32API())
+        self.assertTrue(listing.startswith("10 CLS\n"))
+        self.assertTrue(listing.endswith("\n130 GOTO 10"))
+
+
+class SuiteTest(unittest.TestCase):
+    def test_run_suite(self):
+        results = run_suite(line_count=10, repeat=1)
+        self.assertEqual(sorted(results), ["CoCo", "Dragon 32"])
+        for corpus in results.values():
+            self.assertEqual(sorted(corpus), ["AUTOLOAD.DWL", "synthetic"])
+            self.assertEqual(corpus["synthetic"]["lines"], 10)
+            self.assertEqual(corpus["AUTOLOAD.DWL"]["lines"], 13)
+            for corpus_results in corpus.values():
+                operation_results = corpus_results["results"]
+                self.assertEqual(list(operation_results), [name for name, input_type in OPERATIONS])
+                for result in operation_results.values():
+                    self.assertGreater(result["bytes"], 0)
+                    self.assertGreater(result["seconds"], 0)
+                    self.assertGreater(result["lines_per_second"], 0)
+                    self.assertGreater(result["bytes_per_second"], 0)
+                    self.assertGreater(result["peak_memory"], 0)
+
+    def test_cli(self):
+        stdout = invoke_click(cli, "bench", "--lines", "5", "--repeat", "1", "--mix", "code=1")
+        results = json.loads(stdout)
+        self.assertEqual(results["Dragon 32"]["synthetic"]["lines"], 5)
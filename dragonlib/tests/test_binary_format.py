@@ -10,9 +10,15 @@
 """
 
 
+import io
 import logging
+import os
+import struct
+import tempfile
+from unittest import mock
 
-from dragonlib.core.binary_files import BinaryFile
+from dragonlib.core import binary_files
+from dragonlib.core.binary_files import BinaryFile, Segment
 from dragonlib.tests import testdata
 from dragonlib.tests.test_base import BaseTestCase
 
@@ -49,3 +55,156 @@ class TestBinaryFile(BaseTestCase):
         # log_bytes(dragon_bin, msg="DragonDOS: %s")
 
         self.assertBinEqual(dragon_bin, testdata.LISTING_02_DOS_DUMP)
+
+    def test_open(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "TEST.BIN")
+            with open(filepath, "wb") as f:
+                f.write(testdata.LISTING_02_DOS_DUMP)
+
+            with BinaryFile.open(filepath) as binary_file:
+                self.assertIsInstance(binary_file.data, memoryview)
+                self.assertEqual(binary_file.file_type, 0x01)
+                self.assertEqual(binary_file.load_address, 0xABCD)
+                self.assertEqual(binary_file.exec_address, 0xDCBA)
+                self.assertBinEqual(binary_file.data, testdata.LISTING_02_BIN)
+            self.assertIsNone(binary_file.data)
+            binary_file.close()  # closing twice is ok
+
+    def test_open_empty_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "EMPTY.BIN")
+            open(filepath, "wb").close()
+            with self.assertRaises(ValueError):
+                BinaryFile.open(filepath)
+
+    def test_open_invalid_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "INVALID.BIN")
+            with open(filepath, "wb") as f:
+                f.write(b"\x12ABC")
+            with self.assertRaisesRegex(NotImplementedError, r"Format \$12 unknown"):
+                BinaryFile.open(filepath)
+
+            with open(filepath, "wb") as f:
+                f.write(b"\x55\x01")  # truncated Dragon DOS header
+            with self.assertRaises(struct.error):
+                BinaryFile.open(filepath)
+
+    def test_write_to(self):
+        self.binary.load_tokenised_dump(testdata.LISTING_02_BIN, load_address=0xABCD, exec_address=0xDCBA)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "TEST.BIN")
+            with open(filepath, "wb") as f:
+                f.write(b"X")  # buffered data before the vectored write
+                self.assertEqual(self.binary.write_to(f), len(testdata.LISTING_02_DOS_DUMP))
+            with open(filepath, "rb") as f:
+                self.assertBinEqual(f.read(), b"X" + testdata.LISTING_02_DOS_DUMP)
+
+    def test_copy_opened_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "TEST.BIN")
+            with open(filepath, "wb") as f:
+                f.write(testdata.LISTING_01_DOS_DUMP)
+
+            copypath = os.path.join(temp_dir, "COPY.BIN")
+            with BinaryFile.open(filepath) as binary_file, open(copypath, "wb") as f:
+                binary_file.write_to(f)
+            with open(copypath, "rb") as f:
+                self.assertBinEqual(f.read(), testdata.LISTING_01_DOS_DUMP)
+
+    def test_write_to_file_object_without_fileno(self):
+        self.binary.load_tokenised_dump(testdata.LISTING_01_BIN, load_address=0x1234, exec_address=0x5678)
+        f = io.BytesIO()
+        self.assertEqual(self.binary.write_to(f), len(testdata.LISTING_01_DOS_DUMP))
+        self.assertBinEqual(f.getvalue(), testdata.LISTING_01_DOS_DUMP)
+
+    def test_write_to_partial_writes(self):
+        self.binary.load_tokenised_dump(testdata.LISTING_02_BIN, load_address=0xABCD, exec_address=0xDCBA)
+
+        def writev(fd, buffers):
+            # write max. 5 bytes per call
+            return os.write(fd, bytes(buffers[0][:5]))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "TEST.BIN")
+            with open(filepath, "wb") as f:
+                with mock.patch.object(binary_files.os, "writev", side_effect=writev, create=True) as mock_writev:
+                    self.binary.write_to(f)
+            self.assertGreater(mock_writev.call_count, 2)
+            with open(filepath, "rb") as f:
+                self.assertBinEqual(f.read(), testdata.LISTING_02_DOS_DUMP)
+
+
+def decb_dump(segments, exec_address):
+    """
+    Build a CoCo DECB file from (load address, data) tuples.
+    """
+    parts = []
+    for load_address, data in segments:
+        parts.append(struct.pack(">BHH", 0x00, len(data), load_address))
+        parts.append(data)
+    parts.append(struct.pack(">BHH", 0xFF, 0, exec_address))
+    return b"".join(parts)
+
+
+class TestDECBFile(BaseTestCase):
+    def setUp(self):
+        self.binary = BinaryFile()
+
+    def test_one_segment(self):
+        data = decb_dump([(0x2600, testdata.LISTING_01_BIN)], exec_address=0xA027)
+        self.binary.load_from_bin(data)
+        self.assertIsNone(self.binary.file_type)
+        self.assertEqual(self.binary.load_address, 0x2600)
+        self.assertEqual(self.binary.exec_address, 0xA027)
+        self.assertEqual(self.binary.length, len(testdata.LISTING_01_BIN))
+        self.assertEqual(list(self.binary.segments), [Segment(0x2600, 5, len(testdata.LISTING_01_BIN))])
+        self.assertIs(self.binary.data.obj, data)
+        self.assertBinEqual(self.binary.data, testdata.LISTING_01_BIN)
+
+    def test_many_segments(self):
+        segments = [(0x0E00 + index * 16, bytes([index & 0xFF]) * 16) for index in range(500)]
+        data = decb_dump(segments, exec_address=0x0E00) + b"\x00" * 100  # padding after the postamble
+        self.binary.load_from_bin(data)
+        self.assertEqual(len(self.binary.segments), 500)
+        self.assertEqual(self.binary.length, 500 * 16)
+        self.assertEqual(self.binary.segments[499], Segment(0x0E00 + 499 * 16, 499 * 21 + 5, 16))
+        self.assertBinEqual(self.binary.segments.get_data(499), b"\xf3" * 16)
+
+        start, image = self.binary.segments.memory_image()
+        self.assertEqual(start, 0x0E00)
+        self.assertBinEqual(image, b"".join(segment_data for load_address, segment_data in segments))
+
+    def test_memory_image_gaps_and_overlaps(self):
+        data = decb_dump([(0x1004, b"CD"), (0x1000, b"AB"), (0x1005, b"X")], exec_address=0x1000)
+        self.binary.load_from_bin(data)
+        start, image = self.binary.segments.memory_image()
+        self.assertEqual(start, 0x1000)
+        self.assertEqual(image, bytearray(b"AB\x00\x00CX"))
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "DECB segment at offset 0 truncated: 1 Bytes missing"):
+            self.binary.load_from_bin(b"\x00\x00\x03\x0e\x00AB")
+        with self.assertRaisesRegex(ValueError, "DECB record at offset 7 truncated"):
+            self.binary.load_from_bin(b"\x00\x00\x02\x0e\x00AB\xff\x00")
+        with self.assertRaisesRegex(ValueError, "Unknown DECB record type \\$12 at offset 7"):
+            self.binary.load_from_bin(b"\x00\x00\x02\x0e\x00AB\x12\x00\x00\x00\x00")
+        with self.assertRaisesRegex(ValueError, "No DECB segments"):
+            self.binary.load_DECB(b"\xff\x00\x00\x0e\x00")
+
+    def test_missing_postamble(self):
+        with self.assertLogs("dragonlib", level=logging.ERROR) as cm:
+            self.binary.load_from_bin(b"\x00\x00\x02\x0e\x00AB")
+        self.assertEqual(cm.output, ["ERROR:dragonlib.core.binary_files:ERROR: No DECB postamble: exec address unknown!"])
+        self.assertIsNone(self.binary.exec_address)
+        self.assertEqual(len(self.binary.segments), 1)
+
+    def test_open(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, "TEST.BIN")
+            with open(filepath, "wb") as f:
+                f.write(decb_dump([(0x0E00, b"AB"), (0x2000, b"C")], exec_address=0x0E00))
+            with BinaryFile.open(filepath) as binary_file:
+                self.assertEqual(len(binary_file.segments), 2)
+                self.assertBinEqual(binary_file.segments.get_data(1), b"C")
@@ -0,0 +1,107 @@
+"""
+    DragonLib - unittests for the crunch tool
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import textwrap
+import unittest
+
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing, load_autoload_dwl
+from dragonlib.core.crunch import MAX_LINE_LENGTH
+
+
+class CrunchTest(unittest.TestCase):
+    def setUp(self):
+        self.api = Dragon32API()
+
+    def crunch(self, listing, api=None):
+        if api is None:
+            api = self.api
+        program_dump = api.ascii_listing2program_dump(textwrap.dedent(listing).strip())
+        new_program_dump, report = api.crunch_program_dump(program_dump)
+        return api.program_dump2ascii(new_program_dump), report
+
+    def test_crunch(self):
+        for api in (Dragon32API(), CoCoAPI()):
+            with self.subTest(api.MACHINE_NAME):
+                listing, report = self.crunch(
+                    """
+                    10 REM THE LOOP
+                    20 FOR I = 1 TO 10
+                    30 PRINT "I = ";I ' show I
+                    40 NEXT I
+                """,
+                    api,
+                )
+                self.assertEqual(listing, '20 FORI=1TO10:PRINT"I = ";I:NEXTI')
+                self.assertEqual(report.old_lines, 4)
+                self.assertEqual(report.new_lines, 1)
+                self.assertEqual(report.removed_lines, 1)
+                self.assertEqual(report.merged_lines, 2)
+                self.assertEqual(report.program_start, api.DEFAULT_PROGRAM_START)
+                self.assertGreater(report.bytes_saved, 0)
+
+    def test_keep_jump_targets(self):
+        listing, report = self.crunch(
+            """
+            10 REM START
+            20 PRINT "A"
+            30 PRINT "B"
+            40 GOSUB 10:GOTO 30
+        """
+        )
+        self.assertEqual(listing, '10 REM\n20 PRINT"A"\n30 PRINT"B":GOSUB10:GOTO30')
+        self.assertEqual(report.removed_lines, 0)
+
+    def test_dont_append_to_if(self):
+        listing, report = self.crunch(
+            """
+            10 IF A=1 THEN PRINT "ONE"
+            20 PRINT "IF"
+            30 DATA IF A
+            40 PRINT
+        """
+        )
+        self.assertEqual(listing, '10 IFA=1THENPRINT"ONE"\n20 PRINT"IF":DATA IF A:PRINT')
+
+    def test_strings_and_data_unchanged(self):
+        listing, report = self.crunch(
+            """
+            10 DATA 1, " A ", 2:PRINT "REM X" ' TEST
+        """
+        )
+        self.assertEqual(listing, '10 DATA 1, " A ", 2:PRINT"REM X"')
+
+    def test_max_line_length(self):
+        listing = "\n".join('%i PRINT "%s"' % (line_number, "X" * 50) for line_number in range(10, 200, 10))
+        program_dump = self.api.ascii_listing2program_dump(listing)
+        new_program_dump, report = self.api.crunch_program_dump(program_dump)
+        lines = self.api.program_dump2ascii_lines(new_program_dump)
+        self.assertGreater(len(lines), 1)
+        for line in lines:
+            self.assertLessEqual(len(line), MAX_LINE_LENGTH)
+        self.assertEqual(report.merged_lines, 19 - len(lines))
+
+    def test_corpus(self):
+        for api in (Dragon32API(), CoCoAPI()):
+            for listing in (generate_listing(line_count=300), load_autoload_dwl(api)):
+                with self.subTest(api.MACHINE_NAME):
+                    program_dump = api.ascii_listing2program_dump(listing)
+                    new_program_dump, report = api.crunch_program_dump(program_dump)
+                    self.assertEqual(report.old_size, len(program_dump))
+                    self.assertEqual(report.new_size, len(new_program_dump))
+                    self.assertGreater(report.bytes_saved, 0)
+
+                    # All jump targets still exists:
+                    xref = api.xref_program_dump(new_program_dump)
+                    self.assertEqual(xref.missing_targets, api.xref_program_dump(program_dump).missing_targets)
+
+    def test_empty_program(self):
+        new_program_dump, report = self.api.crunch_program_dump(bytearray(b"\x00\x00"))
+        self.assertEqual(new_program_dump, bytearray())
+        self.assertEqual(report.bytes_saved, 0)
@@ -0,0 +1,62 @@
+"""
+    DragonLib - unittests for the variable minifier
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import unittest
+
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing, load_autoload_dwl
+
+
+class VariableMinifierTest(unittest.TestCase):
+    def setUp(self):
+        self.api = Dragon32API()
+
+    def test_most_used_variables_first(self):
+        listing, result = self.api.minify_variables("10 SUM=0:X=1\n20 X=X+1:SUM=SUM+X:PRINT SUM:NEXT X")
+        self.assertEqual(listing, "10 B=0:A=1\n20 A=A+1:B=B+A:PRINT B:NEXT A")
+        self.assertEqual(result.renames, {"SUM": "B", "X": "A"})
+        self.assertEqual(result.counts, {"SUM": 4, "X": 5})
+
+    def test_namespaces(self):
+        listing, result = self.api.minify_variables('10 DIM ARR(5),NAMES$(5):NAME$="X":COUNT=ARR (1)')
+        self.assertEqual(listing, '10 DIM A(5),A$(5):A$="X":A=A (1)')
+        self.assertEqual(result.renames, {"ARR(": "A(", "NAMES$(": "A$(", "NAME$": "A$", "COUNT": "A"})
+
+    def test_collisions(self):
+        listing, result = self.api.minify_variables("10 COUNT=1:CODE=2:PRINT COUNT")
+        self.assertEqual(listing, "10 A=1:A=2:PRINT A")
+        self.assertEqual(result.collisions, {"CO": ["COUNT", "CODE"]})
+
+    def test_skip_strings_data_comments_and_numbers(self):
+        listing, result = self.api.minify_variables(
+            '10 XX=&HFF+1E3:DEF FNSQ(NUM)=NUM*NUM:PRINT "XX";FNSQ(XX) \'XX\n20 DATA XX,"XX":REM XX'
+        )
+        self.assertEqual(listing, '10 B=&HFF+1E3:DEF FNSQ(A)=A*A:PRINT "XX";FNSQ(B) \'XX\n20 DATA XX,"XX":REM XX')
+
+    def test_keyword_next_to_new_name(self):
+        # XX -> F would be tokenized as: IF FOR G...
+        listing, result = self.api.minify_variables(
+            "10 A=1:B=1:C=1:D=1:E=1:A=A:B=B:C=C:D=D:E=E\n20 IFXXORYTHEN10"
+        )
+        self.assertEqual(result.renames["XX"], "F")
+        self.assertEqual(listing.splitlines()[1], "20 IF F OR G THEN10")
+
+    def test_corpus(self):
+        for api in (Dragon32API(), CoCoAPI()):
+            for listing in (generate_listing(line_count=300), load_autoload_dwl(api)):
+                with self.subTest(api.MACHINE_NAME):
+                    new_listing, result = api.minify_variables(listing)
+                    self.assertLessEqual(len(new_listing), len(listing))
+                    for new_name in result.renames.values():
+                        self.assertLessEqual(len(new_name.rstrip("$(")), 2)
+
+                    old_xref = api.xref_ascii_listing(listing)
+                    new_xref = api.xref_ascii_listing(new_listing)
+                    self.assertEqual(new_xref.targets, old_xref.targets)
+                    self.assertEqual(api.bin2bas(api.bas2bin(new_listing)), new_listing)
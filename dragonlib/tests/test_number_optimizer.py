@@ -0,0 +1,109 @@
+"""
+    DragonLib - unittests for the numeric literal optimizer
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import unittest
+
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing, load_autoload_dwl
+from dragonlib.core.number_optimizer import NumberOptimizer
+
+
+class NumberOptimizerTest(unittest.TestCase):
+    def setUp(self):
+        self.api = Dragon32API()
+        self.optimizer = NumberOptimizer(self.api.token_util, hex_literals=False)
+
+    def assertFolded(self, code, folded_code):
+        listing, result = self.optimizer.optimize("10 %s" % code)
+        self.assertEqual(listing, "10 %s" % folded_code)
+
+    def test_fold(self):
+        self.assertFolded("A=2*3", "A=6")
+        self.assertFolded("A=1+2*3-4", "A=3")
+        self.assertFolded("A=(2+3)*4", "A=(5)*4")
+        self.assertFolded("A=8/4/2", "A=1")
+        self.assertFolded("A=2^3^2", "A=64")
+        self.assertFolded("A=2*3^2", "A=18")
+        self.assertFolded("PRINT 2 * 3;SIN(2*3)", "PRINT 6;SIN(6)")
+
+    def test_dont_fold(self):
+        self.assertFolded("A=X-2+3", "A=X-2+3")  # (X-2)+3
+        self.assertFolded("A=X*2*3", "A=X*2*3")  # (X*2)*3
+        self.assertFolded("A=-2+3", "A=-2+3")  # (-2)+3
+        self.assertFolded("A=2+3*X", "A=2+3*X")
+        self.assertFolded("A=2-3", "A=2-3")  # negative result
+        self.assertFolded("A=1/3", "A=1/3")  # no integer result
+        self.assertFolded("A=1.5*2", "A=1.5*2")  # only integers
+        self.assertFolded("A=2*3E2", "A=2*3E2")
+
+    def test_fold_cycles(self):
+        listing, result = self.optimizer.optimize("10 A=2*3")
+        # 2 + 3 + "*" - 6
+        self.assertEqual(result.cycles_saved, {10: 550 + 550 + 1200 - 550})
+        self.assertEqual(result.folded, 1)
+
+    def test_hex(self):
+        listing, result = self.api.optimize_numbers('10 POKE 65280,99:A=100.5+256:PRINT "1000"\n20 DATA 1000')
+        self.assertEqual(listing, '10 POKE &HFF00,99:A=100.5+&H100:PRINT "1000"\n20 DATA 1000')
+        self.assertEqual(result.hex_literals, 2)
+
+    def test_line_numbers_unchanged(self):
+        listing = "10 ON X GOTO 1000, 2000:GOSUB 1000+0\n20 IF A THEN 1000 ELSE 2000\n1000 RUN 2000\n2000 END"
+        new_listing, result = self.api.optimize_numbers(listing)
+        self.assertEqual(
+            new_listing,
+            "10 ON X GOTO 1000, 2000:GOSUB 1000+0\n20 IF A THEN 1000 ELSE 2000\n1000 RUN 2000\n2000 END",
+        )
+
+    def test_hoist(self):
+        listing, result = self.api.optimize_numbers(
+            "10 X=0.5\n20 X=X*1.0625+1.0625\n30 IF X<1.0625 THEN 20\n40 PRINT 1.0625"
+        )
+        self.assertEqual(
+            listing,
+            "9 A=1.0625\n10 X=0.5\n20 X=X*A+A\n30 IF X<A THEN 20\n40 PRINT 1.0625",
+        )
+        self.assertEqual(result.hot_lines, [20, 30])
+        self.assertEqual(result.hoisted, {"1.0625": "A"})
+        self.assertEqual(result.cycles_saved, {20: 3600, 30: 1800})
+
+    def test_hoist_hot_lines_argument(self):
+        listing, result = self.api.optimize_numbers("10 PRINT 3.14159;3.14159\n20 PRINT 3.14159", hot_lines=[20])
+        self.assertEqual(listing, "10 PRINT 3.14159;3.14159\n20 PRINT 3.14159")
+        listing, result = self.api.optimize_numbers("10 PRINT 3.14159;3.14159\n20 PRINT 3.14159", hot_lines=[10])
+        self.assertEqual(listing, "9 A=3.14159\n10 PRINT A;A\n20 PRINT 3.14159")
+
+    def test_no_hoist_of_integers(self):
+        listing, result = self.api.optimize_numbers("10 FOR I=1 TO 10:X=X+1:Y=Y+1:NEXT I")
+        self.assertEqual(listing, "10 FOR I=1 TO 10:X=X+1:Y=Y+1:NEXT I")
+        self.assertEqual(result.hoisted, {})
+        listing, result = self.api.optimize_numbers("10 X=X+1E3:Y=Y+1E3:GOTO 10")
+        self.assertEqual(listing, "9 A=1E3\n10 X=X+A:Y=Y+A:GOTO 10")
+
+    def test_no_hoist_with_clear(self):
+        listing, result = self.api.optimize_numbers("10 CLEAR 200\n20 X=X*1.0625+1.0625:GOTO 20")
+        self.assertEqual(listing, "10 CLEAR &HC8\n20 X=X*1.0625+1.0625:GOTO 20")
+        self.assertEqual(result.hoisted, {})
+
+    def test_no_hoist_with_run(self):
+        listing, result = self.api.optimize_numbers("10 X=X*1.0625+1.0625:RUN 10")
+        self.assertEqual(listing, "10 X=X*1.0625+1.0625:RUN 10")
+        self.assertEqual(result.hoisted, {})
+
+    def test_corpus(self):
+        for api in (Dragon32API(), CoCoAPI()):
+            for listing in (generate_listing(line_count=300), load_autoload_dwl(api)):
+                with self.subTest(api.MACHINE_NAME):
+                    new_listing, result = api.optimize_numbers(listing)
+                    self.assertEqual(api.bin2bas(api.bas2bin(new_listing)), new_listing)
+                    old_xref = api.xref_ascii_listing(listing)
+                    new_xref = api.xref_ascii_listing(new_listing)
+                    for line_number, targets in old_xref.targets.items():
+                        self.assertEqual(new_xref.get_targets(line_number), targets)
+                    self.assertGreaterEqual(result.total_cycles_saved, 0)
@@ -0,0 +1,193 @@
+"""
+    DragonLib - unittests for the subroutine relocator
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import textwrap
+import unittest
+
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing, load_autoload_dwl
+from dragonlib.core.relocate import JumpHops
+
+
+class SubroutineRelocatorTest(unittest.TestCase):
+    def setUp(self):
+        self.api = Dragon32API()
+
+    def program_dump(self, listing):
+        return self.api.ascii_listing2program_dump(textwrap.dedent(listing).strip())
+
+    def relocate(self, listing, **kwargs):
+        program_dump = self.program_dump(listing)
+        new_program_dump, report = self.api.relocate_subroutines(program_dump, **kwargs)
+        return self.api.program_dump2ascii(new_program_dump), report
+
+    def test_analyze(self):
+        analysis = self.api.analyze_jump_hops(
+            self.program_dump(
+                """
+                10 GOSUB 40
+                20 ON X GOSUB 10,40:GOTO 99
+                30 IF A THEN 20 ELSE 40
+                40 RETURN
+                """
+            ),
+            weights={30: 5},
+        )
+        self.assertEqual(
+            analysis.jumps,
+            [
+                JumpHops(line_number=10, target=40, is_gosub=True, hops=3),
+                JumpHops(line_number=20, target=10, is_gosub=True, hops=0),
+                JumpHops(line_number=20, target=40, is_gosub=True, hops=2),
+                JumpHops(line_number=20, target=99, is_gosub=False, hops=None),
+                JumpHops(line_number=30, target=20, is_gosub=False, hops=1),
+                JumpHops(line_number=30, target=40, is_gosub=False, hops=1),
+            ],
+        )
+        self.assertEqual(analysis.total_hops, 3 + 0 + 2 + 5 * (1 + 1))
+        self.assertEqual(analysis.get_target_hops(), {40: 10, 10: 0, 20: 5})
+        self.assertEqual(analysis.missing_targets, [99])
+
+    def test_relocate(self):
+        listing, report = self.relocate(
+            """
+            10 FOR I=1 TO 100
+            20 GOSUB 1000
+            30 PRINT I
+            40 GOSUB 2000
+            50 NEXT I
+            60 END
+            1000 PRINT "ONE" ' FIRST
+            1010 RETURN ' DONE
+            2000 PRINT "TWO":GOTO 2020
+            2010 PRINT "NOT REACHED"
+            2020 RETURN
+            """,
+            weights={20: 100, 40: 100},
+        )
+        self.assertEqual(
+            listing,
+            textwrap.dedent(
+                """
+                10 GOTO 40
+                20 PRINT "ONE" ' FIRST
+                30 RETURN ' DONE
+                40 FOR I=1 TO 100
+                50 GOSUB 20
+                60 PRINT I
+                70 GOSUB 100
+                80 NEXT I
+                90 END
+                100 PRINT "TWO":GOTO 120
+                110 PRINT "NOT REACHED"
+                120 RETURN
+                """
+            ).strip(),
+        )
+        self.assertEqual(report.moved, [1000])
+        # GOTO 2020 ends the block: only line 2000 would be moved, but it's
+        # reached by the search from line 40 as fast as from the program start:
+        self.assertEqual(report.skipped, {2000: "no hops saved"})
+        self.assertEqual(report.renum_dict[1000], 20)
+        self.assertEqual(report.renum_dict[10], 40)
+        self.assertEqual(report.old_hops, 5 * 100 + 5 * 100 + 2)
+        self.assertEqual(report.new_hops, 3 + 1 * 100 + 3 * 100 + 2)
+        self.assertEqual(str(report), "1 subroutines moved: 1002 -> 405 link hops (597 saved)")
+
+    def test_dont_move(self):
+        listing = """
+            10 GOSUB 30:GOSUB 60:GOSUB 80:GOSUB 100
+            20 PRINT "MAIN":GOTO 10
+            30 PRINT "FIRST"
+            40 IF A THEN RETURN
+            50 PRINT "NOT FIRST":RETURN
+            55 IF B THEN PRINT "B"
+            60 PRINT "FALL THROUGH":RETURN
+            70 PRINT "NOT CALLED":STOP
+            80 DATA 1,2,3
+            90 RETURN
+            100 PRINT "NO RETURN"
+        """
+        new_listing, report = self.relocate(listing, weights={10: 100})
+        self.assertEqual(
+            new_listing.splitlines()[:4],
+            ["10 GOTO 50", '20 PRINT "FIRST"', "30 IF A THEN RETURN", '40 PRINT "NOT FIRST":RETURN'],
+        )
+        self.assertEqual(report.moved, [30])
+        self.assertEqual(
+            report.skipped,
+            {
+                60: "previous line 55 runs into it",
+                80: "DATA in line 80",
+                100: "no RETURN",
+            },
+        )
+
+    def test_nothing_to_move(self):
+        program_dump = self.program_dump(
+            """
+            10 GOSUB 30
+            20 END
+            30 RETURN
+            """
+        )
+        new_program_dump, report = self.api.relocate_subroutines(program_dump)
+        self.assertEqual(new_program_dump, program_dump)
+        self.assertEqual(report.moved, [])
+        self.assertEqual(report.renum_dict, {})
+        self.assertEqual(report.hops_saved, 0)
+        self.assertEqual(report.skipped, {30: "no hops saved"})
+
+    def test_weights_and_max_subroutines(self):
+        listing = """
+            10 GOSUB 40:GOSUB 50:GOSUB 40
+            20 PRINT "MAIN"
+            30 END
+            40 RETURN
+            50 RETURN
+        """
+        new_listing, report = self.relocate(listing, weights={10: 100}, max_subroutines=1, new_start=100, step=5)
+        self.assertEqual(
+            new_listing.splitlines(),
+            [
+                "100 GOTO 110",
+                "105 RETURN",
+                "110 GOSUB 105:GOSUB 125:GOSUB 105",
+                '115 PRINT "MAIN"',
+                "120 END",
+                "125 RETURN",
+            ],
+        )
+        self.assertEqual(report.moved, [40])
+        self.assertEqual(report.skipped, {50: "max subroutines"})
+
+    def test_corpus(self):
+        for api in (Dragon32API(), CoCoAPI()):
+            for listing in (generate_listing(line_count=300), load_autoload_dwl(api)):
+                with self.subTest(api.MACHINE_NAME):
+                    program_dump = api.ascii_listing2program_dump(listing)
+                    new_program_dump, report = api.relocate_subroutines(program_dump)
+                    self.assertGreaterEqual(report.hops_saved, 0)
+                    self.assertEqual(api.analyze_jump_hops(program_dump).total_hops, report.old_hops)
+                    new_analysis = api.analyze_jump_hops(new_program_dump)
+                    self.assertEqual(new_analysis.total_hops, report.new_hops)
+                    if not report.moved:
+                        self.assertEqual(new_program_dump, program_dump)
+                        continue
+
+                    # All jumps are renumbered consistently:
+                    renum_dict = report.renum_dict
+                    old_xref = api.xref_program_dump(program_dump)
+                    new_xref = api.xref_program_dump(new_program_dump)
+                    self.assertEqual(len(new_xref.targets), len(old_xref.targets) + 1)  # + the GOTO line
+                    for line_number, targets in old_xref.targets.items():
+                        self.assertEqual(
+                            new_xref.get_targets(renum_dict[line_number]),
+                            tuple(renum_dict.get(target, target) for target in targets),
+                        )
@@ -0,0 +1,106 @@
+"""
+    DragonLib - unittests for the tokenization cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2026 by the DragonLib team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from dragonlib.api import CoCoAPI, Dragon32API
+from dragonlib.benchmarks.corpus import generate_listing
+from dragonlib.core import token_cache
+from dragonlib.core.token_cache import CacheInfo, TokenCache
+
+
+class TokenCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TokenCache(maxsize=2)
+        cache.set("Dragon32", "A", b"\x01")
+        cache.set("Dragon32", "B", b"\x02")
+        self.assertEqual(cache.get("Dragon32", "A"), b"\x01")  # A is now the most recent one
+        cache.set("Dragon32", "C", b"\x03")
+        self.assertIsNone(cache.get("Dragon32", "B"))
+        self.assertEqual(cache.get("Dragon32", "A"), b"\x01")
+        self.assertEqual(cache.get("Dragon32", "C"), b"\x03")
+        self.assertEqual(cache.cache_info(), CacheInfo(hits=3, misses=1, disk_hits=0, maxsize=2, currsize=2))
+
+        cache.clear()
+        self.assertEqual(cache.cache_info(), CacheInfo(hits=0, misses=0, disk_hits=0, maxsize=2, currsize=0))
+
+    def test_disk_store(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "token_cache")
+            with TokenCache(path=path) as cache:
+                cache.set("Dragon32", "PRINT", b"\x87")
+
+            with TokenCache(path=path) as cache:
+                self.assertEqual(cache.get("Dragon32", "PRINT"), b"\x87")
+                self.assertEqual(cache.get("Dragon32", "PRINT"), b"\x87")
+                self.assertIsNone(cache.get("CoCo", "PRINT"))
+                self.assertEqual(
+                    cache.cache_info(), CacheInfo(hits=2, misses=1, disk_hits=1, maxsize=10000, currsize=1)
+                )
+
+    def test_disk_store_of_other_tokenizer_version(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "token_cache")
+            with mock.patch.object(token_cache, "TOKENIZER_VERSION", 0):
+                with TokenCache(path=path) as cache:
+                    cache.set("Dragon32", "PRINT", b"\x87")
+
+            with TokenCache(path=path) as cache:
+                self.assertIsNone(cache.get("Dragon32", "PRINT"))
+                self.assertEqual(cache.cache_info().misses, 1)
+                cache.set("Dragon32", "PRINT", b"\x87")
+
+            with TokenCache(path=path) as cache:
+                self.assertEqual(cache.get("Dragon32", "PRINT"), b"\x87")
+
+
+class TokenCacheAPITest(unittest.TestCase):
+    def test_same_program_dump(self):
+        listing = generate_listing(line_count=300)
+        for api_class in (Dragon32API, CoCoAPI):
+            with self.subTest(api_class.__name__):
+                reference_dump = api_class().ascii_listing2program_dump(listing)
+                api = api_class(token_cache=TokenCache())
+                self.assertEqual(api.ascii_listing2program_dump(listing), reference_dump)
+                self.assertEqual(api.ascii_listing2program_dump(listing), reference_dump)
+                self.assertEqual(api.bin2bas(api.bas2bin(listing)), listing)
+
+    def test_only_changed_lines_are_tokenized(self):
+        api = Dragon32API(collect_stats=True, token_cache=TokenCache())
+        listing = '10 PRINT "A"\n20 GOTO 10\n30 PRINT "A"'
+        api.ascii_listing2program_dump(listing)
+        counters = api.stats.last.counters
+        self.assertEqual(counters["cache_hits"], 1)  # line 30 has the same content as line 10
+        self.assertEqual(counters["cache_misses"], 2)
+
+        changed_listing = listing.replace("20 GOTO 10", "20 GOTO 30")
+        program_dump = api.ascii_listing2program_dump(changed_listing)
+        counters = api.stats.last.counters
+        self.assertEqual(counters["cache_hits"], 2)
+        self.assertEqual(counters["cache_misses"], 1)
+        self.assertEqual(program_dump, Dragon32API().ascii_listing2program_dump(changed_listing))
+
+    def test_dialects_are_separated(self):
+        # "DLOAD" is a token only in the Dragon BASIC
+        token_cache = TokenCache()
+        listing = "10 DLOAD"
+        dragon_dump = Dragon32API(token_cache=token_cache).ascii_listing2program_dump(listing)
+        coco_dump = CoCoAPI(token_cache=token_cache).ascii_listing2program_dump(listing)
+        self.assertEqual(dragon_dump, Dragon32API().ascii_listing2program_dump(listing))
+        self.assertEqual(coco_dump, CoCoAPI().ascii_listing2program_dump(listing))
+        self.assertEqual(token_cache.cache_info().misses, 2)
+
+    def test_trailing_blanks(self):
+        api = Dragon32API(token_cache=TokenCache())
+        listing = "10 PRINT\n20 PRINT  \n30 PRINT\t"
+        self.assertEqual(api.ascii_listing2program_dump(listing), Dragon32API().ascii_listing2program_dump(listing))
+        self.assertEqual(api.token_cache.cache_info().misses, 1)  # same key for all lines
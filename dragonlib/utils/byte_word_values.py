@@ -72,6 +72,28 @@ def bytes2word(byte_list):
     return (byte_list[0] << 8) + byte_list[1]
 
 
+def as_memoryview(data):
+    """
+    Returns a byte memoryview of the given data without copying it, if the
+    data supports the buffer protocol (bytes, bytearray, mmap, memoryview...)
+    Other iterables of byte values (e.g.: tuple, list) would be converted.
+
+    >>> as_memoryview(b"\\x01\\x02").tolist()
+    [1, 2]
+
+    >>> as_memoryview((0x1e, 0x07)).tolist()
+    [30, 7]
+    """
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return memoryview(bytes(data))
+
+    if view.format != "B" or view.ndim != 1:
+        view = view.cast("B")
+    return view
+
+
 def bin2hexline(data, add_addr=True, width=16):
     """
     Format binary data to a Hex-Editor like format...
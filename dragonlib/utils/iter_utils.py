@@ -9,6 +9,10 @@
 """
 
 
+import functools
+import re
+
+
 # Obsolete if http://legacy.python.org/dev/peps/pep-0467/ merged:
 iter_bytes = iter
 
@@ -45,24 +49,96 @@ def list_replace(iterable, src, dst):
     >>> list_replace((58, 131, 73, 70), (58, 131), 131)
     [131, 73, 70]
     """
-    result = []
-    iterable = list(iterable)
+    return list_multi_replace(iterable, ((src, dst),))
+
 
+def _as_list(value):
     try:
-        dst = list(dst)
+        return list(value)
     except TypeError:  # e.g.: int
-        dst = [dst]
+        return [value]
+
+
+def _as_bytes(values):
+    """
+    >>> _as_bytes([1, 2, 255])
+    b'\\x01\\x02\\xff'
+    >>> _as_bytes([1, 256]) is None
+    True
+    >>> _as_bytes(["X"]) is None
+    True
+    """
+    try:
+        return bytes(values)
+    except (TypeError, ValueError):
+        return None
+
 
-    src = list(src)
-    src_len = len(src)
+@functools.lru_cache(maxsize=32)
+def _compile_bytes_rules(bytes_rules):
+    regex = re.compile(b"|".join(re.escape(src) for src, dst in bytes_rules))
+    lookup = {}
+    for src, dst in bytes_rules:
+        lookup.setdefault(src, dst)  # The first rule wins
+    return regex, lookup
+
+
+def list_multi_replace(iterable, rules):
+    """
+    Apply all (src, dst) replace rules in a single pass from left to right.
+    On every position the first matching rule wins and the replaced part
+    would not be matched again.
+
+    >>> list_multi_replace([1, 2, 3, 4, 1, 3], (((1, 2), 9), ((3,), (7, 7)), ((1,), 0)))
+    [9, 7, 7, 4, 0, 7, 7]
+
+    >>> list_multi_replace(("A", "B", "C"), ((("B", "C"), "X"), (("A",), "Y")))
+    ['Y', 'X']
+
+    If all values fits into a byte, the work is done in bytes:
+    >>> list_multi_replace(b"GO TO 10", ((b"GO TO", b"GOTO"), (b" ", b"")))
+    [71, 79, 84, 79, 49, 48]
+    """
+    iterable = list(iterable)
+    rules = [(_as_list(src), _as_list(dst)) for src, dst in rules]
+    if not rules:
+        return iterable
+    for src, dst in rules:
+        if not src:
+            raise ValueError("Empty replace source in rule: {!r} -> {!r}".format(src, dst))
+
+    data = _as_bytes(iterable)
+    if data is not None:
+        bytes_rules = [(_as_bytes(src), _as_bytes(dst)) for src, dst in rules]
+        if all(src is not None and dst is not None for src, dst in bytes_rules):
+            if len(bytes_rules) == 1:
+                src, dst = bytes_rules[0]
+                return list(data.replace(src, dst))
+
+            regex, lookup = _compile_bytes_rules(tuple(bytes_rules))
+            return list(regex.sub(lambda match: lookup[match.group()], data))
+
+    # Generic way: Look up the rules by the first element
+    first_elements = {}
+    for src, dst in rules:
+        first_elements.setdefault(src[0], []).append((src, len(src), dst))
+
+    result = []
     index = 0
-    while index < len(iterable):
-        element = iterable[index:index + src_len]
-        #         print element, src
-        if element == src:
-            result += dst
-            index += src_len
+    iterable_length = len(iterable)
+    while index < iterable_length:
+        element = iterable[index]
+        try:
+            candidates = first_elements[element]
+        except (KeyError, TypeError):  # TypeError: unhashable element
+            candidates = ()
+
+        for src, src_len, dst in candidates:
+            if iterable[index:index + src_len] == src:
+                result += dst
+                index += src_len
+                break
         else:
-            result.append(iterable[index])
+            result.append(element)
             index += 1
     return result
@@ -147,18 +147,24 @@ def pformat_program_dump(ram_content):
 
 
 def log_program_dump(ram_content, level=99):
+    if not log.isEnabledFor(level):
+        return
     msg = "BASIC program dump:\n"
     msg += pformat_program_dump(ram_content)
     log.log(level, msg)
 
 
 def log_bytes(data, msg="%s", level=logging.DEBUG):
+    if not log.isEnabledFor(level):
+        return
     data = bytearray(data)
     data = " ".join(["%02X" % item for item in data])
     log.log(level, msg, data)
 
 
 def log_hexlines(data, msg="Data:", level=logging.DEBUG, width=16):
+    if not log.isEnabledFor(level):
+        return
     log.log(level, msg)
     for line in bin2hexline(data, width):
         log.log(level, line)